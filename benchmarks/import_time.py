@@ -0,0 +1,53 @@
+"""Cold-start cost of the CLI and the sentiment stack, measured in fresh interpreters
+
+    python benchmarks/import_time.py --runs 5
+
+Build the compact lexicon first (python -m src.fast_vader build-lexicon) to
+measure first-score time without NLTK.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+CASES = {
+    "import nltk (reference)": "import nltk",
+    "import src.main": "import src.main",
+    "import src.sentiment_analyzer": "import src.sentiment_analyzer",
+    "first analyze_text": (
+        "from src.sentiment_analyzer import SentimentAnalyzer\n"
+        "from src.sentiment_cache import SentimentCache\n"
+        "import tempfile, pathlib\n"
+        "cache = SentimentCache(pathlib.Path(tempfile.mkdtemp()) / 'cache.db')\n"
+        "SentimentAnalyzer(workers=1, cache=cache).analyze_text('Shares rallied on strong earnings')"
+    ),
+}
+
+TIMER = "import time\nstarted = time.perf_counter()\n{code}\nprint(time.perf_counter() - started)"
+
+
+def measure(code, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=project_root, capture_output=True, text=True, check=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import and first-use time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    args = parser.parse_args()
+
+    for name, code in CASES.items():
+        print(f"{name:32} {measure(code, args.runs) * 1000:8.1f} ms (median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
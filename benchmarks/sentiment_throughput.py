@@ -0,0 +1,44 @@
+"""Per-article sentiment scoring throughput: NLTK's VADER vs the fast engine
+
+    python benchmarks/sentiment_throughput.py --articles 20000
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.fast_vader import create_scorer
+from src.synthetic_news import SyntheticNewsGenerator, synthetic_companies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sentiment scoring engines")
+    parser.add_argument("--articles", type=int, default=20000, help="Number of synthetic articles")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the corpus")
+    args = parser.parse_args()
+
+    generator = SyntheticNewsGenerator(synthetic_companies(500, args.seed), seed=args.seed,
+                                       end_date=date(2025, 1, 1))
+    texts = [f"{a['title']}. {a['excerpt']}" for chunk in generator.generate(args.articles) for a in chunk]
+
+    timings = {}
+    scores = {}
+    for engine in ("nltk", "fast"):
+        scorer = create_scorer(engine)
+        started = time.perf_counter()
+        scores[engine] = [scorer.polarity_scores(text)['compound'] for text in texts]
+        timings[engine] = time.perf_counter() - started
+        print(f"{engine:>5}: {timings[engine] / len(texts) * 1e6:8.1f} us/article  "
+              f"{len(texts) / timings[engine]:10,.0f} articles/s")
+
+    max_diff = max(abs(a - b) for a, b in zip(scores["nltk"], scores["fast"]))
+    print(f"speedup: {timings['nltk'] / timings['fast']:.1f}x, max compound difference: {max_diff:.4f}")
+
+
+if __name__ == "__main__":
+    main()
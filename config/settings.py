@@ -1,25 +1,103 @@
-
-import os
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# SEC EDGAR settings
-SEC_EDGAR_BASE_URL = "https://www.sec.gov/edgar/searchedgar/companysearch.html"
-SEC_RATE_LIMIT_DELAY = 0.1  # seconds between requests
-
-# News sources
-NEWS_SOURCES = {
-    "reuters": "https://www.reuters.com/finance",
-    "bloomberg": "https://www.bloomberg.com/markets",
-    "financial_times": "https://www.ft.com/?edition=international"
-}
-
-# Sentiment analysis
-SENTIMENT_THRESHOLD = 0.2  # Above this is positive, below negative is negative
-
-# Data storage
-RAW_DATA_PATH = BASE_DIR / "data" / "raw"
-PROCESSED_DATA_PATH = BASE_DIR / "data" / "processed"
-OUTPUTS_PATH = BASE_DIR / "data" / "outputs"
-
+
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# SEC EDGAR settings
+SEC_EDGAR_BASE_URL = "https://www.sec.gov/edgar/searchedgar/companysearch.html"
+SEC_RATE_LIMIT_DELAY = 0.1  # seconds between requests
+
+# News sources
+NEWS_SOURCES = {
+    "reuters": "https://www.reuters.com/finance",
+    "bloomberg": "https://www.bloomberg.com/markets",
+    "financial_times": "https://www.ft.com/?edition=international"
+}
+
+# News fetching
+NEWS_FETCH_TIMEOUT = 10  # seconds per request
+NEWS_MAX_CONNECTIONS = 100  # pooled connections across all hosts
+NEWS_MAX_CONNECTIONS_PER_HOST = 8  # concurrent connections to any single host
+HTTP_CACHE_PATH = BASE_DIR / "data" / "cache" / "http_cache.db"  # ETag/Last-Modified validators and bodies
+NEWS_DUPLICATE_MAX_DISTANCE = 9  # SimHash bits two articles may differ by and still be one story
+NEWS_DUPLICATE_INDEX_SIZE = 50_000  # most recent stories checked for syndicated copies across cycles
+
+# Per-source adaptive timeouts, hedged requests and circuit breaking
+SOURCE_LATENCY_WINDOW = 200  # most recent response times kept per source
+SOURCE_MIN_SAMPLES = 20  # responses needed before timeouts adapt and hedging starts
+SOURCE_TIMEOUT_MULTIPLIER = 3.0  # adaptive timeout = p99 latency x this, capped at NEWS_FETCH_TIMEOUT
+SOURCE_MIN_TIMEOUT = 1.0  # seconds; floor for adaptive timeouts
+SOURCE_HEDGE_PERCENTILE = 95  # send a second request once the first outlives this percentile
+SOURCE_BREAKER_FAILURES = 5  # consecutive failures that open a source's circuit
+SOURCE_BREAKER_COOLDOWN = 300  # seconds a source with an open circuit is skipped
+
+# Per-host politeness: requests per second and concurrent requests for each host
+HOST_RATE_LIMITS = {
+    "www.sec.gov": {"rate": 1 / SEC_RATE_LIMIT_DELAY, "concurrency": 2},
+    "www.marketwatch.com": {"rate": 5, "concurrency": 4},
+    "finance.yahoo.com": {"rate": 5, "concurrency": 4},
+    "news.google.com": {"rate": 2, "concurrency": 2},
+}
+DEFAULT_HOST_RATE_LIMIT = {"rate": 5, "concurrency": NEWS_MAX_CONNECTIONS_PER_HOST}
+HOST_MAX_RETRIES = 3  # retries after a 429/503 before giving up
+HOST_BACKOFF_BASE = 1.0  # seconds, doubled per retry when no Retry-After is sent
+HOST_MAX_BACKOFF = 60.0  # cap on any single backoff, including Retry-After
+
+# Full-article content fetching
+CONTENT_QUEUE_SIZE = 1000  # articles waiting for content; extra ones wait for the next backfill
+CONTENT_FETCH_WORKERS = 16  # article pages in flight at once
+CONTENT_WRITE_BATCH = 50  # articles per content write-back
+CONTENT_FLUSH_INTERVAL = 5.0  # seconds idle before a partial batch is written
+CONTENT_MAX_BYTES = 2 * 1024 * 1024  # stop reading a page after this many bytes
+CONTENT_MAX_CHARS = 20000  # stored text is truncated to this length
+CONTENT_MIN_PARAGRAPH_WORDS = 8  # shorter paragraphs are treated as boilerplate
+
+# Sentiment analysis
+SENTIMENT_THRESHOLD = 0.2  # Above this is positive, below negative is negative
+SENTIMENT_ENGINE = "fast"  # "fast" (precompiled VADER tables) or "nltk" (NLTK's analyzer); same scores
+SENTIMENT_LEXICON_PATH = BASE_DIR / "data" / "cache" / "vader_lexicon.json"  # built by: python -m src.fast_vader build-lexicon
+SENTIMENT_WORKERS = None  # scoring processes; None uses every core
+SENTIMENT_CHUNK_SIZE = 2000  # texts per chunk sent to a scoring process
+SENTIMENT_PARALLEL_MIN_ARTICLES = 5000  # smaller batches are scored in-process
+SENTIMENT_CACHE_PATH = BASE_DIR / "data" / "cache" / "sentiment_cache.db"  # memoized scores by text hash
+SENTIMENT_CACHE_MAX_ENTRIES = 1_000_000  # least recently used entries are evicted past this
+SENTIMENT_CACHE_MEMORY_ENTRIES = 10_000  # most recently used cache entries also kept in memory
+SENTIMENT_DB_BATCH_SIZE = 5000  # unscored articles read, scored and written back per page
+SENTIMENT_ROLLING_WINDOW_DAYS = 30  # fixed window of the online per-company aggregates
+SENTIMENT_EWM_ALPHA = 0.05  # weight of each new article in the exponentially weighted mean/variance
+SENTIMENT_ANOMALY_THRESHOLD = 2.0  # flag a day whose mean is this many standard deviations from the window's
+SENTIMENT_ANOMALY_MIN_DAYS = 7  # other days with articles needed in the window before flagging
+SENTIMENT_ANOMALY_MIN_ARTICLES = 3  # articles a day needs before its mean is checked
+SENTIMENT_ANOMALY_WEBHOOKS = []  # URLs that receive each new anomaly as a JSON POST, e.g. "http://localhost:8080/alerts"
+SENTIMENT_ANOMALY_WEBHOOK_TIMEOUT = 2  # seconds per webhook POST
+SENTIMENT_ANOMALY_WEBHOOK_QUEUE_SIZE = 1000  # anomalies waiting for their webhook POSTs; extra ones are only stored
+SENTIMENT_POINT_BUDGET = 366  # most points per sentiment series; longer ranges switch to weekly/monthly rollups
+SENTIMENT_CORRELATION_WINDOW_DAYS = 90  # days of daily scores behind the cross-company correlations
+SENTIMENT_CORRELATION_MIN_OVERLAP = 20  # days both companies need scores before a pair is correlated
+SENTIMENT_CORRELATION_TOP_K = 10  # most correlated peers stored per company
+SENTIMENT_CORRELATION_BLOCK_SIZE = 256  # companies correlated against all others at a time
+ANALYSIS_CACHE_MAX_ENTRIES = 1024  # analyzer results kept in memory; least recently used are evicted
+
+# HTTP API
+HTTP_CACHE_MAX_AGE = 0  # seconds clients may reuse a response before revalidating it with its ETag
+API_PAGE_SIZE = 100  # rows per page of listings when no limit is given
+API_MAX_PAGE_SIZE = 1000  # largest limit a JSON page accepts; use format=ndjson for full exports
+API_MAX_BATCH_COMPANIES = 500  # most companies one batch sentiment/news request may ask for
+
+# Synthetic/mock news
+MOCK_NEWS_SEED = 42  # base seed for mock and synthetic news
+MOCK_NEWS_SENTIMENT_MIX = (0.5, 0.2, 0.3)  # positive, negative, neutral article weights
+
+# Data storage
+RAW_DATA_PATH = BASE_DIR / "data" / "raw"
+PROCESSED_DATA_PATH = BASE_DIR / "data" / "processed"
+OUTPUTS_PATH = BASE_DIR / "data" / "outputs"
+
+# Raw news segment store
+NEWS_STORE_PATH = RAW_DATA_PATH / "news" / "segments"
+NEWS_SEGMENT_MAX_BYTES = 8 * 1024 * 1024  # seal and start a new segment past this size
+NEWS_SEGMENT_COMPRESS = True  # gzip sealed segments
+NEWS_INDEX_STRIDE = 256  # records between offsets in the per-day segment index
+NEWS_SENTIMENT_LOOKBACK_DAYS = 1  # days of raw news, counted back from now, scored per sentiment run
+
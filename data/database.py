@@ -1,185 +1,881 @@
-
-import sqlite3
-import json
-from datetime import datetime
-from pathlib import Path
-from config import settings
-from utils.logger import logger
-
-class FinancialDataDB:
-    def __init__(self, db_path=None):
-        self.db_path = db_path or (Path(__file__).parent.parent.parent / "data" / "financial_data.db")
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.init_db()
-    
-    def init_db(self):
-        """Initialize database with required tables"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Companies table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS companies (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        ticker TEXT UNIQUE NOT NULL,
-                        cik TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # SEC Filings table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS sec_filings (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        company_id INTEGER,
-                        filing_type TEXT NOT NULL,
-                        filing_date TEXT NOT NULL,
-                        file_path TEXT NOT NULL,
-                        content_length INTEGER,
-                        sections TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (company_id) REFERENCES companies (id)
-                    )
-                ''')
-                
-                # News articles table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS news_articles (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        company_id INTEGER,
-                        title TEXT NOT NULL,
-                        excerpt TEXT,
-                        content TEXT,
-                        published_date TEXT,
-                        source TEXT NOT NULL,
-                        url TEXT NOT NULL,
-                        sentiment_score REAL,
-                        sentiment_label TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (company_id) REFERENCES companies (id)
-                    )
-                ''')
-                
-                # Sentiment results table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS sentiment_results (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        company_id INTEGER,
-                        analysis_date TEXT NOT NULL,
-                        total_articles INTEGER,
-                        positive_count INTEGER,
-                        negative_count INTEGER,
-                        neutral_count INTEGER,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (company_id) REFERENCES companies (id)
-                    )
-                ''')
-                
-                conn.commit()
-                logger.info("Database initialized successfully")
-                
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {str(e)}")
-            raise
-    
-    def add_company(self, name, ticker, cik):
-        """Add a company to the database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT OR IGNORE INTO companies (name, ticker, cik) VALUES (?, ?, ?)",
-                    (name, ticker, cik)
-                )
-                conn.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Failed to add company {name}: {str(e)}")
-            return None
-    
-    def add_sec_filing(self, company_id, filing_type, filing_date, file_path, content_length, sections):
-        """Add SEC filing to database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''INSERT INTO sec_filings 
-                    (company_id, filing_type, filing_date, file_path, content_length, sections) 
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                    (company_id, filing_type, filing_date, str(file_path), content_length, json.dumps(sections))
-                )
-                conn.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Failed to add SEC filing: {str(e)}")
-            return None
-    
-    def add_news_article(self, company_id, title, excerpt, content, published_date, source, url, 
-                         sentiment_score=None, sentiment_label=None):
-        """Add news article to database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''INSERT INTO news_articles 
-                    (company_id, title, excerpt, content, published_date, source, url, sentiment_score, sentiment_label) 
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                    (company_id, title, excerpt, content, published_date, source, url, sentiment_score, sentiment_label)
-                )
-                conn.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Failed to add news article: {str(e)}")
-            return None
-    
-    def add_sentiment_result(self, company_id, analysis_date, total_articles, 
-                            positive_count, negative_count, neutral_count):
-        """Add sentiment analysis results to database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''INSERT INTO sentiment_results 
-                    (company_id, analysis_date, total_articles, positive_count, negative_count, neutral_count) 
-                    VALUES (?, ?, ?, ?, ?, ?)''',
-                    (company_id, analysis_date, total_articles, positive_count, negative_count, neutral_count)
-                )
-                conn.commit()
-                return cursor.lastrowid
-        except Exception as e:
-            logger.error(f"Failed to add sentiment result: {str(e)}")
-            return None
-    
-    def get_company_id(self, ticker):
-        """Get company ID by ticker symbol"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM companies WHERE ticker = ?",
-                    (ticker,)
-                )
-                result = cursor.fetchone()
-                return result[0] if result else None
-        except Exception as e:
-            logger.error(f"Failed to get company ID for {ticker}: {str(e)}")
-            return None
-    
-    def get_latest_sentiment(self, company_id, days=30):
-        """Get sentiment results for a company for the last N days"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    '''SELECT analysis_date, total_articles, positive_count, negative_count, neutral_count 
-                    FROM sentiment_results 
-                    WHERE company_id = ? AND date(analysis_date) >= date('now', ?) 
-                    ORDER BY analysis_date DESC''',
-                    (company_id, f'-{days} days')
-                )
-                return cursor.fetchall()
-        except Exception as e:
-            logger.error(f"Failed to get sentiment results: {str(e)}")
-            return []
\ No newline at end of file
+
+import sqlite3
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from config import settings
+from utils.logger import logger
+
+SENTIMENT_RESOLUTIONS = {'day': 1, 'week': 7, 'month': 30}  # approximate days per point
+
+
+def sentiment_period_start(day, resolution):
+    """First day of the day/week (Monday)/month period containing day"""
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def choose_sentiment_resolution(days, max_points=None):
+    """Finest resolution that covers days in at most max_points points"""
+    max_points = max_points or settings.SENTIMENT_POINT_BUDGET
+    for resolution, period_days in SENTIMENT_RESOLUTIONS.items():
+        if days / period_days <= max_points:
+            return resolution
+    return 'month'
+
+
+class FinancialDataDB:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or (Path(__file__).parent.parent.parent / "data" / "financial_data.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_db()
+    
+    def init_db(self):
+        """Initialize database with required tables"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                # Companies table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS companies (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        ticker TEXT UNIQUE NOT NULL,
+                        cik TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # SEC Filings table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sec_filings (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        company_id INTEGER,
+                        filing_type TEXT NOT NULL,
+                        filing_date TEXT NOT NULL,
+                        file_path TEXT NOT NULL,
+                        content_length INTEGER,
+                        sections TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (company_id) REFERENCES companies (id)
+                    )
+                ''')
+                
+                # News articles table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS news_articles (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        company_id INTEGER,
+                        title TEXT NOT NULL,
+                        excerpt TEXT,
+                        content TEXT,
+                        published_date TEXT,
+                        source TEXT NOT NULL,
+                        url TEXT NOT NULL,
+                        sentiment_score REAL,
+                        sentiment_label TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        fingerprint INTEGER,
+                        published_day TEXT,
+                        FOREIGN KEY (company_id) REFERENCES companies (id)
+                    )
+                ''')
+                # SimHash of title + excerpt, restored into the scraper's duplicate index at startup
+                columns = [row[1] for row in cursor.execute("PRAGMA table_info(news_articles)")]
+                if 'fingerprint' not in columns:
+                    cursor.execute("ALTER TABLE news_articles ADD COLUMN fingerprint INTEGER")
+                # published_date normalized to YYYY-MM-DD when the article is scored; older runs
+                # wrote that back into published_date itself
+                if 'published_day' not in columns:
+                    cursor.execute("ALTER TABLE news_articles ADD COLUMN published_day TEXT")
+                    cursor.execute('''
+                        UPDATE news_articles SET published_day = substr(published_date, 1, 10)
+                        WHERE sentiment_score IS NOT NULL
+                        AND published_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+                    ''')
+                
+                # Every source that carried a story, the stored article's own link included
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS news_article_sources (
+                        article_id INTEGER NOT NULL,
+                        source TEXT,
+                        url TEXT NOT NULL,
+                        PRIMARY KEY (article_id, url),
+                        FOREIGN KEY (article_id) REFERENCES news_articles (id)
+                    )
+                ''')
+                
+                # Sentiment results table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sentiment_results (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        company_id INTEGER,
+                        analysis_date TEXT NOT NULL,
+                        total_articles INTEGER,
+                        positive_count INTEGER,
+                        negative_count INTEGER,
+                        neutral_count INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (company_id) REFERENCES companies (id)
+                    )
+                ''')
+                
+                # Incremental sentiment pass: only rows still to be scored, in id order
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_news_articles_unscored
+                    ON news_articles (id) WHERE sentiment_label IS NULL
+                ''')
+                
+                # One aggregate row per company and day
+                if not cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_sentiment_results_company_date'"
+                ).fetchone():
+                    self._migrate_duplicate_sentiment_results(cursor)
+                cursor.execute('''
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_sentiment_results_company_date
+                    ON sentiment_results (company_id, analysis_date)
+                ''')
+                
+                # Weekly and monthly sums of sentiment_results, kept in step with it
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sentiment_rollups (
+                        company_id INTEGER NOT NULL,
+                        resolution TEXT NOT NULL,
+                        period_start TEXT NOT NULL,
+                        total_articles INTEGER NOT NULL,
+                        positive_count INTEGER NOT NULL,
+                        negative_count INTEGER NOT NULL,
+                        neutral_count INTEGER NOT NULL,
+                        PRIMARY KEY (company_id, resolution, period_start)
+                    ) WITHOUT ROWID
+                ''')
+                if not cursor.execute("SELECT EXISTS (SELECT 1 FROM sentiment_rollups)").fetchone()[0]:
+                    self._rebuild_sentiment_rollups(cursor)
+                
+                # Write counters per resource and company for caches and ETags; company_id 0
+                # counts every write to the resource. Older per-company-only counters are reset.
+                columns = [row[1] for row in cursor.execute("PRAGMA table_info(data_versions)")]
+                if columns and 'resource' not in columns:
+                    cursor.execute("DROP TABLE data_versions")
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS data_versions (
+                        resource TEXT NOT NULL,
+                        company_id INTEGER NOT NULL,
+                        version INTEGER NOT NULL,
+                        PRIMARY KEY (resource, company_id)
+                    ) WITHOUT ROWID
+                ''')
+                
+                # Per-company news, newest first, with keyset paging on (published_date, id)
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_news_articles_company_published
+                    ON news_articles (company_id, published_date)
+                ''')
+                
+                # Already-stored links, so re-scraped articles are skipped
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_news_articles_company_url
+                    ON news_articles (company_id, url)
+                ''')
+                
+                # Filing lookups by company and date range
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_sec_filings_company_date
+                    ON sec_filings (company_id, filing_date)
+                ''')
+                
+                conn.commit()
+                logger.info("Database initialized successfully")
+                
+        except Exception as e:
+            logger.error(f"Failed to initialize database: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _migrate_duplicate_sentiment_results(cursor):
+        """One-time move of superseded daily rows out of sentiment_results, before it gets its unique index
+        
+        Older runs stored a fresh snapshot of a company's day on every run,
+        so the newest row of each (company_id, analysis_date) is kept and
+        the earlier ones are moved, not deleted, to sentiment_results_superseded.
+        """
+        superseded = '''SELECT * FROM sentiment_results WHERE id NOT IN
+            (SELECT MAX(id) FROM sentiment_results GROUP BY company_id, analysis_date)'''
+        count = cursor.execute(f"SELECT COUNT(*) FROM ({superseded})").fetchone()[0]
+        if not count:
+            return
+        cursor.execute("CREATE TABLE IF NOT EXISTS sentiment_results_superseded AS SELECT * FROM sentiment_results WHERE 0")
+        cursor.execute(f"INSERT INTO sentiment_results_superseded {superseded}")
+        cursor.execute("DELETE FROM sentiment_results WHERE id IN (SELECT id FROM sentiment_results_superseded)")
+        logger.warning(
+            f"Moved {count} superseded duplicate sentiment_results rows to sentiment_results_superseded "
+            "so each company and day has one row"
+        )
+    
+    @staticmethod
+    def _bump_versions(cursor, resources, company_ids):
+        """Advance the version of each resource for each company (and overall) in the caller's transaction
+        
+        Resources are 'companies', 'news', 'filings' and 'sentiment'.
+        """
+        cursor.executemany(
+            '''INSERT INTO data_versions (resource, company_id, version) VALUES (?, ?, 1) 
+            ON CONFLICT (resource, company_id) DO UPDATE SET version = version + 1''',
+            [(resource, company_id) for resource in resources
+             for company_id in {0, *company_ids} if company_id is not None]
+        )
+    
+    @staticmethod
+    def _rebuild_sentiment_rollups(cursor):
+        """Recompute every weekly and monthly rollup from the daily rows"""
+        cursor.execute("DELETE FROM sentiment_rollups")
+        for resolution, period in (('week', "date(analysis_date, 'weekday 0', '-6 days')"),
+                                   ('month', "date(analysis_date, 'start of month')")):
+            cursor.execute(
+                f'''INSERT INTO sentiment_rollups 
+                (company_id, resolution, period_start, total_articles, positive_count, negative_count, neutral_count) 
+                SELECT company_id, ?, {period}, SUM(total_articles), SUM(positive_count), SUM(negative_count), SUM(neutral_count) 
+                FROM sentiment_results 
+                WHERE {period} IS NOT NULL 
+                GROUP BY company_id, {period}''',
+                (resolution,)
+            )
+    
+    @staticmethod
+    def _add_to_sentiment_rollups(cursor, aggregates):
+        """Add (company_id, analysis_date, total, positive, negative, neutral) daily counts to the rollups"""
+        rollups = {}
+        for company_id, analysis_date, *counts in aggregates:
+            try:
+                day = date.fromisoformat(str(analysis_date)[:10])
+            except ValueError:
+                continue
+            for resolution in ('week', 'month'):
+                key = (company_id, resolution, sentiment_period_start(day, resolution).isoformat())
+                totals = rollups.setdefault(key, [0, 0, 0, 0])
+                for i, count in enumerate(counts):
+                    totals[i] += count or 0
+        cursor.executemany(
+            '''INSERT INTO sentiment_rollups 
+            (company_id, resolution, period_start, total_articles, positive_count, negative_count, neutral_count) 
+            VALUES (?, ?, ?, ?, ?, ?, ?) 
+            ON CONFLICT (company_id, resolution, period_start) DO UPDATE SET 
+            total_articles = total_articles + excluded.total_articles, 
+            positive_count = positive_count + excluded.positive_count, 
+            negative_count = negative_count + excluded.negative_count, 
+            neutral_count = neutral_count + excluded.neutral_count''',
+            [(*key, *totals) for key, totals in rollups.items()]
+        )
+    
+    def get_data_version(self, company_ids=None, resources=None):
+        """Version number that changes whenever data of any of company_ids is written
+        
+        Versions only grow, so the sum over a set of companies changes with
+        any of them; company_ids=None gives the overall version. resources
+        limits it to writes of those resources (default: all).
+        """
+        try:
+            conditions, params = [], []
+            if company_ids is None:
+                conditions.append("company_id = 0")
+            else:
+                conditions.append("company_id IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps([int(company_id) for company_id in company_ids]))
+            if resources is not None:
+                conditions.append("resource IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(resources)))
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"SELECT COALESCE(SUM(version), 0) FROM data_versions WHERE {' AND '.join(conditions)}",
+                    params
+                )
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Failed to get data version: {str(e)}")
+            return None
+    
+    def add_company(self, name, ticker, cik):
+        """Add a company to the database"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT OR IGNORE INTO companies (name, ticker, cik) VALUES (?, ?, ?)",
+                    (name, ticker, cik)
+                )
+                self._bump_versions(cursor, ('companies',), ())
+                conn.commit()
+                return cursor.lastrowid
+        except Exception as e:
+            logger.error(f"Failed to add company {name}: {str(e)}")
+            return None
+    
+    def add_companies(self, companies):
+        """Add many (name, ticker, cik) companies in one transaction, skipping existing tickers"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO companies (name, ticker, cik) VALUES (?, ?, ?)",
+                    companies
+                )
+                rowcount = cursor.rowcount
+                self._bump_versions(cursor, ('companies',), ())
+                conn.commit()
+                return rowcount
+        except Exception as e:
+            logger.error(f"Failed to add companies: {str(e)}")
+            return 0
+    
+    def add_sec_filing(self, company_id, filing_type, filing_date, file_path, content_length, sections):
+        """Add SEC filing to database"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''INSERT INTO sec_filings 
+                    (company_id, filing_type, filing_date, file_path, content_length, sections) 
+                    VALUES (?, ?, ?, ?, ?, ?)''',
+                    (company_id, filing_type, filing_date, str(file_path), content_length, json.dumps(sections))
+                )
+                filing_id = cursor.lastrowid
+                self._bump_versions(cursor, ('filings',), (company_id,))
+                conn.commit()
+                return filing_id
+        except Exception as e:
+            logger.error(f"Failed to add SEC filing: {str(e)}")
+            return None
+    
+    def add_news_article(self, company_id, title, excerpt, content, published_date, source, url, 
+                         sentiment_score=None, sentiment_label=None):
+        """Add news article to database"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''INSERT INTO news_articles 
+                    (company_id, title, excerpt, content, published_date, source, url, sentiment_score, sentiment_label) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (company_id, title, excerpt, content, published_date, source, url, sentiment_score, sentiment_label)
+                )
+                article_id = cursor.lastrowid
+                self._bump_versions(cursor, ('news',), (company_id,))
+                conn.commit()
+                return article_id
+        except Exception as e:
+            logger.error(f"Failed to add news article: {str(e)}")
+            return None
+    
+    def add_news_articles(self, company_id, articles):
+        """Add a batch of scraped articles in one transaction, returning their IDs
+        
+        An article whose link is already stored for the company (or repeats
+        one earlier in the batch) is skipped and gets None instead of an ID,
+        so feeds re-read every cycle and the seeded mock articles are stored
+        once. Articles without a link ("" or "#") are always added.
+        Content starts out empty ("") until the content fetcher fills it in.
+        An article's 'fingerprint' and the links in its 'sources' (the
+        syndicated copies merged into it) are stored with it.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                links = [article.get('link', '') for article in articles]
+                cursor.execute(
+                    "SELECT url FROM news_articles WHERE company_id = ? AND url IN (SELECT value FROM json_each(?))",
+                    (company_id, json.dumps([link for link in links if link not in ('', '#')]))
+                )
+                stored = {row[0] for row in cursor.fetchall()}
+                article_ids = []
+                for article, link in zip(articles, links):
+                    if link not in ('', '#'):
+                        if link in stored:
+                            article_ids.append(None)
+                            continue
+                        stored.add(link)
+                    cursor.execute(
+                        '''INSERT INTO news_articles 
+                        (company_id, title, excerpt, content, published_date, source, url, fingerprint) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                        (company_id, article['title'], article.get('excerpt', ''), article.get('content', ''),
+                         article.get('date'), article['source'], article.get('link', ''), article.get('fingerprint'))
+                    )
+                    article_ids.append(cursor.lastrowid)
+                    self._insert_article_sources(
+                        cursor, [(cursor.lastrowid, copy['source'], copy['link']) for copy in article.get('sources', ())]
+                    )
+                if any(article_id is not None for article_id in article_ids):
+                    self._bump_versions(cursor, ('news',), (company_id,))
+                conn.commit()
+                return article_ids
+        except Exception as e:
+            logger.error(f"Failed to add news articles: {str(e)}")
+            return []
+    
+    @staticmethod
+    def _insert_article_sources(cursor, rows):
+        cursor.executemany(
+            "INSERT OR IGNORE INTO news_article_sources (article_id, source, url) VALUES (?, ?, ?)",
+            [(article_id, source, url) for article_id, source, url in rows if url not in (None, '', '#')]
+        )
+    
+    def add_article_sources(self, rows):
+        """Record (article_id, source, url) links of syndicated copies of stored articles"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                self._insert_article_sources(conn.cursor(), rows)
+                conn.commit()
+                return len(rows)
+        except Exception as e:
+            logger.error(f"Failed to add article sources: {str(e)}")
+            return 0
+    
+    def get_article_sources(self, article_id):
+        """(source, url) of every copy of a stored story, its own link included"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return conn.execute(
+                    "SELECT source, url FROM news_article_sources WHERE article_id = ? ORDER BY rowid",
+                    (article_id,)
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get article sources: {str(e)}")
+            return []
+    
+    def get_recent_fingerprints(self, limit):
+        """(article_id, fingerprint) of the newest fingerprinted articles, oldest first"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    '''SELECT id, fingerprint FROM news_articles 
+                    WHERE fingerprint IS NOT NULL ORDER BY id DESC LIMIT ?''',
+                    (limit,)
+                ).fetchall()
+            rows.reverse()
+            return rows
+        except Exception as e:
+            logger.error(f"Failed to get article fingerprints: {str(e)}")
+            return []
+    
+    def add_news_articles_bulk(self, rows):
+        """Insert many articles in one transaction without reading back IDs
+        
+        rows are (company_id, title, excerpt, content, published_date, source, url).
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    '''INSERT INTO news_articles 
+                    (company_id, title, excerpt, content, published_date, source, url) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    rows
+                )
+                rowcount = cursor.rowcount
+                self._bump_versions(cursor, ('news',), {row[0] for row in rows})
+                conn.commit()
+                return rowcount
+        except Exception as e:
+            logger.error(f"Failed to bulk add news articles: {str(e)}")
+            return 0
+    
+    def update_article_contents(self, rows):
+        """Write back fetched article text; rows are (content, article_id)
+        
+        A NULL content marks an article whose page could not be fetched.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany("UPDATE news_articles SET content = ? WHERE id = ?", rows)
+                conn.commit()
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Failed to update article contents: {str(e)}")
+            return 0
+    
+    def get_articles_missing_content(self, limit=100):
+        """Get (id, url) of the newest articles whose content has not been fetched yet"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''SELECT id, url FROM news_articles 
+                    WHERE content = '' AND url LIKE 'http%' 
+                    ORDER BY id DESC 
+                    LIMIT ?''',
+                    (limit,)
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get articles missing content: {str(e)}")
+            return []
+    
+    def add_sentiment_result(self, company_id, analysis_date, total_articles, 
+                            positive_count, negative_count, neutral_count):
+        """Set a company's sentiment counts for a day, replacing any earlier counts for that day
+        
+        The rollups move by the difference, so they stay the sums of the daily rows.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                counts = (total_articles, positive_count, negative_count, neutral_count)
+                previous = cursor.execute(
+                    '''SELECT total_articles, positive_count, negative_count, neutral_count 
+                    FROM sentiment_results WHERE company_id = ? AND analysis_date = ?''',
+                    (company_id, analysis_date)
+                ).fetchone() or (0, 0, 0, 0)
+                cursor.execute(
+                    '''INSERT INTO sentiment_results 
+                    (company_id, analysis_date, total_articles, positive_count, negative_count, neutral_count) 
+                    VALUES (?, ?, ?, ?, ?, ?) 
+                    ON CONFLICT (company_id, analysis_date) DO UPDATE SET 
+                    total_articles = excluded.total_articles, 
+                    positive_count = excluded.positive_count, 
+                    negative_count = excluded.negative_count, 
+                    neutral_count = excluded.neutral_count''',
+                    (company_id, analysis_date, *counts)
+                )
+                result_id = cursor.execute(
+                    "SELECT id FROM sentiment_results WHERE company_id = ? AND analysis_date = ?",
+                    (company_id, analysis_date)
+                ).fetchone()[0]
+                self._add_to_sentiment_rollups(
+                    cursor, [(company_id, analysis_date,
+                              *((new or 0) - (old or 0) for new, old in zip(counts, previous)))]
+                )
+                self._bump_versions(cursor, ('sentiment',), (company_id,))
+                conn.commit()
+                return result_id
+        except Exception as e:
+            logger.error(f"Failed to add sentiment result: {str(e)}")
+            return None
+    
+    def get_unscored_articles(self, after_id=0, limit=1000):
+        """Get the next page of articles without a sentiment label, by id (keyset pagination)
+        
+        Returns (id, company_id, title, excerpt, published_date, created_at) rows.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''SELECT id, company_id, title, excerpt, published_date, created_at 
+                    FROM news_articles 
+                    WHERE sentiment_label IS NULL AND id > ? 
+                    ORDER BY id 
+                    LIMIT ?''',
+                    (after_id, limit)
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get unscored articles: {str(e)}")
+            return []
+    
+    def save_article_sentiments(self, scores, aggregates):
+        """Write article scores and add them to the daily aggregates in one transaction
+        
+        scores are (sentiment_score, sentiment_label, published_day, article_id);
+        aggregates are (company_id, analysis_date, total, positive, negative, neutral)
+        and are added to any existing row for that company and day.
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    '''UPDATE news_articles 
+                    SET sentiment_score = ?, sentiment_label = ?, published_day = ? 
+                    WHERE id = ?''',
+                    scores
+                )
+                cursor.executemany(
+                    '''INSERT INTO sentiment_results 
+                    (company_id, analysis_date, total_articles, positive_count, negative_count, neutral_count) 
+                    VALUES (?, ?, ?, ?, ?, ?) 
+                    ON CONFLICT (company_id, analysis_date) DO UPDATE SET 
+                    total_articles = total_articles + excluded.total_articles, 
+                    positive_count = positive_count + excluded.positive_count, 
+                    negative_count = negative_count + excluded.negative_count, 
+                    neutral_count = neutral_count + excluded.neutral_count''',
+                    aggregates
+                )
+                self._add_to_sentiment_rollups(cursor, aggregates)
+                self._bump_versions(cursor, ('news', 'sentiment'), {aggregate[0] for aggregate in aggregates})
+                conn.commit()
+                return len(scores)
+        except Exception as e:
+            logger.error(f"Failed to save article sentiments: {str(e)}")
+            return 0
+    
+    def get_company_id(self, ticker):
+        """Get company ID by ticker symbol"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT id FROM companies WHERE ticker = ?",
+                    (ticker,)
+                )
+                result = cursor.fetchone()
+                return result[0] if result else None
+        except Exception as e:
+            logger.error(f"Failed to get company ID for {ticker}: {str(e)}")
+            return None
+    
+    def get_companies(self):
+        """Get (id, name, ticker) of every company, ordered by name"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, name, ticker FROM companies ORDER BY name")
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get companies: {str(e)}")
+            return []
+    
+    def get_company_news(self, company_id, limit=10, after=None):
+        """Get (title, excerpt, published_date, source, url, sentiment_label, id) of a company's newest articles
+        
+        Ordered by published_date, id descending (undated articles last).
+        after is the (published_date, id) of the last row of the previous
+        page; the next page is then one index range scan, however deep.
+        """
+        try:
+            return list(self.iter_company_news(company_id, limit, after))
+        except Exception:
+            return []
+    
+    def iter_company_news(self, company_id, limit=None, after=None, chunk_size=1000):
+        """Same rows as get_company_news, streamed from the cursor; limit=None reads to the end
+        
+        Unlike get_company_news, a database error is raised, also mid-stream.
+        """
+        conditions, params = ["company_id = ?"], [company_id]
+        if after is not None:
+            after_date, after_id = after
+            if after_date is None:
+                conditions.append("published_date IS NULL AND id < ?")
+                params.append(after_id)
+            else:
+                conditions.append("((published_date, id) < (?, ?) OR published_date IS NULL)")
+                params.extend([after_date, after_id])
+        params.append(-1 if limit is None else limit)
+        yield from self._iter_rows(
+            f'''SELECT title, excerpt, published_date, source, url, sentiment_label, id 
+            FROM news_articles 
+            WHERE {' AND '.join(conditions)} 
+            ORDER BY published_date DESC, id DESC 
+            LIMIT ?''',
+            params, chunk_size, f"news for company {company_id}"
+        )
+    
+    def get_company_filings(self, company_id, limit=None, after=None):
+        """Get (filing_type, filing_date, file_path, content_length, id) of a company's filings, newest first
+        
+        after is the (filing_date, id) of the last row of the previous page.
+        """
+        try:
+            return list(self.iter_company_filings(company_id, limit, after))
+        except Exception:
+            return []
+    
+    def iter_company_filings(self, company_id, limit=None, after=None, chunk_size=1000):
+        """Same rows as get_company_filings, streamed from the cursor; limit=None reads to the end (errors raise)"""
+        conditions, params = ["company_id = ?"], [company_id]
+        if after is not None:
+            conditions.append("(filing_date, id) < (?, ?)")
+            params.extend(after)
+        params.append(-1 if limit is None else limit)
+        yield from self._iter_rows(
+            f'''SELECT filing_type, filing_date, file_path, content_length, id 
+            FROM sec_filings 
+            WHERE {' AND '.join(conditions)} 
+            ORDER BY filing_date DESC, id DESC 
+            LIMIT ?''',
+            params, chunk_size, f"filings for company {company_id}"
+        )
+    
+    def _iter_rows(self, query, params, chunk_size, description):
+        """Yield a query's rows one fetchmany page at a time, holding one page in memory
+        
+        Streaming responses may resume the generator on a different worker
+        thread, so the connection is not tied to the thread that opened it
+        (the generator is never advanced concurrently). Errors are logged and
+        re-raised: a stream cut short must not look like a complete one.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception as e:
+            logger.error(f"Failed to get {description}: {str(e)}")
+            raise
+        finally:
+            conn.close()
+    
+    def get_company_news_batch(self, company_ids, limit=10):
+        """Get {company_id: rows like get_company_news} for many companies in one query
+        
+        ROW_NUMBER() over each company's articles keeps its newest limit,
+        instead of one LIMIT query per company.
+        """
+        news = {company_id: [] for company_id in company_ids}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''SELECT company_id, title, excerpt, published_date, source, url, sentiment_label, id 
+                    FROM (
+                        SELECT *, ROW_NUMBER() OVER (
+                            PARTITION BY company_id ORDER BY published_date DESC, id DESC
+                        ) AS position 
+                        FROM news_articles 
+                        WHERE company_id IN (SELECT value FROM json_each(?))
+                    ) 
+                    WHERE position <= ? 
+                    ORDER BY company_id, position''',
+                    (json.dumps([int(company_id) for company_id in company_ids]), limit)
+                )
+                for row in cursor:
+                    news[row[0]].append(row[1:])
+        except Exception as e:
+            logger.error(f"Failed to get news for companies {list(company_ids)}: {str(e)}")
+        return news
+    
+    def find_companies(self, company_ids=(), tickers=()):
+        """Get (id, name, ticker) of the companies matching any of the IDs or tickers, ordered by name"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    '''SELECT id, name, ticker FROM companies 
+                    WHERE id IN (SELECT value FROM json_each(?)) 
+                    OR ticker IN (SELECT value FROM json_each(?)) 
+                    ORDER BY name''',
+                    (json.dumps([int(company_id) for company_id in company_ids]),
+                     json.dumps([ticker.upper() for ticker in tickers]))
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to find companies: {str(e)}")
+            return []
+    
+    def get_company_ids(self):
+        """Map every ticker to its company ID"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT ticker, id FROM companies")
+                return dict(cursor.fetchall())
+        except Exception as e:
+            logger.error(f"Failed to get company IDs: {str(e)}")
+            return {}
+    
+    def get_sentiment_history(self, company_ids=None, days=30):
+        """Get daily sentiment rows for many companies in one query, oldest first per company
+        
+        Returns (company_id, analysis_date, total_articles, positive_count,
+        negative_count, neutral_count) rows ordered by company_id, analysis_date.
+        The ID list is passed as one JSON parameter, so any number of companies
+        costs a single statement served from the (company_id, analysis_date) index.
+        company_ids=None means every company and days=None the whole history.
+        """
+        return [row for rows in self.iter_sentiment_history(company_ids, days) for row in rows]
+    
+    def iter_sentiment_history(self, company_ids=None, days=30, chunk_size=50000, resolution='day'):
+        """Same rows as get_sentiment_history, yielded in lists of up to chunk_size
+        
+        With resolution 'week' or 'month' the rows are the rollups instead,
+        one per period (dated by its first day) overlapping the last N days.
+        """
+        try:
+            table, day_column = 'sentiment_results', 'analysis_date'
+            conditions, params = [], []
+            if resolution != 'day':
+                table, day_column = 'sentiment_rollups', 'period_start'
+                conditions.append("resolution = ?")
+                params.append(resolution)
+            if company_ids is not None:
+                conditions.append("company_id IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps([int(company_id) for company_id in company_ids]))
+            if days is not None:
+                since = sentiment_period_start(date.today() - timedelta(days=days), resolution)
+                conditions.append(f"{day_column} >= ?")
+                params.append(since.isoformat())
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f'''SELECT company_id, {day_column}, total_articles, positive_count, negative_count, neutral_count 
+                    FROM {table} {where} 
+                    ORDER BY company_id, {day_column}''',
+                    params
+                )
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+        except Exception as e:
+            logger.error(f"Failed to get sentiment history: {str(e)}")
+    
+    def get_filing_dates(self, company_ids=None, filing_types=None, days=None):
+        """Get (company_id, filing_type, filing_date) rows ordered by company_id, filing_date
+        
+        Each filter is optional: None means all companies, all filing types
+        or the whole history.
+        """
+        try:
+            conditions, params = [], []
+            if company_ids is not None:
+                conditions.append("company_id IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps([int(company_id) for company_id in company_ids]))
+            if filing_types is not None:
+                conditions.append("filing_type IN (SELECT value FROM json_each(?))")
+                params.append(json.dumps(list(filing_types)))
+            if days is not None:
+                conditions.append("filing_date >= date('now', ?)")
+                params.append(f'-{days} days')
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f'''SELECT company_id, filing_type, filing_date FROM sec_filings {where} 
+                    ORDER BY company_id, filing_date''',
+                    params
+                )
+                return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to get filing dates: {str(e)}")
+            return []
+    
+    def get_latest_sentiment(self, company_id, days=30, resolution=None, max_points=None):
+        """Get sentiment results for a company for the last N days, newest first
+        
+        resolution is 'day', 'week' or 'month'; by default the finest one
+        that fits the range into max_points (settings.SENTIMENT_POINT_BUDGET)
+        rows, so long ranges read the weekly or monthly rollups.
+        """
+        return self.get_latest_sentiment_batch([company_id], days, resolution, max_points)[company_id]
+    
+    def get_latest_sentiment_batch(self, company_ids, days=30, resolution=None, max_points=None):
+        """Get {company_id: rows like get_latest_sentiment} for many companies in one query"""
+        resolution = resolution or choose_sentiment_resolution(days, max_points)
+        sentiment = {company_id: [] for company_id in company_ids}
+        for rows in self.iter_sentiment_history(company_ids, days, resolution=resolution):
+            for row in rows:
+                sentiment[row[0]].append(row[1:])
+        for rows in sentiment.values():
+            rows.reverse()
+        return sentiment
\ No newline at end of file
@@ -0,0 +1,220 @@
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+from config import settings
+
+
+class NewsSegmentStore:
+    """Append-only NDJSON segment store for raw news
+
+    Layout: <root>/<TICKER>/<YYYY-MM-DD>/<segment>.ndjson[.gz] plus an
+    index.json per ticker/day. Writers append new articles to the day's
+    active segment; once it reaches max_segment_bytes it is sealed
+    (gzip-compressed if enabled) and a new one is started. The index records
+    each segment's record count and a sparse table of record byte offsets,
+    so readers can open only the days and segments they need and seek to a
+    record without scanning from the start.
+
+    Segment data is fsynced before the index that describes it is written
+    (itself fsynced, then atomically replaced), so the index never points
+    past data on disk. Records written after the last index update by an
+    interrupted append are recovered into the index by the next append.
+
+    Bulk loads that can simply be rerun after a crash may pass durable=False
+    to skip the per-append fsyncs and call sync() once when done.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root=None, max_segment_bytes=None, compress=None, index_stride=None, durable=True):
+        self.root = root or settings.NEWS_STORE_PATH
+        self.max_segment_bytes = max_segment_bytes or settings.NEWS_SEGMENT_MAX_BYTES
+        self.compress = settings.NEWS_SEGMENT_COMPRESS if compress is None else compress
+        self.index_stride = index_stride or settings.NEWS_INDEX_STRIDE
+        self.durable = durable
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _day_path(self, ticker, day):
+        return self.root / ticker / day
+
+    def load_index(self, ticker, day):
+        """Return the index for a ticker/day ({'stride': n, 'segments': [...]})"""
+        index_file = self._day_path(ticker, day) / self.INDEX_FILE
+        if not index_file.exists():
+            return {"stride": self.index_stride, "segments": []}
+        with open(index_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_index(self, ticker, day, index):
+        index_file = self._day_path(ticker, day) / self.INDEX_FILE
+        tmp_file = index_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+            self._sync(f)
+        os.replace(tmp_file, index_file)
+
+    def _new_segment(self, index):
+        first_record = sum(segment["records"] for segment in index["segments"])
+        segment = {
+            "name": f"{len(index['segments']):06d}.ndjson",
+            "first_record": first_record,
+            "records": 0,
+            "bytes": 0,
+            "sealed": False,
+            "offsets": []
+        }
+        index["segments"].append(segment)
+        return segment
+
+    def _seal(self, day_path, segment):
+        """Close a full segment, compressing it if configured"""
+        if self.compress:
+            plain_path = day_path / segment["name"]
+            with open(plain_path, "rb") as src, open(day_path / (segment["name"] + ".gz"), "wb") as raw:
+                with gzip.GzipFile(segment["name"], "wb", fileobj=raw) as dst:
+                    dst.write(src.read())
+                self._sync(raw)
+            plain_path.unlink()
+            segment["name"] += ".gz"
+        segment["sealed"] = True
+
+    def _sync(self, f):
+        f.flush()
+        if self.durable:
+            os.fsync(f.fileno())
+
+    def sync(self):
+        """Flush everything written by a non-durable store to disk"""
+        os.sync()
+
+    def _recover(self, day_path, index):
+        """Bring the active segment's index entry in line with its file
+
+        An append interrupted after writing records but before writing the
+        index leaves records (and possibly a torn last line) past the
+        indexed bytes, or a segment sealed on disk but not in the index.
+        Complete records are indexed; a torn line is truncated away. A file
+        for the next segment that the index never recorded (the first append
+        of a day was interrupted) is indexed the same way.
+        """
+        if index["segments"] and not index["segments"][-1]["sealed"]:
+            segment = index["segments"][-1]
+        elif (day_path / f"{len(index['segments']):06d}.ndjson").exists():
+            segment = self._new_segment(index)
+        else:
+            return
+        path = day_path / segment["name"]
+        if not path.exists() and (day_path / (segment["name"] + ".gz")).exists():
+            segment["name"] += ".gz"
+            segment["sealed"] = True
+            path = day_path / segment["name"]
+        elif not path.exists() or path.stat().st_size == segment["bytes"]:
+            return
+
+        with self._open_segment(day_path, segment) as f:
+            f.seek(segment["bytes"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn write
+                if segment["records"] % index["stride"] == 0:
+                    segment["offsets"].append(segment["bytes"])
+                segment["records"] += 1
+                segment["bytes"] += len(line)
+        if not segment["sealed"]:
+            os.truncate(path, segment["bytes"])
+
+    def append(self, ticker, articles, day=None):
+        """Append articles to the ticker's segment for day (default: today, UTC)
+
+        Cost is proportional to the number of new articles.
+        """
+        day = day or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        day_path = self._day_path(ticker, day)
+        day_path.mkdir(parents=True, exist_ok=True)
+
+        index = self.load_index(ticker, day)
+        self._recover(day_path, index)
+        segment = index["segments"][-1] if index["segments"] else None
+        if segment is None or segment["sealed"]:
+            segment = self._new_segment(index)
+
+        written = 0
+        f = open(day_path / segment["name"], "ab")
+        try:
+            for article in articles:
+                line = (json.dumps(article, ensure_ascii=False) + "\n").encode("utf-8")
+                if segment["records"] % index["stride"] == 0:
+                    segment["offsets"].append(segment["bytes"])
+                f.write(line)
+                segment["records"] += 1
+                segment["bytes"] += len(line)
+                written += 1
+
+                if segment["bytes"] >= self.max_segment_bytes:
+                    self._sync(f)
+                    f.close()
+                    self._seal(day_path, segment)
+                    segment = self._new_segment(index)
+                    f = open(day_path / segment["name"], "ab")
+                    # Record the sealed segment before writing to the next one
+                    self._write_index(ticker, day, index)
+            self._sync(f)
+        finally:
+            f.close()
+
+        # Don't leave an empty active segment behind
+        if segment["records"] == 0:
+            index["segments"].remove(segment)
+            (day_path / segment["name"]).unlink(missing_ok=True)
+        self._write_index(ticker, day, index)
+        return written
+
+    def days(self, ticker, since=None, until=None):
+        """Sorted days with data for ticker, optionally bounded (inclusive, YYYY-MM-DD)"""
+        ticker_path = self.root / ticker
+        if not ticker_path.exists():
+            return []
+        return sorted(
+            path.name for path in ticker_path.iterdir()
+            if path.is_dir()
+            and (since is None or path.name >= since)
+            and (until is None or path.name <= until)
+        )
+
+    def _open_segment(self, day_path, segment):
+        name = segment["name"]
+        if not segment["sealed"] and not (day_path / name).exists():
+            name += ".gz"  # sealed by an append interrupted before it updated the index
+        if name.endswith(".gz"):
+            return gzip.open(day_path / name, "rb")
+        return open(day_path / name, "rb")
+
+    def iter_day(self, ticker, day, start_record=0):
+        """Stream a day's articles, starting at record number start_record"""
+        day_path = self._day_path(ticker, day)
+        index = self.load_index(ticker, day)
+        for segment in index["segments"]:
+            segment_end = segment["first_record"] + segment["records"]
+            if segment_end <= start_record:
+                continue  # whole segment is before the requested record
+
+            skip = max(0, start_record - segment["first_record"])
+            with self._open_segment(day_path, segment) as f:
+                first = 0
+                if skip and segment["offsets"]:
+                    # Seek to the closest indexed record, then skip the rest line by line
+                    slot = min(skip // index["stride"], len(segment["offsets"]) - 1)
+                    f.seek(segment["offsets"][slot])
+                    first = slot * index["stride"]
+                for record, line in enumerate(f, first):
+                    if record >= segment["records"]:
+                        break  # not indexed yet: a concurrent or interrupted append
+                    if record >= skip and line.strip():
+                        yield json.loads(line)
+
+    def iter_articles(self, ticker, since=None, until=None):
+        """Stream all of a ticker's articles in the given day range"""
+        for day in self.days(ticker, since, until):
+            yield from self.iter_day(ticker, day)
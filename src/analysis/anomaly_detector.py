@@ -0,0 +1,232 @@
+import queue
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import requests
+
+from config import settings
+from utils.logger import logger
+
+
+class WebhookSender:
+    """Background thread that POSTs anomalies to webhook URLs
+
+    send() only queues the anomaly, so a slow or unreachable endpoint never
+    holds up the sentiment write path. When the bounded queue is full the
+    anomaly is dropped from the webhooks (it is still in the anomalies
+    table). One session is reused, keeping connections to each endpoint open.
+    """
+
+    def __init__(self, urls, queue_size=None, session=None):
+        self.urls = list(urls)
+        self.queue = queue.Queue(maxsize=queue_size or settings.SENTIMENT_ANOMALY_WEBHOOK_QUEUE_SIZE)
+        self.session = session or requests.Session()
+        self.thread = None
+        self.stats = {'queued': 0, 'dropped': 0, 'sent': 0, 'failed': 0}
+
+    def start(self):
+        """Start the sender thread if it is not already running"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="anomaly-webhooks", daemon=True)
+            self.thread.start()
+
+    def send(self, anomaly):
+        """Queue an anomaly for every webhook without blocking; False if dropped"""
+        try:
+            self.queue.put_nowait(anomaly)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            logger.warning(f"Anomaly webhook queue full, dropped {anomaly['company_id']} {anomaly['day']}")
+            return False
+        self.stats['queued'] += 1
+        self.start()
+        return True
+
+    def close(self, timeout=None):
+        """Send what is queued and stop the sender thread"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        while True:
+            anomaly = self.queue.get()
+            if anomaly is None:
+                return
+            for url in self.urls:
+                try:
+                    response = self.session.post(url, json=anomaly, timeout=settings.SENTIMENT_ANOMALY_WEBHOOK_TIMEOUT)
+                    response.raise_for_status()
+                    self.stats['sent'] += 1
+                except requests.RequestException as e:
+                    self.stats['failed'] += 1
+                    logger.error(f"Anomaly webhook {url} failed: {str(e)}")
+
+
+class StreamingAnomalyDetector:
+    """Flags unusual sentiment days as scored articles arrive
+
+    Attached to RollingSentimentStats, it sees each company's state right
+    after a batch is folded in. For every day the batch touched, the day's
+    mean compound score is compared with the mean and standard deviation of
+    the other days' means in the rolling window (the day buckets the state
+    already keeps), so a check costs O(window) whatever the history length.
+    A day whose z-score exceeds threshold is written to the anomalies table
+    and, the first time it is flagged, pushed to subscribers and queued for
+    the webhooks, which a WebhookSender thread POSTs; call close() to send
+    what is still queued.
+    """
+
+    def __init__(self, db, threshold=None, min_days=None, min_articles=None, webhooks=None):
+        self.db_path = db.db_path
+        self.threshold = threshold or settings.SENTIMENT_ANOMALY_THRESHOLD
+        self.min_days = min_days or settings.SENTIMENT_ANOMALY_MIN_DAYS
+        self.min_articles = min_articles or settings.SENTIMENT_ANOMALY_MIN_ARTICLES
+        self.webhooks = list(settings.SENTIMENT_ANOMALY_WEBHOOKS if webhooks is None else webhooks)
+        self.sender = WebhookSender(self.webhooks) if self.webhooks else None
+        self.subscribers = []
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS anomalies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    company_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    baseline_mean REAL NOT NULL,
+                    baseline_std REAL NOT NULL,
+                    z_score REAL NOT NULL,
+                    articles INTEGER NOT NULL,
+                    direction TEXT NOT NULL,
+                    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE (company_id, day),
+                    FOREIGN KEY (company_id) REFERENCES companies (id)
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_anomalies_day ON anomalies(day)")
+
+    def subscribe(self, callback):
+        """Call callback(anomaly dict) for every newly flagged day"""
+        self.subscribers.append(callback)
+
+    def evaluate(self, company_id, state, day):
+        """Anomaly dict for one company-day, or None if the day looks normal"""
+        if state.last_day is None:
+            return None
+        days_back = (state.last_day - day).days
+        if not 0 <= days_back < state.window_days:
+            return None
+
+        counts = state.buckets[:, 0]
+        means = state.buckets[:, 1]
+        slot = day.toordinal() % state.window_days
+        articles = int(counts[slot])
+        if articles < self.min_articles:
+            return None
+
+        others = counts > 0
+        others[slot] = False
+        baseline = means[others]
+        if len(baseline) < self.min_days:
+            return None
+        baseline_mean = float(baseline.mean())
+        baseline_std = float(baseline.std(ddof=1))
+        if baseline_std == 0:
+            return None
+
+        score = float(means[slot])
+        z_score = (score - baseline_mean) / baseline_std
+        if abs(z_score) <= self.threshold:
+            return None
+        return {
+            'company_id': company_id,
+            'day': day.isoformat(),
+            'score': score,
+            'baseline_mean': baseline_mean,
+            'baseline_std': baseline_std,
+            'z_score': z_score,
+            'articles': articles,
+            'direction': "up" if z_score > 0 else "down"
+        }
+
+    def observe(self, states, observations):
+        """RollingSentimentStats listener: check every (company, day) in the batch"""
+        touched = {(company_id, day) for company_id, day, _ in observations}
+        anomalies = []
+        for company_id, day in sorted(touched):
+            anomaly = self.evaluate(company_id, states[company_id], date.fromisoformat(day))
+            if anomaly:
+                anomalies.append(anomaly)
+        if anomalies:
+            new = self.save(anomalies)
+            for anomaly in new:
+                self.notify(anomaly)
+        return anomalies
+
+    def save(self, anomalies):
+        """Upsert anomalies; returns the ones not flagged before"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                existing = set()
+                for anomaly in anomalies:
+                    if conn.execute("SELECT 1 FROM anomalies WHERE company_id = ? AND day = ?",
+                                    (anomaly['company_id'], anomaly['day'])).fetchone():
+                        existing.add((anomaly['company_id'], anomaly['day']))
+                conn.executemany(
+                    '''INSERT INTO anomalies
+                    (company_id, day, score, baseline_mean, baseline_std, z_score, articles, direction)
+                    VALUES (:company_id, :day, :score, :baseline_mean, :baseline_std, :z_score, :articles, :direction)
+                    ON CONFLICT (company_id, day) DO UPDATE SET
+                        score = excluded.score,
+                        baseline_mean = excluded.baseline_mean,
+                        baseline_std = excluded.baseline_std,
+                        z_score = excluded.z_score,
+                        articles = excluded.articles,
+                        direction = excluded.direction''',
+                    anomalies
+                )
+                conn.commit()
+            return [anomaly for anomaly in anomalies if (anomaly['company_id'], anomaly['day']) not in existing]
+        except Exception as e:
+            logger.error(f"Failed to save anomalies: {str(e)}")
+            return []
+
+    def notify(self, anomaly):
+        """Push one anomaly to subscribers and queue it for the webhooks; failures are logged, never raised"""
+        for callback in self.subscribers:
+            try:
+                callback(anomaly)
+            except Exception as e:
+                logger.error(f"Anomaly subscriber failed: {str(e)}")
+        if self.sender:
+            self.sender.send(anomaly)
+
+    def close(self, timeout=None):
+        """Wait for queued webhook POSTs to be sent"""
+        if self.sender:
+            self.sender.close(timeout)
+
+    def recent(self, company_id=None, days=30):
+        """Anomalies flagged for days in the last N days, newest first"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                if company_id is None:
+                    rows = conn.execute(
+                        "SELECT * FROM anomalies WHERE day >= ? ORDER BY day DESC, company_id", (since,)
+                    ).fetchall()
+                else:
+                    rows = conn.execute(
+                        "SELECT * FROM anomalies WHERE company_id = ? AND day >= ? ORDER BY day DESC",
+                        (company_id, since)
+                    ).fetchall()
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Failed to read anomalies: {str(e)}")
+            return []
@@ -0,0 +1,211 @@
+import sqlite3
+
+import numpy as np
+
+from config import settings
+from utils.logger import logger
+
+
+def sentiment_matrix(rows):
+    """Aligned date x company matrix from get_sentiment_history() rows
+
+    Returns (dates, company_ids, values): one row per calendar day from the
+    first to the last date, one column per company, float32 daily scores
+    with NaN where a company had no articles that day.
+    """
+    if not rows:
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64), np.empty((0, 0), np.float32)
+    company_column = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    day_column = np.array([row[1][:10] for row in rows], dtype='datetime64[D]')
+    counts = np.array([row[2:6] for row in rows], dtype=np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (counts[:, 1] - counts[:, 2]) / counts[:, 0]
+    scores[~np.isfinite(scores)] = np.nan
+
+    company_ids, columns = np.unique(company_column, return_inverse=True)
+    first_day = day_column.min()
+    dates = np.arange(first_day, day_column.max() + 1)
+    values = np.full((len(dates), len(company_ids)), np.nan, dtype=np.float32)
+    values[(day_column - first_day).astype(np.int64), columns] = scores
+    return dates, company_ids, values
+
+
+class PairwiseCorrelation:
+    """Pairwise-complete correlations of the rows of a date x company matrix
+
+    For a block of columns it builds, against every column, the number of
+    days both have a value and the sums needed for their correlation over
+    those days, so all pairs come out of a few matrix products instead of a
+    loop over pairs. Only one block's sums are held at a time: memory is
+    block_size x companies rather than companies x companies per sum. The
+    sums are float64: the variance is a difference of two sums of squares,
+    which float32 cannot resolve for low-variance series.
+    """
+
+    def __init__(self, n_companies, min_overlap=None, block_size=None):
+        self.n_companies = n_companies
+        self.min_overlap = min_overlap or settings.SENTIMENT_CORRELATION_MIN_OVERLAP
+        self.block_size = block_size or settings.SENTIMENT_CORRELATION_BLOCK_SIZE
+        self.rows = []
+
+    def add(self, rows):
+        """Add one row or a block of rows"""
+        self.rows.append(np.atleast_2d(rows).astype(np.float64))
+
+    def blocks(self):
+        """Yield (start, correlation, overlap) for each block of columns against all columns
+
+        correlation is NaN for pairs with fewer than min_overlap common days
+        or no variance; overlap is the number of days both have a score.
+        """
+        values = np.concatenate(self.rows) if self.rows else np.empty((0, self.n_companies))
+        present = (~np.isnan(values)).astype(np.float64)
+        filled = np.nan_to_num(values)
+        squared = filled * filled
+        for start in range(0, self.n_companies, self.block_size):
+            block = slice(start, start + self.block_size)
+            n = present[:, block].T @ present  # days both i and j have a score
+            sums = filled[:, block].T @ present  # sum of i's scores on those days
+            peer_sums = present[:, block].T @ filled  # sum of j's scores on those days
+            squares = squared[:, block].T @ present
+            peer_squares = present[:, block].T @ squared
+            covariance = n * (filled[:, block].T @ filled) - sums * peer_sums
+            variance = n * squares - sums * sums
+            peer_variance = n * peer_squares - peer_sums * peer_sums
+            # A series that is constant over the overlap has no correlation; the
+            # tolerance only absorbs float64 rounding of the two sums
+            flat = (variance <= 1e-12 * n * squares) | (peer_variance <= 1e-12 * n * peer_squares)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = covariance / np.sqrt(variance * peer_variance)
+            correlation[(n < self.min_overlap) | flat] = np.nan
+            yield start, np.clip(correlation, -1.0, 1.0), n
+
+    def correlation(self):
+        """Whole correlation matrix (companies x companies)"""
+        blocks = [correlation for _, correlation, _ in self.blocks()]
+        return np.concatenate(blocks) if blocks else np.empty((0, self.n_companies))
+
+
+def top_k_peers(correlation, k, start=0):
+    """(peer columns, correlations) of each company's k most correlated peers, best first
+
+    correlation holds the rows of companies start, start + 1, ... against
+    every company. Columns past the number of valid peers are -1 with NaN
+    correlation.
+    """
+    rows, n = correlation.shape
+    ranked = np.where(np.isnan(correlation), -np.inf, correlation)
+    own = np.arange(rows)
+    ranked[own, own + start] = -np.inf
+    k = min(k, max(n - 1, 0))
+    if k == 0:
+        return np.empty((rows, 0), dtype=np.int64), np.empty((rows, 0), dtype=np.float32)
+    candidates = np.argpartition(-ranked, k - 1, axis=1)[:, :k]
+    candidate_values = np.take_along_axis(ranked, candidates, axis=1)
+    order = np.argsort(-candidate_values, axis=1, kind='stable')
+    peers = np.take_along_axis(candidates, order, axis=1)
+    peer_values = np.take_along_axis(candidate_values, order, axis=1)
+    valid = np.isfinite(peer_values)
+    return np.where(valid, peers, -1), np.where(valid, peer_values, np.nan).astype(np.float32)
+
+
+class SentimentCorrelationEngine:
+    """Cross-company sentiment correlations with a precomputed top-k peers table
+
+    refresh() loads every company's daily scores for the last window_days
+    days in one query, aligns them into a date x company matrix and stores
+    each company's top_k most correlated peers, correlating one block of
+    companies at a time. Reads are an indexed lookup of that table, however
+    many companies there are.
+    """
+
+    def __init__(self, db, window_days=None, top_k=None, min_overlap=None):
+        self.db = db
+        self.db_path = db.db_path
+        self.window_days = window_days or settings.SENTIMENT_CORRELATION_WINDOW_DAYS
+        self.top_k = top_k or settings.SENTIMENT_CORRELATION_TOP_K
+        self.min_overlap = min_overlap or settings.SENTIMENT_CORRELATION_MIN_OVERLAP
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sentiment_peers (
+                    company_id INTEGER NOT NULL,
+                    rank INTEGER NOT NULL,
+                    peer_id INTEGER NOT NULL,
+                    correlation REAL NOT NULL,
+                    overlap_days INTEGER NOT NULL,
+                    window_end TEXT NOT NULL,
+                    PRIMARY KEY (company_id, rank),
+                    FOREIGN KEY (company_id) REFERENCES companies (id)
+                )
+            ''')
+
+    def _pairs(self, company_ids=None):
+        rows = self.db.get_sentiment_history(company_ids, self.window_days)
+        dates, ids, values = sentiment_matrix(rows)
+        pairs = PairwiseCorrelation(len(ids), self.min_overlap)
+        pairs.add(values)
+        return ids, dates, pairs
+
+    def correlation_matrix(self, company_ids=None):
+        """(company_ids, dates, correlation, overlap) for the latest window
+
+        Builds full companies x companies matrices; refresh() never does.
+        """
+        ids, dates, pairs = self._pairs(company_ids)
+        blocks = list(pairs.blocks())
+        if not blocks:
+            return ids, dates, np.empty((0, 0)), np.empty((0, 0))
+        return (ids, dates, np.concatenate([correlation for _, correlation, _ in blocks]),
+                np.concatenate([overlap for _, _, overlap in blocks]))
+
+    def refresh(self):
+        """Recompute and store every company's top-k peers; returns the number of companies"""
+        try:
+            ids, dates, pairs = self._pairs()
+            if not len(ids):
+                return 0
+            window_end = str(dates[-1])
+            rows = []
+            for start, correlation, overlap in pairs.blocks():
+                peers, peer_values = top_k_peers(correlation, self.top_k, start)
+                rows.extend(
+                    (int(ids[start + i]), rank + 1, int(ids[peer]), float(peer_values[i, rank]),
+                     int(overlap[i, peer]), window_end)
+                    for i in range(len(peers)) for rank, peer in enumerate(peers[i]) if peer >= 0
+                )
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("DELETE FROM sentiment_peers")
+                conn.executemany(
+                    '''INSERT INTO sentiment_peers
+                    (company_id, rank, peer_id, correlation, overlap_days, window_end)
+                    VALUES (?, ?, ?, ?, ?, ?)''',
+                    rows
+                )
+                conn.commit()
+            return len(ids)
+        except Exception as e:
+            logger.error(f"Failed to refresh sentiment correlations: {str(e)}")
+            return 0
+
+    def top_peers(self, company_id, k=None):
+        """Most correlated peers of a company from the last refresh, best first"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                rows = conn.execute(
+                    '''SELECT p.peer_id, c.ticker, p.correlation, p.overlap_days, p.window_end
+                    FROM sentiment_peers p LEFT JOIN companies c ON c.id = p.peer_id
+                    WHERE p.company_id = ? AND p.rank <= ?
+                    ORDER BY p.rank''',
+                    (company_id, k or self.top_k)
+                ).fetchall()
+            return [
+                {'company_id': peer_id, 'ticker': ticker, 'correlation': correlation,
+                 'overlap_days': overlap_days, 'window_end': window_end}
+                for peer_id, ticker, correlation, overlap_days, window_end in rows
+            ]
+        except Exception as e:
+            logger.error(f"Failed to read sentiment peers: {str(e)}")
+            return []
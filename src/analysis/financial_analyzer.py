@@ -1,146 +1,220 @@
-
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-from utils.logger import logger
-
-class FinancialAnalyzer:
-    """Advanced financial analysis tools"""
-    
-    def __init__(self, db):
-        self.db = db
-    
-    def calculate_sentiment_trend(self, company_id, days=30):
-        """Calculate sentiment trend for a company"""
-        try:
-            sentiment_data = self.db.get_latest_sentiment(company_id, days)
-            
-            if not sentiment_data:
-                return None
-            
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(sentiment_data, columns=[
-                'date', 'total_articles', 'positive', 'negative', 'neutral'
-            ])
-            
-            # Calculate daily sentiment score
-            df['sentiment_score'] = (df['positive'] - df['negative']) / df['total_articles']
-            
-            # Calculate moving averages
-            df['ma_7'] = df['sentiment_score'].rolling(window=7).mean()
-            df['ma_30'] = df['sentiment_score'].rolling(window=min(30, len(df))).mean()
-            
-            # Calculate trend direction
-            if len(df) >= 2:
-                recent_trend = "up" if df['sentiment_score'].iloc[-1] > df['sentiment_score'].iloc[-2] else "down"
-            else:
-                recent_trend = "stable"
-            
-            return {
-                'trend_direction': recent_trend,
-                'current_score': df['sentiment_score'].iloc[-1] if len(df) > 0 else 0,
-                'average_score': df['sentiment_score'].mean(),
-                'volatility': df['sentiment_score'].std(),
-                'data': df.to_dict('records')
-            }
-            
-        except Exception as e:
-            logger.error(f"Error calculating sentiment trend: {str(e)}")
-            return None
-    
-    def detect_anomalies(self, company_id, window=14, threshold=2.0):
-        """Detect anomalies in sentiment data"""
-        try:
-            sentiment_data = self.db.get_latest_sentiment(company_id, 90)  # 3 months data
-            
-            if not sentiment_data or len(sentiment_data) < window:
-                return None
-            
-            df = pd.DataFrame(sentiment_data, columns=[
-                'date', 'total_articles', 'positive', 'negative', 'neutral'
-            ])
-            
-            # Calculate sentiment score
-            df['sentiment_score'] = (df['positive'] - df['negative']) / df['total_articles']
-            
-            # Calculate rolling mean and standard deviation
-            df['rolling_mean'] = df['sentiment_score'].rolling(window=window).mean()
-            df['rolling_std'] = df['sentiment_score'].rolling(window=window).std()
-            
-            # Detect anomalies (values outside mean ± threshold * std)
-            df['anomaly'] = np.where(
-                abs(df['sentiment_score'] - df['rolling_mean']) > threshold * df['rolling_std'],
-                1, 0
-            )
-            
-            # Get anomaly dates and values
-            anomalies = df[df['anomaly'] == 1][['date', 'sentiment_score']].to_dict('records')
-            
-            return {
-                'anomaly_count': len(anomalies),
-                'anomalies': anomalies,
-                'data': df.to_dict('records')
-            }
-            
-        except Exception as e:
-            logger.error(f"Error detecting anomalies: {str(e)}")
-            return None
-    
-    def correlate_news_filings(self, company_id, days_before=7, days_after=7):
-        """Correlate news sentiment with SEC filing dates"""
-        try:
-            # Get filing dates
-            with self.db.conn:
-                cursor = self.db.conn.cursor()
-                cursor.execute(
-                    '''SELECT filing_date FROM sec_filings 
-                    WHERE company_id = ? AND date(filing_date) >= date('now', ?) 
-                    ORDER BY filing_date DESC''',
-                    (company_id, f'-{days_before + days_after + 30} days')
-                )
-                filing_dates = [row[0] for row in cursor.fetchall()]
-            
-            # Get sentiment data
-            sentiment_data = self.db.get_latest_sentiment(company_id, days_before + days_after + 30)
-            
-            if not sentiment_data or not filing_dates:
-                return None
-            
-            df = pd.DataFrame(sentiment_data, columns=[
-                'date', 'total_articles', 'positive', 'negative', 'neutral'
-            ])
-            df['date'] = pd.to_datetime(df['date'])
-            df['sentiment_score'] = (df['positive'] - df['negative']) / df['total_articles']
-            
-            results = []
-            
-            for filing_date in filing_dates:
-                filing_date = pd.to_datetime(filing_date)
-                
-                # Get sentiment window around filing date
-                start_date = filing_date - timedelta(days=days_before)
-                end_date = filing_date + timedelta(days=days_after)
-                
-                window_data = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-                
-                if len(window_data) > 0:
-                    # Calculate pre and post-filing sentiment
-                    pre_filing = window_data[window_data['date'] < filing_date]
-                    post_filing = window_data[window_data['date'] >= filing_date]
-                    
-                    pre_avg = pre_filing['sentiment_score'].mean() if len(pre_filing) > 0 else 0
-                    post_avg = post_filing['sentiment_score'].mean() if len(post_filing) > 0 else 0
-                    
-                    results.append({
-                        'filing_date': filing_date.strftime('%Y-%m-%d'),
-                        'pre_filing_sentiment': pre_avg,
-                        'post_filing_sentiment': post_avg,
-                        'sentiment_change': post_avg - pre_avg,
-                        'data_points': len(window_data)
-                    })
-            
-            return results
-            
-        except Exception as e:
-            logger.error(f"Error correlating news and filings: {str(e)}")
-            return None
\ No newline at end of file
+
+import pandas as pd
+import numpy as np
+from utils.logger import logger
+from data.database import choose_sentiment_resolution
+from src.analysis.anomaly_detector import StreamingAnomalyDetector
+from src.analysis.correlation_matrix import SentimentCorrelationEngine
+from src.analysis.frames import (FILING_DATES, SENTIMENT_HISTORY, plain_floats, read_frame,
+                                 sentiment_scores, to_columnar, to_records)
+from src.analysis.result_cache import AnalysisResultCache, cached_analysis
+from src.analysis.rolling_stats import RollingSentimentStats
+
+class FinancialAnalyzer:
+    """Advanced financial analysis tools"""
+    
+    def __init__(self, db):
+        self.db = db
+        self.rolling_stats = RollingSentimentStats(db)
+        self.anomaly_detector = StreamingAnomalyDetector(db)
+        self.result_cache = AnalysisResultCache(db)
+        self.correlation_engine = SentimentCorrelationEngine(db)
+    
+    def get_rolling_sentiment(self, company_id):
+        """Online rolling sentiment statistics for a company (one indexed lookup)"""
+        return self.rolling_stats.snapshot(company_id)
+    
+    def get_sentiment_peers(self, company_id, k=None):
+        """Companies whose daily sentiment correlates most with this one (precomputed)"""
+        return self.correlation_engine.top_peers(company_id, k)
+    
+    def get_recent_anomalies(self, company_id=None, days=30):
+        """Anomalies flagged by the streaming detector as articles were scored"""
+        return self.anomaly_detector.recent(company_id, days)
+    
+    @cached_analysis('company_id')
+    def calculate_sentiment_trend(self, company_id, days=30, columnar=False, resolution=None, max_points=None):
+        """Calculate sentiment trend for a company"""
+        trends = self.calculate_sentiment_trends([company_id], days, include_data=True, columnar=columnar,
+                                                 resolution=resolution, max_points=max_points)
+        return trends.get(company_id) if trends is not None else None
+    
+    @cached_analysis('company_ids')
+    def calculate_sentiment_trends(self, company_ids, days=30, include_data=False, columnar=False,
+                                   resolution=None, max_points=None):
+        """Calculate sentiment trends for many companies with one query and one grouped pass
+        
+        Returns {company_id: trend} for companies with data; 'data' (the
+        per-period rows with moving averages) is only included when
+        include_data is set, as a list of rows or, with columnar, as one list
+        per column. Long ranges are read at weekly or monthly resolution
+        (see FinancialDataDB.get_latest_sentiment); moving averages then span
+        7 and 30 of those periods.
+        """
+        try:
+            resolution = resolution or choose_sentiment_resolution(days, max_points)
+            # Rows arrive sorted by company, then date (oldest first)
+            df = read_frame(self.db.iter_sentiment_history(company_ids, days, resolution=resolution),
+                            SENTIMENT_HISTORY)
+            if df.empty:
+                return {}
+            
+            # Calculate daily sentiment score
+            df['sentiment_score'] = sentiment_scores(df)
+            scores = df.groupby('company_id', sort=False)['sentiment_score']
+            
+            # Moving averages; a company with fewer than 30 days gets one 30-day value over all its days
+            df['ma_7'] = scores.rolling(window=7).mean().to_numpy(dtype=np.float32)
+            position = scores.cumcount() + 1
+            size = scores.transform('size')
+            df['ma_30'] = scores.rolling(window=30, min_periods=1).mean().to_numpy(dtype=np.float32)
+            df['ma_30'] = df['ma_30'].where(position >= np.minimum(30, size))
+            
+            # Each company's last row carries its current and previous day's scores
+            df['previous_score'] = scores.shift()
+            summary = df.drop_duplicates('company_id', keep='last').set_index('company_id')
+            summary = summary.assign(average_score=scores.mean(), volatility=scores.std(), days=scores.size())
+            for column in ('sentiment_score', 'average_score', 'volatility'):
+                summary[column] = plain_floats(summary[column].to_numpy())
+            
+            trends = {}
+            for company_id, row in summary.iterrows():
+                # Calculate trend direction
+                if row['days'] >= 2:
+                    trend_direction = "up" if row['sentiment_score'] > row['previous_score'] else "down"
+                else:
+                    trend_direction = "stable"
+                trends[int(company_id)] = {
+                    'resolution': resolution,
+                    'trend_direction': trend_direction,
+                    'current_score': row['sentiment_score'],
+                    'average_score': row['average_score'],
+                    'volatility': row['volatility'],
+                }
+            
+            if include_data:
+                serialize = to_columnar if columnar else to_records
+                for company_id, group in df.groupby('company_id', sort=False):
+                    trends[int(company_id)]['data'] = serialize(group.drop(columns=['company_id', 'previous_score']))
+            
+            return trends
+            
+        except Exception as e:
+            logger.error(f"Error calculating sentiment trends: {str(e)}")
+            return None
+    
+    @cached_analysis('company_id')
+    def detect_anomalies(self, company_id, window=14, threshold=2.0, columnar=False):
+        """Detect anomalies in sentiment data"""
+        try:
+            # 3 months of data, oldest first
+            df = read_frame(self.db.iter_sentiment_history([company_id], 90), SENTIMENT_HISTORY)
+            
+            if len(df) < window:
+                return None
+            df = df.drop(columns='company_id')
+            
+            # Calculate sentiment score
+            df['sentiment_score'] = sentiment_scores(df)
+            
+            # Calculate rolling mean and standard deviation
+            df['rolling_mean'] = df['sentiment_score'].rolling(window=window).mean()
+            df['rolling_std'] = df['sentiment_score'].rolling(window=window).std()
+            
+            # Detect anomalies (values outside mean ± threshold * std)
+            df['anomaly'] = np.where(
+                abs(df['sentiment_score'] - df['rolling_mean']) > threshold * df['rolling_std'],
+                1, 0
+            )
+            
+            # Get anomaly dates and values
+            anomalies = to_records(df[df['anomaly'] == 1][['date', 'sentiment_score']])
+            
+            return {
+                'anomaly_count': len(anomalies),
+                'anomalies': anomalies,
+                'data': to_columnar(df) if columnar else to_records(df)
+            }
+            
+        except Exception as e:
+            logger.error(f"Error detecting anomalies: {str(e)}")
+            return None
+    
+    @cached_analysis('company_id')
+    def correlate_news_filings(self, company_id, days_before=7, days_after=7):
+        """Correlate news sentiment with SEC filing dates"""
+        try:
+            # Filings and sentiment from the last 30 days plus the window, newest filing first
+            results = self.correlate_all_news_filings(
+                [company_id], days_before=days_before, days_after=days_after,
+                days=days_before + days_after + 30
+            )
+            if results is None or results.empty:
+                return None
+            return to_records(results.drop(columns='company_id').iloc[::-1])
+            
+        except Exception as e:
+            logger.error(f"Error correlating news and filings: {str(e)}")
+            return None
+    
+    @cached_analysis('company_ids')
+    def correlate_all_news_filings(self, company_ids=None, filing_types=None, days_before=7, days_after=7,
+                                   days=None):
+        """Pre/post-filing sentiment for every filing of many companies at once (event study)
+        
+        Returns a compact DataFrame (see frames.py) with one row per filing
+        that has sentiment data in its [filing - days_before, filing +
+        days_after] window, ordered by company and filing date. None filters
+        mean all companies, all filing types and the whole history.
+        """
+        try:
+            events = read_frame([self.db.get_filing_dates(company_ids, filing_types, days)], FILING_DATES)
+            df = read_frame(self.db.iter_sentiment_history(company_ids, days), SENTIMENT_HISTORY)
+            events['filing_date'] = events['filing_date'].dt.normalize()
+            events = events.dropna(subset=['filing_date'])
+            
+            # One sortable key per (company, day): a single searchsorted then finds every
+            # window, and the company part keeps windows from reaching into the next company
+            day_keys = self._company_day_keys(df['company_id'], df['date'])
+            order = np.argsort(day_keys, kind='stable')
+            day_keys = day_keys[order]
+            scores = sentiment_scores(df).astype(np.float64)[order]
+            filing_keys = self._company_day_keys(events['company_id'], events['filing_date'])
+            
+            # Window bounds: [start, middle) is pre-filing, [middle, end) is post-filing
+            start = np.searchsorted(day_keys, filing_keys - days_before, side='left')
+            middle = np.searchsorted(day_keys, filing_keys, side='left')
+            end = np.searchsorted(day_keys, filing_keys + days_after, side='right')
+            
+            # Prefix sums make each window's mean O(1); missing scores are skipped as mean() would
+            valid = ~np.isnan(scores)
+            score_sums = np.concatenate(([0.0], np.cumsum(np.where(valid, scores, 0.0))))
+            score_counts = np.concatenate(([0], np.cumsum(valid)))
+            
+            def window_mean(lo, hi):
+                count = score_counts[hi] - score_counts[lo]
+                total = score_sums[hi] - score_sums[lo]
+                return np.divide(total, count, out=np.zeros(len(count)), where=count > 0)
+            
+            pre_avg = window_mean(start, middle)
+            post_avg = window_mean(middle, end)
+            results = pd.DataFrame({
+                'company_id': events['company_id'].to_numpy(),
+                'filing_type': events['filing_type'].array,
+                'filing_date': events['filing_date'].to_numpy(),
+                'pre_filing_sentiment': pre_avg.astype(np.float32),
+                'post_filing_sentiment': post_avg.astype(np.float32),
+                'sentiment_change': (post_avg - pre_avg).astype(np.float32),
+                'data_points': (end - start).astype(np.int32)
+            })
+            return results[results['data_points'] > 0].reset_index(drop=True)
+            
+        except Exception as e:
+            logger.error(f"Error correlating news and filings: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _company_day_keys(company_ids, dates):
+        # Company in the high bits, days since the epoch (offset to stay positive) in the low 21
+        days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64) + (1 << 20)
+        return company_ids.to_numpy(dtype=np.int64) * (1 << 21) + days
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# (column, dtype) of the rows each query returns
+SENTIMENT_HISTORY = (
+    ('company_id', 'int32'), ('date', 'datetime64[ns]'), ('total_articles', 'int32'),
+    ('positive', 'int32'), ('negative', 'int32'), ('neutral', 'int32')
+)
+FILING_DATES = (('company_id', 'int32'), ('filing_type', 'category'), ('filing_date', 'datetime64[ns]'))
+
+
+def _column(values, dtype):
+    if dtype.startswith('datetime64'):
+        # Unparseable dates become NaT rather than failing the whole frame
+        return pd.to_datetime(pd.Series(values, dtype=object), errors='coerce', format='ISO8601').to_numpy(dtype)
+    if dtype == 'category':
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=dtype)
+
+
+def read_frame(chunks, schema):
+    """Compact typed DataFrame from an iterable of row lists (e.g. cursor.fetchmany pages)
+
+    Each page is converted to typed column arrays as it arrives, so the
+    tuples of only one page are alive at a time. Dates become datetime64,
+    repeated strings categoricals, counts int32.
+    """
+    parts = {name: [] for name, _ in schema}
+    for rows in chunks:
+        if not rows:
+            continue
+        for (name, dtype), values in zip(schema, zip(*rows)):
+            parts[name].append(_column(values, dtype))
+
+    columns = {}
+    for name, dtype in schema:
+        values = np.concatenate(parts[name]) if parts[name] else np.array([], dtype=object if dtype == 'category' else dtype)
+        columns[name] = pd.Categorical(values) if dtype == 'category' else values
+    return pd.DataFrame(columns)
+
+
+def sentiment_scores(df):
+    """float32 daily score (positive - negative) / total; NaN for days without articles"""
+    total = df['total_articles'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = (df['positive'].to_numpy() - df['negative'].to_numpy()) / total.astype(np.float32)
+    return np.where(total > 0, scores, np.nan).astype(np.float32)
+
+
+def plain_floats(values):
+    """float64 copy of float values for responses
+
+    float32 values are rounded to the ~7 digits they actually hold (scores
+    lie within [-1, 1]), so 0.2 is sent as 0.2, not 0.20000000298023224.
+    """
+    values = np.asarray(values)
+    if values.dtype == np.float32:
+        return np.round(values.astype(np.float64), 7)
+    return values.astype(np.float64)
+
+
+def _plain_columns(df):
+    """Column name -> list of JSON-ready values (ISO dates, None for missing)"""
+    columns = {}
+    for name, column in df.items():
+        if pd.api.types.is_datetime64_any_dtype(column):
+            values = column.dt.strftime('%Y-%m-%d')
+            columns[name] = values.where(column.notna(), None).tolist()
+        elif pd.api.types.is_float_dtype(column):
+            values = plain_floats(column.to_numpy())
+            columns[name] = np.where(np.isnan(values), None, values).tolist()
+        else:
+            columns[name] = column.astype(object).where(column.notna(), None).tolist()
+    return columns
+
+
+def to_records(df):
+    """List of row dicts, like to_dict('records') but with ISO dates and None for NaN"""
+    columns = _plain_columns(df)
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def to_columnar(df):
+    """{'columns': [...], 'data': {column: [values]}}: one list per column, cheaper to build and encode"""
+    columns = _plain_columns(df)
+    return {'columns': list(columns), 'data': columns}
@@ -0,0 +1,88 @@
+import copy
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from config import settings
+
+
+class AnalysisResultCache:
+    """In-memory LRU cache of analysis results, invalidated by database writes
+
+    Entries are keyed by (method, arguments, data version, today's date).
+    The data version comes from FinancialDataDB.get_data_version() for the
+    companies a call reads; every write to those companies bumps it, so a
+    write makes the old entries unreachable and they age out of the LRU.
+    Today's date is part of the key because "last N days" windows move at
+    midnight. Checking the version is one indexed lookup, including when
+    another process did the write.
+
+    Safe to share between threads (the API serves requests from a thread
+    pool). The lock covers only the LRU bookkeeping, not compute(), so two
+    threads missing the same key may both compute it. Every caller gets its
+    own deep copy of a cached result and may modify it freely.
+    """
+
+    def __init__(self, db, max_entries=None):
+        self.db = db
+        self.max_entries = max_entries or settings.ANALYSIS_CACHE_MAX_ENTRIES
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0}
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key, company_ids, compute):
+        version = self.db.get_data_version(company_ids)
+        if version is None:
+            return compute()
+        key = (key, version, date.today())
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                self.stats['hits'] += 1
+            else:
+                self.stats['misses'] += 1
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        result = compute()
+        if result is not None:  # errors are not cached
+            stored = copy.deepcopy(result)
+            with self.lock:
+                self.entries[key] = stored
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def cached_analysis(companies):
+    """Cache a FinancialAnalyzer method's results in self.result_cache
+
+    companies names the argument holding the company ID, or list of IDs,
+    the method reads; when it is None the method reads every company.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            del arguments['self']
+            scope = arguments[companies]
+            if scope is not None and not isinstance(scope, (list, tuple, set, frozenset)):
+                scope = [scope]
+            key = (method.__name__, repr(sorted(arguments.items())))
+            return self.result_cache.get_or_compute(key, scope, lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
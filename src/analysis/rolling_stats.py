@@ -0,0 +1,274 @@
+import math
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+from config import settings
+from utils.logger import logger
+
+
+class CompanySentimentState:
+    """Constant-size running statistics of one company's article scores
+
+    Keeps all-time Welford count/mean/M2, an exponentially weighted mean and
+    variance, and a ring of per-day Welford buckets covering the last
+    window_days days. Window statistics merge the day buckets (Chan et
+    al.), so adding a score and reading any statistic never touches past
+    scores.
+    """
+
+    def __init__(self, window_days, alpha, row=None):
+        self.window_days = window_days
+        self.alpha = alpha
+        if row is None:
+            self.last_day = None
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            self.ewm_mean, self.ewm_var = None, 0.0
+            self.buckets = np.zeros((window_days, 3))  # per day: count, mean, M2
+        else:
+            last_day, self.count, self.mean, self.m2, self.ewm_mean, self.ewm_var, day_buckets = row
+            self.last_day = date.fromisoformat(last_day) if last_day else None
+            self.buckets = np.frombuffer(day_buckets, dtype=np.float64).reshape(-1, 3).copy()
+            if len(self.buckets) != window_days:
+                # Window size changed in settings; restart the window, keep the rest
+                self.buckets = np.zeros((window_days, 3))
+                self.last_day = None
+
+    def to_row(self):
+        return (self.last_day.isoformat() if self.last_day else None, self.count, self.mean, self.m2,
+                self.ewm_mean, self.ewm_var, self.buckets.tobytes())
+
+    def _advance(self, day):
+        """Move the window's end to day, clearing buckets of days that fell out"""
+        if self.last_day is None or (day - self.last_day).days >= self.window_days:
+            self.buckets[:] = 0
+        else:
+            for offset in range(1, (day - self.last_day).days + 1):
+                self.buckets[(self.last_day.toordinal() + offset) % self.window_days] = 0
+        self.last_day = day
+
+    def add(self, day, score):
+        # All-time Welford
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+
+        # Exponentially weighted mean and variance
+        if self.ewm_mean is None:
+            self.ewm_mean, self.ewm_var = score, 0.0
+        else:
+            diff = score - self.ewm_mean
+            increment = self.alpha * diff
+            self.ewm_mean += increment
+            self.ewm_var = (1 - self.alpha) * (self.ewm_var + diff * increment)
+
+        # Day bucket in the fixed window; scores older than the window only count above
+        if self.last_day is None or day > self.last_day:
+            self._advance(day)
+        elif (self.last_day - day).days >= self.window_days:
+            return
+        bucket = self.buckets[day.toordinal() % self.window_days]
+        bucket[0] += 1
+        delta = score - bucket[1]
+        bucket[1] += delta / bucket[0]
+        bucket[2] += delta * (score - bucket[1])
+
+    def _window_day(self, days_back):
+        return self.buckets[(self.last_day.toordinal() - days_back) % self.window_days]
+
+    def window(self):
+        """(count, mean, M2) over the whole window, merging day buckets"""
+        count, mean, m2 = 0.0, 0.0, 0.0
+        for bucket_count, bucket_mean, bucket_m2 in self.buckets:
+            if not bucket_count:
+                continue
+            total = count + bucket_count
+            delta = bucket_mean - mean
+            mean += delta * bucket_count / total
+            m2 += bucket_m2 + delta * delta * count * bucket_count / total
+            count = total
+        return count, mean, m2
+
+    def snapshot(self, as_of=None):
+        """Current statistics as a dict; days after last_day count as empty"""
+        if self.last_day is not None and as_of is not None and as_of > self.last_day:
+            self._advance(as_of)
+
+        window_count, window_mean, window_m2 = self.window()
+        latest = previous = None
+        if self.last_day is not None:
+            for days_back in range(self.window_days):
+                bucket_count, bucket_mean, _ = self._window_day(days_back)
+                if bucket_count:
+                    if latest is None:
+                        latest = bucket_mean
+                    else:
+                        previous = bucket_mean
+                        break
+
+        if latest is None or previous is None or latest == previous:
+            trend = "stable"
+        else:
+            trend = "up" if latest > previous else "down"
+
+        return {
+            'last_day': self.last_day.isoformat() if self.last_day else None,
+            'articles': self.count,
+            'mean': self.mean if self.count else None,
+            'std': math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None,
+            'ewm_mean': self.ewm_mean,
+            'ewm_std': math.sqrt(self.ewm_var) if self.ewm_mean is not None else None,
+            'window_days': self.window_days,
+            'window_articles': int(window_count),
+            'window_mean': window_mean if window_count else None,
+            'volatility': math.sqrt(window_m2 / (window_count - 1)) if window_count > 1 else None,
+            'latest_day_mean': latest,
+            'trend_direction': trend
+        }
+
+
+class RollingSentimentStats:
+    """Per-company online sentiment aggregates persisted in one compact table
+
+    The sentiment write path calls update() with each batch of newly scored
+    articles; reads are a single primary-key lookup per company, whatever
+    the history length. Listeners added to self.listeners are called with
+    (states, observations) after each update is saved. An empty table is
+    rebuilt from the already scored articles on first use, so a database
+    scored before the table existed starts with its full history.
+    """
+
+    def __init__(self, db, window_days=None, alpha=None, backfill=True):
+        self.db_path = db.db_path
+        self.window_days = window_days or settings.SENTIMENT_ROLLING_WINDOW_DAYS
+        self.alpha = alpha or settings.SENTIMENT_EWM_ALPHA
+        self.listeners = []
+        self.init_db()
+        if backfill and self._needs_backfill():
+            total = self.rebuild()
+            logger.info(f"Rebuilt rolling sentiment from {total} scored articles")
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rolling_sentiment (
+                    company_id INTEGER PRIMARY KEY,
+                    last_day TEXT,
+                    count INTEGER NOT NULL,
+                    mean REAL NOT NULL,
+                    m2 REAL NOT NULL,
+                    ewm_mean REAL,
+                    ewm_var REAL NOT NULL,
+                    day_buckets BLOB NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (company_id) REFERENCES companies (id)
+                )
+            ''')
+
+    def _needs_backfill(self):
+        """True when the aggregates are empty but the database has scored articles"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                return bool(conn.execute(
+                    '''SELECT NOT EXISTS (SELECT 1 FROM rolling_sentiment)
+                    AND EXISTS (SELECT 1 FROM news_articles WHERE sentiment_score IS NOT NULL)'''
+                ).fetchone()[0])
+        except Exception as e:
+            logger.error(f"Failed to check rolling sentiment: {str(e)}")
+            return False
+
+    def _load(self, conn, company_ids):
+        states = {}
+        company_ids = list(company_ids)
+        for start in range(0, len(company_ids), 500):
+            chunk = company_ids[start:start + 500]
+            rows = conn.execute(
+                f'''SELECT company_id, last_day, count, mean, m2, ewm_mean, ewm_var, day_buckets
+                FROM rolling_sentiment WHERE company_id IN ({",".join("?" * len(chunk))})''',
+                chunk
+            ).fetchall()
+            for row in rows:
+                states[row[0]] = CompanySentimentState(self.window_days, self.alpha, row[1:])
+        return states
+
+    def _fold(self, states, observations):
+        for company_id, day, score in observations:
+            state = states.get(company_id)
+            if state is None:
+                state = states[company_id] = CompanySentimentState(self.window_days, self.alpha)
+            state.add(date.fromisoformat(day), score)
+
+    def _save(self, conn, states):
+        conn.executemany(
+            '''INSERT OR REPLACE INTO rolling_sentiment
+            (company_id, last_day, count, mean, m2, ewm_mean, ewm_var, day_buckets, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)''',
+            [(company_id, *state.to_row()) for company_id, state in states.items()]
+        )
+
+    def update(self, observations):
+        """Fold (company_id, day 'YYYY-MM-DD', score) observations into the aggregates"""
+        # Oldest first within each company: the exponential average depends on order
+        observations = sorted(observations, key=lambda item: (item[0], item[1]))
+        if not observations:
+            return 0
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                states = self._load(conn, {company_id for company_id, _, _ in observations})
+                self._fold(states, observations)
+                self._save(conn, states)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Failed to update rolling sentiment: {str(e)}")
+            return 0
+        
+        for listener in self.listeners:
+            listener(states, observations)
+        return len(observations)
+
+    def snapshots(self, company_ids, as_of=None):
+        """{company_id: statistics dict} for companies that have any scored articles"""
+        as_of = as_of or date.today()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                states = self._load(conn, company_ids)
+            return {company_id: state.snapshot(as_of) for company_id, state in states.items()}
+        except Exception as e:
+            logger.error(f"Failed to read rolling sentiment: {str(e)}")
+            return {}
+
+    def snapshot(self, company_id, as_of=None):
+        return self.snapshots([company_id], as_of).get(company_id)
+
+    def rebuild(self, batch_size=10000):
+        """Recompute every company's aggregates from the scored articles in the database"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                # Streams the articles once; only the per-company states are held in memory.
+                # Articles stored already scored have no published_day; an ISO published_date stands in
+                states = {}
+                total = 0
+                cursor = conn.execute(
+                    '''SELECT company_id, day, sentiment_score FROM (
+                        SELECT id, company_id, sentiment_score,
+                        COALESCE(published_day, substr(published_date, 1, 10)) AS day
+                        FROM news_articles WHERE sentiment_score IS NOT NULL
+                    )
+                    WHERE day GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+                    ORDER BY day, id'''
+                )
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    self._fold(states, rows)
+                    total += len(rows)
+                conn.execute("DELETE FROM rolling_sentiment")
+                self._save(conn, states)
+                conn.commit()
+                return total
+        except Exception as e:
+            logger.error(f"Failed to rebuild rolling sentiment: {str(e)}")
+            return 0
@@ -0,0 +1,41 @@
+from config import settings
+
+
+def split_values(values):
+    """Flatten repeated and comma-separated query values: ['AAPL,MSFT', 'GOOG'] -> ['AAPL', 'MSFT', 'GOOG']"""
+    return [value.strip() for item in values or () for value in str(item).split(",") if value.strip()]
+
+
+def resolve_companies(db, company_ids=(), tickers=()):
+    """(companies, not_found) for a batch request, in one query
+
+    companies are (id, name, ticker) rows in the order they were asked for;
+    not_found lists the requested IDs and tickers that matched nothing.
+    Raises ValueError for an empty request, non-numeric IDs or more than
+    API_MAX_BATCH_COMPANIES companies.
+    """
+    company_ids, tickers = split_values(company_ids), [ticker.upper() for ticker in split_values(tickers)]
+    try:
+        company_ids = [int(company_id) for company_id in company_ids]
+    except ValueError:
+        raise ValueError("company_ids must be integers")
+    requested = [*dict.fromkeys(company_ids), *dict.fromkeys(tickers)]
+    if not requested:
+        raise ValueError("Give at least one company ID or ticker")
+    if len(requested) > settings.API_MAX_BATCH_COMPANIES:
+        raise ValueError(f"At most {settings.API_MAX_BATCH_COMPANIES} companies per request")
+
+    found = {}
+    for row in db.find_companies(company_ids, tickers):
+        found[row[0]] = found[row[2]] = row
+    companies = list({found[key][0]: found[key] for key in requested if key in found}.values())
+    return companies, [key for key in requested if key not in found]
+
+
+def group_by_company(companies, rows_by_company, field, to_record):
+    """[{'id', 'name', 'ticker', field: [records]}] for each company, in order"""
+    return [
+        {"id": company_id, "name": name, "ticker": ticker,
+         field: [to_record(row) for row in rows_by_company.get(company_id, ())]}
+        for company_id, name, ticker in companies
+    ]
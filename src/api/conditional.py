@@ -0,0 +1,30 @@
+from datetime import date
+from hashlib import blake2b
+
+from config import settings
+
+
+def resource_etag(version, *request_parts):
+    """Strong ETag for a response built from data at version
+
+    The request path and query are part of the tag because one resource
+    version backs many differently shaped responses (days, limit, ...),
+    and today's date because "last N days" ranges move at midnight.
+    """
+    key = repr((version, date.today().isoformat(), request_parts)).encode("utf-8")
+    return f'"{blake2b(key, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header value matches etag (weak comparison, as RFC 9110 asks)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def cache_control():
+    """Cache-Control for versioned read endpoints: private, revalidated with the ETag once stale"""
+    return f"private, max-age={settings.HTTP_CACHE_MAX_AGE}, must-revalidate"
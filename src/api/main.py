@@ -1,203 +1,388 @@
-
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import date
-import json
-
-from data.database import FinancialDataDB
-from analysis.financial_analyzer import FinancialAnalyzer
-
-app = FastAPI(title="Financial Data Aggregator API", version="1.0.0")
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Security
-security = HTTPBearer()
-
-# Database connection
-db = FinancialDataDB()
-analyzer = FinancialAnalyzer(db)
-
-# Pydantic models
-class Company(BaseModel):
-    id: int
-    name: str
-    ticker: str
-    
-    class Config:
-        orm_mode = True
-
-class SentimentData(BaseModel):
-    date: str
-    total_articles: int
-    positive: int
-    negative: int
-    neutral: int
-
-class NewsArticle(BaseModel):
-    title: str
-    excerpt: str
-    date: str
-    source: str
-    url: str
-    sentiment: Optional[str]
-
-class SECFiling(BaseModel):
-    type: str
-    date: str
-    file_path: str
-    content_length: int
-
-class SentimentTrend(BaseModel):
-    trend_direction: str
-    current_score: float
-    average_score: float
-    volatility: float
-    data: List[dict]
-
-class CorrelationResult(BaseModel):
-    filing_date: str
-    pre_filing_sentiment: float
-    post_filing_sentiment: float
-    sentiment_change: float
-    data_points: int
-
-# Authentication (simplified - in production use proper auth)
-def authenticate(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    # In a real application, validate the token against your user database
-    if credentials.credentials != "secret-token":
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    return True
-
-# Routes
-@app.get("/")
-async def root():
-    return {"message": "Financial Data Aggregator API"}
-
-@app.get("/companies", response_model=List[Company])
-async def get_companies(auth: bool = Depends(authenticate)):
-    """Get list of all companies"""
-    try:
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute("SELECT id, name, ticker FROM companies ORDER BY name")
-            companies = [Company(id=row[0], name=row[1], ticker=row[2]) for row in cursor.fetchall()]
-        return companies
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/companies/{company_id}/sentiment", response_model=List[SentimentData])
-async def get_company_sentiment(company_id: int, days: int = 30, auth: bool = Depends(authenticate)):
-    """Get sentiment data for a specific company"""
-    try:
-        sentiment_data = db.get_latest_sentiment(company_id, days)
-        if not sentiment_data:
-            raise HTTPException(status_code=404, detail="No sentiment data found")
-        
-        return [
-            SentimentData(
-                date=row[0],
-                total_articles=row[1],
-                positive=row[2],
-                negative=row[3],
-                neutral=row[4]
-            ) for row in sentiment_data
-        ]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/companies/{company_id}/sentiment/trend", response_model=SentimentTrend)
-async def get_sentiment_trend(company_id: int, days: int = 30, auth: bool = Depends(authenticate)):
-    """Get sentiment trend analysis for a company"""
-    try:
-        trend = analyzer.calculate_sentiment_trend(company_id, days)
-        if not trend:
-            raise HTTPException(status_code=404, detail="No data available for trend analysis")
-        
-        return trend
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/companies/{company_id}/news", response_model=List[NewsArticle])
-async def get_company_news(company_id: int, limit: int = 10, auth: bool = Depends(authenticate)):
-    """Get recent news articles for a company"""
-    try:
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                '''SELECT title, excerpt, published_date, source, url, sentiment_label 
-                FROM news_articles 
-                WHERE company_id = ? 
-                ORDER BY published_date DESC 
-                LIMIT ?''',
-                (company_id, limit)
-            )
-            
-            articles = [
-                NewsArticle(
-                    title=row[0],
-                    excerpt=row[1],
-                    date=row[2],
-                    source=row[3],
-                    url=row[4],
-                    sentiment=row[5]
-                ) for row in cursor.fetchall()
-            ]
-        
-        return articles
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/companies/{company_id}/filings", response_model=List[SECFiling])
-async def get_company_filings(company_id: int, auth: bool = Depends(authenticate)):
-    """Get SEC filings for a company"""
-    try:
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                '''SELECT filing_type, filing_date, file_path, content_length 
-                FROM sec_filings 
-                WHERE company_id = ? 
-                ORDER BY filing_date DESC''',
-                (company_id,)
-            )
-            
-            filings = [
-                SECFiling(
-                    type=row[0],
-                    date=row[1],
-                    file_path=row[2],
-                    content_length=row[3]
-                ) for row in cursor.fetchall()
-            ]
-        
-        return filings
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/companies/{company_id}/analysis/correlations", response_model=List[CorrelationResult])
-async def get_correlations(company_id: int, days_before: int = 7, days_after: int = 7, 
-                          auth: bool = Depends(authenticate)):
-    """Get correlation between news sentiment and SEC filings"""
-    try:
-        correlations = analyzer.correlate_news_filings(company_id, days_before, days_after)
-        if not correlations:
-            raise HTTPException(status_code=404, detail="No correlation data available")
-        
-        return correlations
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-if __name__ == "__main__":
-    import uvicorn
+
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional, Union
+
+from data.database import FinancialDataDB, choose_sentiment_resolution
+from analysis.financial_analyzer import FinancialAnalyzer
+from src.api.batch import group_by_company, resolve_companies
+from src.api.conditional import cache_control, etag_matches, resource_etag
+from src.api.pagination import decode_cursor, ndjson, page_size, split_page
+
+app = FastAPI(title="Financial Data Aggregator API", version="1.0.0")
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Security
+security = HTTPBearer()
+
+# Database connection
+db = FinancialDataDB()
+analyzer = FinancialAnalyzer(db)
+
+# Pydantic models
+Resolution = Literal['day', 'week', 'month']
+ListingFormat = Literal['json', 'ndjson']
+
+class Company(BaseModel):
+    id: int
+    name: str
+    ticker: str
+    
+    class Config:
+        orm_mode = True
+
+class SentimentData(BaseModel):
+    date: str
+    total_articles: int
+    positive: int
+    negative: int
+    neutral: int
+
+class NewsArticle(BaseModel):
+    id: int
+    title: str
+    excerpt: str
+    date: str
+    source: str
+    url: str
+    sentiment: Optional[str]
+
+class SECFiling(BaseModel):
+    id: int
+    type: str
+    date: str
+    file_path: str
+    content_length: int
+
+class SentimentTrend(BaseModel):
+    resolution: str
+    trend_direction: str
+    current_score: float
+    average_score: float
+    volatility: float
+    data: Union[List[dict], dict]  # rows, or {'columns', 'data'} with one list per column
+
+class SentimentTrendsRequest(BaseModel):
+    company_ids: List[int]
+    days: int = 30
+    include_data: bool = False
+    columnar: bool = False
+
+class SentimentTrendSummary(BaseModel):
+    resolution: str
+    trend_direction: str
+    current_score: float
+    average_score: float
+    volatility: Optional[float]
+    data: Optional[Union[List[dict], dict]]
+
+class RollingSentiment(BaseModel):
+    last_day: Optional[str]
+    articles: int
+    mean: Optional[float]
+    std: Optional[float]
+    ewm_mean: Optional[float]
+    ewm_std: Optional[float]
+    window_days: int
+    window_articles: int
+    window_mean: Optional[float]
+    volatility: Optional[float]
+    latest_day_mean: Optional[float]
+    trend_direction: str
+
+class SentimentPeer(BaseModel):
+    company_id: int
+    ticker: Optional[str]
+    correlation: float
+    overlap_days: int
+    window_end: str
+
+class SentimentAnomaly(BaseModel):
+    company_id: int
+    day: str
+    score: float
+    baseline_mean: float
+    baseline_std: float
+    z_score: float
+    articles: int
+    direction: str
+    detected_at: str
+
+class CompanySentiment(Company):
+    sentiment: List[SentimentData]
+
+class BatchSentiment(BaseModel):
+    resolution: str
+    companies: List[CompanySentiment]
+    not_found: List[Union[int, str]]
+
+class CompanyNews(Company):
+    articles: List[NewsArticle]
+
+class BatchNews(BaseModel):
+    companies: List[CompanyNews]
+    not_found: List[Union[int, str]]
+
+class CorrelationResult(BaseModel):
+    filing_date: str
+    pre_filing_sentiment: float
+    post_filing_sentiment: float
+    sentiment_change: float
+    data_points: int
+
+# Authentication (simplified - in production use proper auth)
+def authenticate(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # In a real application, validate the token against your user database
+    if credentials.credentials != "secret-token":
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return True
+
+def not_modified(request: Request, response: Response, resources, company_id=None, company_ids=None):
+    """Set ETag/Cache-Control from the data version; return a 304 response if the client's copy is current
+    
+    Costs one primary-key lookup, made before the route queries anything.
+    Batch routes pass company_ids; their responses also depend on which
+    tickers exist, so the company list's version is part of the tag.
+    """
+    if company_ids is None:
+        version = db.get_data_version(None if company_id is None else [company_id], resources)
+    else:
+        version = (db.get_data_version(company_ids, resources), db.get_data_version(None, ("companies",)))
+        if None in version:
+            version = None
+    if version is None:
+        return None
+    headers = {"ETag": resource_etag(version, request.url.path, request.url.query), "Cache-Control": cache_control()}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def sentiment_record(row):
+    return {"date": row[0], "total_articles": row[1], "positive": row[2], "negative": row[3], "neutral": row[4]}
+
+def news_record(row):
+    return {"id": row[6], "title": row[0], "excerpt": row[1], "date": row[2],
+            "source": row[3], "url": row[4], "sentiment": row[5]}
+
+def filing_record(row):
+    return {"id": row[4], "type": row[0], "date": row[1], "file_path": row[2], "content_length": row[3]}
+
+def cursor_key(cursor):
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def batch_companies(company_ids, tickers):
+    try:
+        return resolve_companies(db, company_ids, tickers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def stream_ndjson(rows, to_record, headers):
+    """Stream rows as NDJSON straight from the database cursor, in constant memory"""
+    return StreamingResponse(ndjson(map(to_record, rows)), media_type="application/x-ndjson", headers=headers)
+
+# Routes
+@app.get("/")
+async def root():
+    return {"message": "Financial Data Aggregator API"}
+
+@app.get("/companies", response_model=List[Company])
+async def get_companies(request: Request, response: Response, auth: bool = Depends(authenticate)):
+    """Get list of all companies"""
+    cached = not_modified(request, response, ("companies",))
+    if cached:
+        return cached
+    try:
+        companies = [Company(id=row[0], name=row[1], ticker=row[2]) for row in db.get_companies()]
+        return companies
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/companies/{company_id}/sentiment", response_model=List[SentimentData])
+async def get_company_sentiment(request: Request, response: Response, company_id: int, days: int = 30,
+                                resolution: Optional[Resolution] = None, max_points: Optional[int] = None,
+                                auth: bool = Depends(authenticate)):
+    """Get sentiment data for a specific company, newest first
+    
+    Long ranges come back weekly or monthly (each row dated by its period's
+    first day) unless a resolution is given.
+    """
+    cached = not_modified(request, response, ("sentiment",), company_id)
+    if cached:
+        return cached
+    try:
+        sentiment_data = db.get_latest_sentiment(company_id, days, resolution, max_points)
+        if not sentiment_data:
+            raise HTTPException(status_code=404, detail="No sentiment data found")
+        
+        return [SentimentData(**sentiment_record(row)) for row in sentiment_data]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/companies/{company_id}/sentiment/trend", response_model=SentimentTrend)
+async def get_sentiment_trend(request: Request, response: Response, company_id: int, days: int = 30,
+                              columnar: bool = False, resolution: Optional[Resolution] = None,
+                              max_points: Optional[int] = None, auth: bool = Depends(authenticate)):
+    """Get sentiment trend analysis for a company; columnar=true returns the data one list per column"""
+    cached = not_modified(request, response, ("sentiment",), company_id)
+    if cached:
+        return cached
+    try:
+        trend = analyzer.calculate_sentiment_trend(company_id, days, columnar, resolution, max_points)
+        if not trend:
+            raise HTTPException(status_code=404, detail="No data available for trend analysis")
+        
+        return trend
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/sentiment/batch", response_model=BatchSentiment)
+async def get_batch_sentiment(request: Request, response: Response, tickers: List[str] = Query([]),
+                              company_ids: List[str] = Query([]), days: int = 30,
+                              resolution: Optional[Resolution] = None, max_points: Optional[int] = None,
+                              auth: bool = Depends(authenticate)):
+    """Get sentiment data for many companies in one request, grouped by company
+    
+    tickers and company_ids may be repeated or comma-separated. Every
+    company is read by the same query; unknown ones are listed in not_found.
+    """
+    companies, not_found = batch_companies(company_ids, tickers)
+    ids = [row[0] for row in companies]
+    cached = not_modified(request, response, ("sentiment",), company_ids=ids)
+    if cached:
+        return cached
+    try:
+        resolution = resolution or choose_sentiment_resolution(days, max_points)
+        sentiment = db.get_latest_sentiment_batch(ids, days, resolution)
+        return {"resolution": resolution, "not_found": not_found,
+                "companies": group_by_company(companies, sentiment, "sentiment", sentiment_record)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/news/batch", response_model=BatchNews)
+async def get_batch_news(request: Request, response: Response, tickers: List[str] = Query([]),
+                         company_ids: List[str] = Query([]), limit: int = 10,
+                         auth: bool = Depends(authenticate)):
+    """Get the newest limit articles of each of many companies in one request, grouped by company"""
+    companies, not_found = batch_companies(company_ids, tickers)
+    ids = [row[0] for row in companies]
+    cached = not_modified(request, response, ("news",), company_ids=ids)
+    if cached:
+        return cached
+    try:
+        news = db.get_company_news_batch(ids, page_size(limit, default=10))
+        return {"not_found": not_found, "companies": group_by_company(companies, news, "articles", news_record)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/sentiment/trends", response_model=Dict[int, SentimentTrendSummary])
+async def get_sentiment_trends(request: SentimentTrendsRequest, auth: bool = Depends(authenticate)):
+    """Get sentiment trend analysis for many companies in one query; companies without data are omitted"""
+    trends = analyzer.calculate_sentiment_trends(request.company_ids, request.days, request.include_data,
+                                                 request.columnar)
+    if trends is None:
+        raise HTTPException(status_code=500, detail="Failed to calculate sentiment trends")
+    return trends
+
+@app.get("/companies/{company_id}/sentiment/rolling", response_model=RollingSentiment)
+async def get_rolling_sentiment(company_id: int, auth: bool = Depends(authenticate)):
+    """Get online rolling sentiment statistics (all-time, exponential and windowed) for a company"""
+    stats = analyzer.get_rolling_sentiment(company_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="No rolling sentiment data found")
+    return stats
+
+@app.get("/companies/{company_id}/sentiment/peers", response_model=List[SentimentPeer])
+async def get_sentiment_peers(company_id: int, k: Optional[int] = None, auth: bool = Depends(authenticate)):
+    """Get the companies whose daily news sentiment moves most closely with this one"""
+    return analyzer.get_sentiment_peers(company_id, k)
+
+@app.get("/anomalies", response_model=List[SentimentAnomaly])
+async def get_anomalies(company_id: Optional[int] = None, days: int = 30, auth: bool = Depends(authenticate)):
+    """Get sentiment anomalies flagged as articles were scored, newest first"""
+    return analyzer.get_recent_anomalies(company_id, days)
+
+@app.get("/companies/{company_id}/news", response_model=List[NewsArticle])
+async def get_company_news(request: Request, response: Response, company_id: int, limit: Optional[int] = None,
+                           cursor: Optional[str] = None, format: ListingFormat = 'json',
+                           auth: bool = Depends(authenticate)):
+    """Get a company's news articles, newest first
+    
+    Pages are keyset-paginated on (published_date, id): pass the
+    X-Next-Cursor header of one page as cursor to get the next. With
+    format=ndjson every remaining article (or limit of them) is streamed
+    as one JSON object per line.
+    """
+    after = cursor_key(cursor)
+    cached = not_modified(request, response, ("news",), company_id)
+    if cached:
+        return cached
+    if format == 'ndjson':
+        return stream_ndjson(db.iter_company_news(company_id, limit, after), news_record, response.headers)
+    try:
+        limit = page_size(limit, default=10)
+        rows, next_cursor = split_page(db.get_company_news(company_id, limit + 1, after), limit, 2)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [NewsArticle(**news_record(row)) for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/companies/{company_id}/filings", response_model=List[SECFiling])
+async def get_company_filings(request: Request, response: Response, company_id: int, limit: Optional[int] = None,
+                              cursor: Optional[str] = None, format: ListingFormat = 'json',
+                              auth: bool = Depends(authenticate)):
+    """Get a company's SEC filings, newest first
+    
+    Without limit or cursor every filing is returned, as before pagination.
+    With either, pages are keyset-paginated on (filing_date, id) like the
+    news: limit defaults to API_PAGE_SIZE and the X-Next-Cursor header of
+    one page is the cursor of the next.
+    """
+    after = cursor_key(cursor)
+    cached = not_modified(request, response, ("filings",), company_id)
+    if cached:
+        return cached
+    if format == 'ndjson':
+        return stream_ndjson(db.iter_company_filings(company_id, limit, after), filing_record, response.headers)
+    try:
+        if limit is None and after is None:
+            return [SECFiling(**filing_record(row)) for row in db.get_company_filings(company_id)]
+        limit = page_size(limit)
+        rows, next_cursor = split_page(db.get_company_filings(company_id, limit + 1, after), limit, 1)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return [SECFiling(**filing_record(row)) for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/companies/{company_id}/analysis/correlations", response_model=List[CorrelationResult])
+async def get_correlations(company_id: int, days_before: int = 7, days_after: int = 7, 
+                          auth: bool = Depends(authenticate)):
+    """Get correlation between news sentiment and SEC filings"""
+    try:
+        correlations = analyzer.correlate_news_filings(company_id, days_before, days_after)
+        if not correlations:
+            raise HTTPException(status_code=404, detail="No correlation data available")
+        
+        return correlations
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
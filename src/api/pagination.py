@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+
+from config import settings
+
+
+def encode_cursor(sort_value, row_id):
+    """Opaque cursor token for the row after which the next page starts"""
+    payload = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """(sort value, id) from a token made by encode_cursor; None for no token
+
+    Raises ValueError for anything else, which routes answer with a 400.
+    """
+    if not token:
+        return None
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+    if not isinstance(row_id, int) or not (sort_value is None or isinstance(sort_value, str)):
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return sort_value, row_id
+
+
+def page_size(limit, default=None):
+    """limit clamped to 1..API_MAX_PAGE_SIZE, or default (API_PAGE_SIZE) when not given"""
+    if limit is None:
+        limit = default or settings.API_PAGE_SIZE
+    return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+
+def split_page(rows, limit, sort_column):
+    """(page, next cursor) from up to limit + 1 rows fetched for a page of limit rows
+
+    The extra row only tells whether there is a next page; the cursor points
+    at the last row returned, whose id is its last column.
+    """
+    page = rows[:limit]
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(page[-1][sort_column], page[-1][-1])
+
+
+def ndjson(records):
+    """Newline-delimited JSON lines for an iterable of dicts, one at a time"""
+    for record in records:
+        yield json.dumps(record, separators=(",", ":")) + "\n"
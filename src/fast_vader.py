@@ -0,0 +1,293 @@
+import argparse
+import json
+import math
+import string
+from functools import lru_cache
+
+from config import settings
+
+PUNCTUATION = frozenset(string.punctuation)
+NLTK_LEXICON = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+
+class FastVaderScorer:
+    """Drop-in replacement for NLTK's SentimentIntensityAnalyzer.polarity_scores
+
+    Implements the same VADER rules, including NLTK's quirks (a repeated
+    word is scored in the context of its first occurrence; "never so/this"
+    checks are case-sensitive), but does the per-call work once up front:
+    the lexicon, boosters, negations and idioms live in flat dicts/sets,
+    each text is split and lowercased once, and NLTK's per-call table of
+    every word/punctuation combination is replaced by a direct check on
+    each token.
+
+    The tables come from the compact lexicon file when one has been built
+    (see build-lexicon below), so NLTK is never imported; otherwise they
+    are compiled from NLTK's data on first use.
+    """
+
+    def __init__(self, tables=None):
+        tables = tables or load_tables()
+        self.lexicon = tables['lexicon']
+        self.boosters = tables['boosters']
+        self.negations = frozenset(tables['negations'])
+        self.idioms = tables['idioms']
+        self.punctuation_marks = frozenset(tables['punctuation'])
+        self.b_decr = tables['b_decr']
+        self.c_incr = tables['c_incr']
+        self.n_scalar = tables['n_scalar']
+
+    def tokenize(self, text):
+        """VADER's words_and_emoticons: whitespace tokens longer than one character,
+        with one leading or trailing run of punctuation stripped off plain words"""
+        tokens = []
+        for token in text.split():
+            if len(token) < 2:
+                continue
+            # Trailing punctuation: "cat!!" -> "cat" when the word part has no punctuation
+            end = len(token)
+            while end and token[end - 1] in PUNCTUATION:
+                end -= 1
+            if 1 < end < len(token) and token[end:] in self.punctuation_marks \
+                    and not any(c in PUNCTUATION for c in token[:end]):
+                tokens.append(token[:end])
+                continue
+            # Leading punctuation: ",cat" -> "cat"
+            start = 0
+            while start < len(token) and token[start] in PUNCTUATION:
+                start += 1
+            if 0 < start and len(token) - start > 1 and token[:start] in self.punctuation_marks \
+                    and not any(c in PUNCTUATION for c in token[start:]):
+                tokens.append(token[start:])
+                continue
+            tokens.append(token)
+        return tokens
+
+    def _negated(self, word_lower):
+        return word_lower in self.negations or "n't" in word_lower
+
+    def polarity_scores(self, text):
+        """Return {'neg', 'neu', 'pos', 'compound'} exactly as NLTK's VADER would"""
+        if not isinstance(text, str):
+            text = str(text.encode("utf-8"))
+        words = self.tokenize(text)
+        lowers = [word.lower() for word in words]
+        uppers = [word.isupper() for word in words]
+        allcaps = sum(uppers)
+        is_cap_diff = 0 < len(words) - allcaps < len(words)
+        lexicon = self.lexicon
+        boosters = self.boosters
+
+        first_index = {}
+        for index, word in enumerate(words):
+            first_index.setdefault(word, index)
+
+        sentiments = []
+        last = len(words) - 1
+        for word in words:
+            i = first_index[word]
+            lower = lowers[i]
+            if lower in boosters or (lower == "kind" and i < last and lowers[i + 1] == "of"):
+                sentiments.append(0)
+                continue
+            valence = lexicon.get(lower)
+            if valence is None:
+                sentiments.append(0)
+                continue
+
+            if uppers[i] and is_cap_diff:
+                valence += self.c_incr if valence > 0 else -self.c_incr
+
+            for start_i in range(3):
+                j = i - (start_i + 1)
+                if i > start_i and lowers[j] not in lexicon:
+                    scalar = boosters.get(lowers[j], 0.0)
+                    if scalar:
+                        if valence < 0:
+                            scalar = -scalar
+                        if uppers[j] and is_cap_diff:
+                            scalar += self.c_incr if valence > 0 else -self.c_incr
+                        if start_i == 1:
+                            scalar *= 0.95
+                        elif start_i == 2:
+                            scalar *= 0.9
+                    valence += scalar
+                    valence = self._never_check(valence, words, lowers, start_i, i)
+                    if start_i == 2:
+                        valence = self._idioms_check(valence, words, i)
+
+            # "least" not preceded by "at"/"very" flips the valence
+            if i > 0 and lowers[i - 1] == "least" and "least" not in lexicon:
+                if i == 1 or lowers[i - 2] not in ("at", "very"):
+                    valence *= self.n_scalar
+
+            sentiments.append(valence)
+
+        if "but" in lowers:
+            but_index = lowers.index("but")
+            sentiments = [
+                s * 0.5 if k < but_index else s * 1.5 if k > but_index else s
+                for k, s in enumerate(sentiments)
+            ]
+
+        return self._score_valence(sentiments, text)
+
+    def _never_check(self, valence, words, lowers, start_i, i):
+        if start_i == 0:
+            if self._negated(lowers[i - 1]):
+                valence *= self.n_scalar
+        elif start_i == 1:
+            if words[i - 2] == "never" and words[i - 1] in ("so", "this"):
+                valence *= 1.5
+            elif self._negated(lowers[i - 2]):
+                valence *= self.n_scalar
+        else:
+            if (words[i - 3] == "never" and words[i - 2] in ("so", "this")) or words[i - 1] in ("so", "this"):
+                valence *= 1.25
+            elif self._negated(lowers[i - 3]):
+                valence *= self.n_scalar
+        return valence
+
+    def _idioms_check(self, valence, words, i):
+        idioms = self.idioms
+        onezero = f"{words[i - 1]} {words[i]}"
+        twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+        twoone = f"{words[i - 2]} {words[i - 1]}"
+        threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+        threetwo = f"{words[i - 3]} {words[i - 2]}"
+        for sequence in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if sequence in idioms:
+                valence = idioms[sequence]
+                break
+        if len(words) - 1 > i:
+            zeroone = f"{words[i]} {words[i + 1]}"
+            if zeroone in idioms:
+                valence = idioms[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+            if zeroonetwo in idioms:
+                valence = idioms[zeroonetwo]
+        if threetwo in self.boosters or twoone in self.boosters:
+            valence += self.b_decr
+        return valence
+
+    def _score_valence(self, sentiments, text):
+        if not sentiments:
+            return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+        sum_s = float(sum(sentiments))
+        emphasis = min(text.count("!"), 4) * 0.292
+        question_marks = text.count("?")
+        if question_marks > 1:
+            emphasis += question_marks * 0.18 if question_marks <= 3 else 0.96
+        if sum_s > 0:
+            sum_s += emphasis
+        elif sum_s < 0:
+            sum_s -= emphasis
+        compound = sum_s / math.sqrt(sum_s * sum_s + 15)
+
+        pos_sum = neg_sum = 0.0
+        neu_count = 0
+        for s in sentiments:
+            if s > 0:
+                pos_sum += float(s) + 1
+            elif s < 0:
+                neg_sum += float(s) - 1
+            else:
+                neu_count += 1
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += emphasis
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= emphasis
+
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            "neg": round(math.fabs(neg_sum / total), 3),
+            "neu": round(math.fabs(neu_count / total), 3),
+            "pos": round(math.fabs(pos_sum / total), 3),
+            "compound": round(compound, 4),
+        }
+
+
+def ensure_nltk_lexicon():
+    """Make sure NLTK's VADER lexicon is installed, downloading it on first use only"""
+    import nltk
+    try:
+        nltk.data.find(NLTK_LEXICON)
+    except LookupError:
+        nltk.download('vader_lexicon', quiet=True)
+
+
+def compile_tables():
+    """Build the scorer's lookup tables from NLTK's lexicon and VADER constants"""
+    import nltk
+    from nltk.sentiment.vader import VaderConstants
+
+    ensure_nltk_lexicon()
+    lexicon = {}
+    for line in nltk.data.load(NLTK_LEXICON).split("\n"):
+        word, measure = line.strip().split("\t")[0:2]
+        lexicon[word] = float(measure)
+
+    constants = VaderConstants()
+    return {
+        'source': f"nltk-{nltk.__version__}",
+        'lexicon': lexicon,
+        'boosters': dict(constants.BOOSTER_DICT),
+        'negations': sorted(constants.NEGATE),
+        'idioms': dict(constants.SPECIAL_CASE_IDIOMS),
+        'punctuation': list(constants.PUNC_LIST),
+        'b_decr': constants.B_DECR,
+        'c_incr': constants.C_INCR,
+        'n_scalar': constants.N_SCALAR
+    }
+
+
+@lru_cache(maxsize=None)
+def load_tables(path=None):
+    """Lookup tables from the compact lexicon file, or compiled from NLTK if it is missing"""
+    path = path or settings.SENTIMENT_LEXICON_PATH
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return compile_tables()
+
+
+def build_lexicon(path=None):
+    """Write the compact lexicon file used to skip NLTK at startup"""
+    path = path or settings.SENTIMENT_LEXICON_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tables = compile_tables()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(tables, f, separators=(",", ":"))
+    return path, len(tables['lexicon'])
+
+
+def create_scorer(engine=None):
+    """Sentiment scorer for settings.SENTIMENT_ENGINE ('fast' or 'nltk')"""
+    engine = engine or settings.SENTIMENT_ENGINE
+    if engine == "fast":
+        return FastVaderScorer()
+    if engine == "nltk":
+        from nltk.sentiment import SentimentIntensityAnalyzer
+        ensure_nltk_lexicon()
+        return SentimentIntensityAnalyzer()
+    raise ValueError(f"Unknown sentiment engine: {engine}")
+
+
+def main():
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Fast VADER sentiment engine tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build-lexicon", help="Write the compact lexicon file from NLTK's data")
+    build.add_argument("--output", type=Path, help=f"Output file (default: {settings.SENTIMENT_LEXICON_PATH})")
+    args = parser.parse_args()
+
+    if args.command == "build-lexicon":
+        path, words = build_lexicon(args.output)
+        print(f"Wrote {words} lexicon entries to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,461 +1,564 @@
-# import requests
-# from bs4 import BeautifulSoup
-# import json
-# import time
-# from pathlib import Path
-# from config import settings
-
-# class NewsScraper:
-#     def __init__(self):
-#         self.news_sources = settings.NEWS_SOURCES
-#         self.raw_data_path = settings.RAW_DATA_PATH / "news"
-#         self.raw_data_path.mkdir(parents=True, exist_ok=True)
-        
-#         # Load companies data
-#         with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
-#             self.companies = json.load(f)["companies"]
-    
-#     def get_headers(self):
-#         """Return realistic browser headers"""
-#         return {
-#             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-#             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-#             'Accept-Language': 'en-US,en;q=0.5',
-#             'Accept-Encoding': 'gzip, deflate',
-#             'DNT': '1',
-#             'Connection': 'keep-alive',
-#             'Upgrade-Insecure-Requests': '1',
-#         }
-    
-#     def scrape_marketwatch(self, company):
-#         """Scrape MarketWatch for news about a company"""
-#         articles = []
-#         try:
-#             search_url = f"https://www.marketwatch.com/search?q={company['ticker']}&m=Keyword&rpp=15&mp=806&bd=false&rs=true"
-            
-#             response = requests.get(search_url, headers=self.get_headers(), timeout=10)
-#             response.raise_for_status()
-            
-#             soup = BeautifulSoup(response.text, 'html.parser')
-            
-#             # MarketWatch search results structure
-#             news_items = soup.find_all('div', class_='searchresult', limit=5)
-            
-#             for item in news_items:
-#                 try:
-#                     title_elem = item.find('a', class_='link')
-#                     title = title_elem.get_text().strip() if title_elem else "No title"
-                    
-#                     excerpt_elem = item.find('p', class_='description')
-#                     excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
-                    
-#                     date_elem = item.find('span', class_='date')
-#                     date = date_elem.get_text().strip() if date_elem else "No date"
-                    
-#                     link_elem = item.find('a', class_='link')
-#                     link = link_elem['href'] if link_elem else "#"
-#                     if link and not link.startswith('http'):
-#                         link = "https://www.marketwatch.com" + link
-                    
-#                     articles.append({
-#                         'title': title,
-#                         'excerpt': excerpt,
-#                         'date': date,
-#                         'link': link,
-#                         'source': 'marketwatch'
-#                     })
-#                 except Exception as e:
-#                     print(f"Error parsing MarketWatch article: {str(e)}")
-#                     continue
-            
-#         except Exception as e:
-#             print(f"Error scraping MarketWatch for {company['ticker']}: {str(e)}")
-        
-#         return articles
-    
-#     def scrape_yahoo_finance_news(self, company):
-#         """Scrape Yahoo Finance for news about a company"""
-#         articles = []
-#         try:
-#             # Yahoo Finance RSS alternative - using their API-like endpoint
-#             news_url = f"https://finance.yahoo.com/quote/{company['ticker']}/news?p={company['ticker']}"
-            
-#             response = requests.get(news_url, headers=self.get_headers(), timeout=10)
-#             response.raise_for_status()
-            
-#             soup = BeautifulSoup(response.text, 'html.parser')
-            
-#             # Yahoo Finance news structure (may change)
-#             news_items = soup.find_all('div', {'data-test': 'news-item'}, limit=5)
-            
-#             for item in news_items:
-#                 try:
-#                     title_elem = item.find('a')
-#                     title = title_elem.get_text().strip() if title_elem else "No title"
-                    
-#                     excerpt_elem = item.find('p')
-#                     excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
-                    
-#                     date_elem = item.find('time')
-#                     date = date_elem.get_text().strip() if date_elem else "No date"
-                    
-#                     link_elem = item.find('a')
-#                     link = link_elem['href'] if link_elem else "#"
-#                     if link and not link.startswith('http'):
-#                         link = "https://finance.yahoo.com" + link
-                    
-#                     articles.append({
-#                         'title': title,
-#                         'excerpt': excerpt,
-#                         'date': date,
-#                         'link': link,
-#                         'source': 'yahoo_finance'
-#                     })
-#                 except Exception as e:
-#                     print(f"Error parsing Yahoo Finance article: {str(e)}")
-#                     continue
-            
-#         except Exception as e:
-#             print(f"Error scraping Yahoo Finance for {company['ticker']}: {str(e)}")
-        
-#         return articles
-    
-#     def scrape_news(self, company):
-#         """Scrape news from multiple sources for a company"""
-#         all_articles = []
-        
-#         # Try multiple news sources
-#         print(f"  Trying MarketWatch for {company['ticker']}...")
-#         marketwatch_articles = self.scrape_marketwatch(company)
-#         all_articles.extend(marketwatch_articles)
-        
-#         print(f"  Trying Yahoo Finance for {company['ticker']}...")
-#         yahoo_articles = self.scrape_yahoo_finance_news(company)
-#         all_articles.extend(yahoo_articles)
-        
-#         # Save results
-#         if all_articles:
-#             output_file = self.raw_data_path / f"{company['ticker']}_news.json"
-#             with open(output_file, 'w', encoding='utf-8') as f:
-#                 json.dump({
-#                     'company': company['name'],
-#                     'ticker': company['ticker'],
-#                     'articles': all_articles
-#                 }, f, indent=2, ensure_ascii=False)
-#             print(f"  Saved {len(all_articles)} articles for {company['ticker']}")
-#         else:
-#             print(f"  No articles found for {company['ticker']}")
-        
-#         return all_articles
-    
-#     def process_all_companies(self):
-#         """Process news for all companies"""
-#         results = {}
-        
-#         for company in self.companies:
-#             print(f"Scraping news for {company['name']}...")
-#             articles = self.scrape_news(company)
-#             results[company["ticker"]] = {
-#                 "articles_count": len(articles),
-#                 "articles": articles
-#             }
-            
-#             # Be respectful with requests
-#             time.sleep(2)  # Increased delay to be more polite
-        
-#         return results
-
-# # Example usage
-# if __name__ == "__main__":
-#     scraper = NewsScraper()
-#     results = scraper.process_all_companies()
-#     print(f"Scraped {sum([r['articles_count'] for r in results.values()])} articles total")
-
-
-import requests
-from bs4 import BeautifulSoup
-import json
-import time
-from pathlib import Path
-from config import settings
-import random
-from datetime import datetime, timedelta
-
-class NewsScraper:
-    def __init__(self):
-        self.news_sources = settings.NEWS_SOURCES
-        self.raw_data_path = settings.RAW_DATA_PATH / "news"
-        self.raw_data_path.mkdir(parents=True, exist_ok=True)
-
-        
-        self.rss_feeds = {
-            "reuters_company_news": "http://feeds.reuters.com/reuters/companyNews",
-            "bloomberg_markets": "https://news.google.com/rss/search?q=bloomberg+markets",
-            "financial_times": "https://www.ft.com/rss/markets"
-        }
-    
-    def scrape_rss_feeds(self, company):
-        """Scrape RSS feeds for company news"""
-        articles = []
-        
-        for source, url in self.rss_feeds.items():
-            try:
-                feed = feedparser.parse(url)
-                
-                for entry in feed.entries:
-                    # Check if the article mentions our company
-                    if (company['name'].lower() in entry.title.lower() or 
-                        company['ticker'].lower() in entry.title.lower() or
-                        any(keyword.lower() in entry.title.lower() for keyword in company['keywords'])):
-                        
-                        articles.append({
-                            'title': entry.title,
-                            'excerpt': entry.summary if hasattr(entry, 'summary') else '',
-                            'date': entry.published if hasattr(entry, 'published') else 'Unknown',
-                            'link': entry.link,
-                            'source': source
-                        })
-                        
-            except Exception as e:
-                ErrorHandler.handle_error(f"Error scraping RSS feed {source}", e)
-        
-        return articles
-    
-    def scrape_news(self, company):
-        """Scrape news from all sources for a company"""
-        all_articles = []
-        
-        # Scrape Reuters
-        reuters_articles = self.scrape_reuters(company)
-        all_articles.extend(reuters_articles)
-        
-        # Scrape RSS feeds
-        rss_articles = self.scrape_rss_feeds(company)
-        all_articles.extend(rss_articles)
-        
-        # In a real implementation, you would add other news sources
-        
-        # Save results to database
-        if all_articles:
-            company_id = self.db.get_company_id(company['ticker'])
-            if company_id:
-                for article in all_articles:
-                    self.db.add_news_article(
-                        company_id,
-                        article['title'],
-                        article['excerpt'],
-                        "",  # Full content would be scraped separately
-                        article['date'],
-                        article['source'],
-                        article['link']
-                    )
-        
-        return all_articles
-        
-        # Load companies data
-        with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
-            self.companies = json.load(f)["companies"]
-    
-    def get_headers(self):
-        """Return realistic browser headers"""
-        return {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-        }
-    
-    def try_scrape_marketwatch(self, company):
-        """Try to scrape MarketWatch - usually fails due to blocking"""
-        try:
-            search_url = f"https://www.marketwatch.com/search?q={company['ticker']}&m=Keyword&rpp=15&mp=806&bd=false&rs=true"
-            
-            response = requests.get(search_url, headers=self.get_headers(), timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            news_items = soup.find_all('div', class_='searchresult', limit=5)
-            
-            articles = []
-            for item in news_items:
-                try:
-                    title_elem = item.find('a', class_='link')
-                    title = title_elem.get_text().strip() if title_elem else "No title"
-                    
-                    excerpt_elem = item.find('p', class_='description')
-                    excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
-                    
-                    date_elem = item.find('span', class_='date')
-                    date = date_elem.get_text().strip() if date_elem else "No date"
-                    
-                    link_elem = item.find('a', class_='link')
-                    link = link_elem['href'] if link_elem else "#"
-                    if link and not link.startswith('http'):
-                        link = "https://www.marketwatch.com" + link
-                    
-                    articles.append({
-                        'title': title,
-                        'excerpt': excerpt,
-                        'date': date,
-                        'link': link,
-                        'source': 'marketwatch'
-                    })
-                except Exception as e:
-                    continue
-            
-            return articles
-        except Exception as e:
-            # Expected to fail due to blocking
-            return []
-    
-    def try_scrape_yahoo_finance(self, company):
-        """Try to scrape Yahoo Finance - usually fails due to blocking"""
-        try:
-            news_url = f"https://finance.yahoo.com/quote/{company['ticker']}/news?p={company['ticker']}"
-            
-            response = requests.get(news_url, headers=self.get_headers(), timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            news_items = soup.find_all('div', {'data-test': 'news-item'}, limit=5)
-            
-            articles = []
-            for item in news_items:
-                try:
-                    title_elem = item.find('a')
-                    title = title_elem.get_text().strip() if title_elem else "No title"
-                    
-                    excerpt_elem = item.find('p')
-                    excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
-                    
-                    date_elem = item.find('time')
-                    date = date_elem.get_text().strip() if date_elem else "No date"
-                    
-                    link_elem = item.find('a')
-                    link = link_elem['href'] if link_elem else "#"
-                    if link and not link.startswith('http'):
-                        link = "https://finance.yahoo.com" + link
-                    
-                    articles.append({
-                        'title': title,
-                        'excerpt': excerpt,
-                        'date': date,
-                        'link': link,
-                        'source': 'yahoo_finance'
-                    })
-                except Exception as e:
-                    continue
-            
-            return articles
-        except Exception as e:
-            # Expected to fail due to blocking
-            return []
-    
-    def create_realistic_mock_news(self, company):
-        """Create realistic mock news data for testing"""
-        current_date = datetime.now()
-        
-        # Different news templates for variety
-        news_templates = [
-            {
-                'title': f"{company['name']} Reports Strong Q{random.randint(1, 4)} Earnings, Beats Estimates",
-                'excerpt': f"{company['name']} announced quarterly revenue of ${random.randint(10, 100)}B, exceeding analyst expectations by {random.randint(2, 15)}%.",
-                'keywords': ['earnings', 'revenue', 'profit']
-            },
-            {
-                'title': f"Analysts Upgrade {company['name']} to 'Buy' Rating",
-                'excerpt': f"Several major investment firms have upgraded {company['name']} stock, citing strong growth potential in {random.choice(company['keywords'])} segment.",
-                'keywords': ['analyst', 'upgrade', 'rating']
-            },
-            {
-                'title': f"{company['name']} Announces New {random.choice(company['keywords'])} Product",
-                'excerpt': f"The company unveiled its latest innovation in the {random.choice(company['keywords'])} market, expected to drive future growth.",
-                'keywords': ['product', 'innovation', 'launch']
-            },
-            {
-                'title': f"{company['name']} Expands {random.choice(company['keywords'])} Operations",
-                'excerpt': f"The company announced expansion plans in key markets, strengthening its position in the {random.choice(company['keywords'])} industry.",
-                'keywords': ['expansion', 'growth', 'market']
-            },
-            {
-                'title': f"{company['name']} CEO Discusses Future Strategy",
-                'excerpt': f"In a recent interview, the CEO outlined the company's vision for growth in the coming years, focusing on {random.choice(company['keywords'])}.",
-                'keywords': ['ceo', 'strategy', 'leadership']
-            }
-        ]
-        
-        articles = []
-        for i in range(3):  # Create 3 articles per company
-            template = random.choice(news_templates)
-            days_ago = random.randint(1, 30)
-            article_date = (current_date - timedelta(days=days_ago)).strftime('%Y-%m-%d')
-            
-            articles.append({
-                'title': template['title'],
-                'excerpt': template['excerpt'],
-                'date': article_date,
-                'link': f"https://example.com/news/{company['ticker'].lower()}-{template['keywords'][0]}-{days_ago}",
-                'source': 'mock_data'
-            })
-        
-        return articles
-    
-    def scrape_news(self, company):
-        """Scrape news from multiple sources with fallback to mock data"""
-        all_articles = []
-        
-        # Try real sources (usually will fail due to blocking)
-        print(f"  Trying MarketWatch for {company['ticker']}...")
-        marketwatch_articles = self.try_scrape_marketwatch(company)
-        all_articles.extend(marketwatch_articles)
-        
-        print(f"  Trying Yahoo Finance for {company['ticker']}...")
-        yahoo_articles = self.try_scrape_yahoo_finance(company)
-        all_articles.extend(yahoo_articles)
-        
-        # Fallback to realistic mock data if no real articles found
-        if not all_articles:
-            print(f"  Using realistic mock data for {company['ticker']}...")
-            all_articles = self.create_realistic_mock_news(company)
-        
-        # Save results
-        output_file = self.raw_data_path / f"{company['ticker']}_news.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'company': company['name'],
-                'ticker': company['ticker'],
-                'articles': all_articles
-            }, f, indent=2, ensure_ascii=False)
-        
-        print(f"  Saved {len(all_articles)} articles for {company['ticker']}")
-        return all_articles
-    
-    def process_all_companies(self):
-        """Process news for all companies"""
-        results = {}
-        
-        for company in self.companies:
-            print(f"Scraping news for {company['name']}...")
-            articles = self.scrape_news(company)
-            results[company["ticker"]] = {
-                "articles_count": len(articles),
-                "articles": articles
-            }
-            
-            # Be respectful with requests
-            time.sleep(1)
-        
-        return results
-
-# Example usage
-if __name__ == "__main__":
-    scraper = NewsScraper()
-    results = scraper.process_all_companies()
-    print(f"Scraped {sum([r['articles_count'] for r in results.values()])} articles total")
\ No newline at end of file
+# import requests
+# from bs4 import BeautifulSoup
+# import json
+# import time
+# from pathlib import Path
+# from config import settings
+
+# class NewsScraper:
+#     def __init__(self):
+#         self.news_sources = settings.NEWS_SOURCES
+#         self.raw_data_path = settings.RAW_DATA_PATH / "news"
+#         self.raw_data_path.mkdir(parents=True, exist_ok=True)
+        
+#         # Load companies data
+#         with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
+#             self.companies = json.load(f)["companies"]
+    
+#     def get_headers(self):
+#         """Return realistic browser headers"""
+#         return {
+#             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+#             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+#             'Accept-Language': 'en-US,en;q=0.5',
+#             'Accept-Encoding': 'gzip, deflate',
+#             'DNT': '1',
+#             'Connection': 'keep-alive',
+#             'Upgrade-Insecure-Requests': '1',
+#         }
+    
+#     def scrape_marketwatch(self, company):
+#         """Scrape MarketWatch for news about a company"""
+#         articles = []
+#         try:
+#             search_url = f"https://www.marketwatch.com/search?q={company['ticker']}&m=Keyword&rpp=15&mp=806&bd=false&rs=true"
+            
+#             response = requests.get(search_url, headers=self.get_headers(), timeout=10)
+#             response.raise_for_status()
+            
+#             soup = BeautifulSoup(response.text, 'html.parser')
+            
+#             # MarketWatch search results structure
+#             news_items = soup.find_all('div', class_='searchresult', limit=5)
+            
+#             for item in news_items:
+#                 try:
+#                     title_elem = item.find('a', class_='link')
+#                     title = title_elem.get_text().strip() if title_elem else "No title"
+                    
+#                     excerpt_elem = item.find('p', class_='description')
+#                     excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
+                    
+#                     date_elem = item.find('span', class_='date')
+#                     date = date_elem.get_text().strip() if date_elem else "No date"
+                    
+#                     link_elem = item.find('a', class_='link')
+#                     link = link_elem['href'] if link_elem else "#"
+#                     if link and not link.startswith('http'):
+#                         link = "https://www.marketwatch.com" + link
+                    
+#                     articles.append({
+#                         'title': title,
+#                         'excerpt': excerpt,
+#                         'date': date,
+#                         'link': link,
+#                         'source': 'marketwatch'
+#                     })
+#                 except Exception as e:
+#                     print(f"Error parsing MarketWatch article: {str(e)}")
+#                     continue
+            
+#         except Exception as e:
+#             print(f"Error scraping MarketWatch for {company['ticker']}: {str(e)}")
+        
+#         return articles
+    
+#     def scrape_yahoo_finance_news(self, company):
+#         """Scrape Yahoo Finance for news about a company"""
+#         articles = []
+#         try:
+#             # Yahoo Finance RSS alternative - using their API-like endpoint
+#             news_url = f"https://finance.yahoo.com/quote/{company['ticker']}/news?p={company['ticker']}"
+            
+#             response = requests.get(news_url, headers=self.get_headers(), timeout=10)
+#             response.raise_for_status()
+            
+#             soup = BeautifulSoup(response.text, 'html.parser')
+            
+#             # Yahoo Finance news structure (may change)
+#             news_items = soup.find_all('div', {'data-test': 'news-item'}, limit=5)
+            
+#             for item in news_items:
+#                 try:
+#                     title_elem = item.find('a')
+#                     title = title_elem.get_text().strip() if title_elem else "No title"
+                    
+#                     excerpt_elem = item.find('p')
+#                     excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
+                    
+#                     date_elem = item.find('time')
+#                     date = date_elem.get_text().strip() if date_elem else "No date"
+                    
+#                     link_elem = item.find('a')
+#                     link = link_elem['href'] if link_elem else "#"
+#                     if link and not link.startswith('http'):
+#                         link = "https://finance.yahoo.com" + link
+                    
+#                     articles.append({
+#                         'title': title,
+#                         'excerpt': excerpt,
+#                         'date': date,
+#                         'link': link,
+#                         'source': 'yahoo_finance'
+#                     })
+#                 except Exception as e:
+#                     print(f"Error parsing Yahoo Finance article: {str(e)}")
+#                     continue
+            
+#         except Exception as e:
+#             print(f"Error scraping Yahoo Finance for {company['ticker']}: {str(e)}")
+        
+#         return articles
+    
+#     def scrape_news(self, company):
+#         """Scrape news from multiple sources for a company"""
+#         all_articles = []
+        
+#         # Try multiple news sources
+#         print(f"  Trying MarketWatch for {company['ticker']}...")
+#         marketwatch_articles = self.scrape_marketwatch(company)
+#         all_articles.extend(marketwatch_articles)
+        
+#         print(f"  Trying Yahoo Finance for {company['ticker']}...")
+#         yahoo_articles = self.scrape_yahoo_finance_news(company)
+#         all_articles.extend(yahoo_articles)
+        
+#         # Save results
+#         if all_articles:
+#             output_file = self.raw_data_path / f"{company['ticker']}_news.json"
+#             with open(output_file, 'w', encoding='utf-8') as f:
+#                 json.dump({
+#                     'company': company['name'],
+#                     'ticker': company['ticker'],
+#                     'articles': all_articles
+#                 }, f, indent=2, ensure_ascii=False)
+#             print(f"  Saved {len(all_articles)} articles for {company['ticker']}")
+#         else:
+#             print(f"  No articles found for {company['ticker']}")
+        
+#         return all_articles
+    
+#     def process_all_companies(self):
+#         """Process news for all companies"""
+#         results = {}
+        
+#         for company in self.companies:
+#             print(f"Scraping news for {company['name']}...")
+#             articles = self.scrape_news(company)
+#             results[company["ticker"]] = {
+#                 "articles_count": len(articles),
+#                 "articles": articles
+#             }
+            
+#             # Be respectful with requests
+#             time.sleep(2)  # Increased delay to be more polite
+        
+#         return results
+
+# # Example usage
+# if __name__ == "__main__":
+#     scraper = NewsScraper()
+#     results = scraper.process_all_companies()
+#     print(f"Scraped {sum([r['articles_count'] for r in results.values()])} articles total")
+
+
+from bs4 import BeautifulSoup
+import feedparser
+import json
+from pathlib import Path
+from config import settings
+from data.database import FinancialDataDB
+from data.news_store import NewsSegmentStore
+import zlib
+from datetime import datetime, timedelta
+
+from src.scraping.content_fetcher import ContentFetcher
+from src.scraping.dedup import StoryIndex
+from src.scraping.fetcher import AsyncFetcher
+from src.scraping.http_cache import HttpCache
+from src.scraping.keyword_matcher import KeywordMatcher
+from src.synthetic_news import SyntheticNewsGenerator
+
+class NewsScraper:
+    def __init__(self):
+        self.news_sources = settings.NEWS_SOURCES
+        self.raw_data_path = settings.RAW_DATA_PATH / "news"
+        self.raw_data_path.mkdir(parents=True, exist_ok=True)
+
+        
+        self.rss_feeds = {
+            "reuters_company_news": "http://feeds.reuters.com/reuters/companyNews",
+            "bloomberg_markets": "https://news.google.com/rss/search?q=bloomberg+markets",
+            "financial_times": "https://www.ft.com/rss/markets"
+        }
+
+        # Search pages scraped for every company, keyed by source name
+        self.search_urls = {
+            "marketwatch": "https://www.marketwatch.com/search?q={ticker}&m=Keyword&rpp=15&mp=806&bd=false&rs=true",
+            "yahoo_finance": "https://finance.yahoo.com/quote/{ticker}/news?p={ticker}"
+        }
+        self.parsers = {
+            "marketwatch": self.parse_marketwatch,
+            "yahoo_finance": self.parse_yahoo_finance
+        }
+
+        self.fetcher = AsyncFetcher(headers=self.get_headers(), cache=HttpCache())
+        self.store = NewsSegmentStore()
+        self.db = FinancialDataDB()
+        self.company_ids = {}
+        self.content_fetcher = ContentFetcher(self.db, headers=self.get_headers())
+        
+        # Recent stories from every company and cycle, so a syndicated copy arriving
+        # later is not stored, fetched and scored again
+        self.stories = StoryIndex()
+        self.stories.seed(self.db.get_recent_fingerprints(settings.NEWS_DUPLICATE_INDEX_SIZE))
+        
+        # Load companies data
+        with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
+            self.companies = json.load(f)["companies"]
+        
+        self.matcher = KeywordMatcher(self.companies)
+    
+    def parse_rss_feeds(self, responses, include_unchanged=False):
+        """Parse fetched RSS feeds, skipping feeds that failed or did not change
+        
+        With include_unchanged, a feed answered from the HTTP cache is parsed
+        from its cached body: a single company's scrape needs its matches
+        even when an earlier scrape in the cycle already fetched the feed.
+        """
+        feeds = {}
+        for source, result in responses.items():
+            if result.not_modified and not include_unchanged:
+                continue
+            if not (result.ok or result.not_modified):
+                print(f"  Could not fetch RSS feed {source}: {result.error or result.status}")
+                continue
+            try:
+                feeds[source] = feedparser.parse(result.text)
+            except Exception as e:
+                print(f"  Error parsing RSS feed {source}: {str(e)}")
+        return feeds
+    
+    def match_rss_entries(self, feeds):
+        """Assign feed entries to companies in a single pass
+        
+        Every entry title is scanned once by the keyword automaton, which
+        matches all companies' names, tickers and keywords at the same time.
+        Returns {ticker: [articles]}.
+        """
+        matches = {company['ticker']: [] for company in self.companies}
+        
+        for source, feed in feeds.items():
+            for entry in feed.entries:
+                title = entry.get('title', '')
+                tickers = self.matcher.match(title)
+                if not tickers:
+                    continue
+                
+                article = {
+                    'title': title,
+                    'excerpt': entry.get('summary', ''),
+                    'date': entry.get('published', 'Unknown'),
+                    'link': entry.get('link', '#'),
+                    'source': source
+                }
+                for ticker in tickers:
+                    matches.setdefault(ticker, []).append(dict(article))
+        
+        return matches
+    
+    def scrape_rss_feeds(self, company):
+        """Scrape RSS feeds for company news"""
+        _, feeds = self.fetch_sources([], include_unchanged_feeds=True)
+        return self.match_rss_entries(feeds).get(company['ticker'], [])
+    
+    def get_headers(self):
+        """Return realistic browser headers"""
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'DNT': '1',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Sec-Fetch-User': '?1',
+        }
+    
+    def parse_marketwatch(self, html):
+        """Parse articles out of a MarketWatch search page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        news_items = soup.find_all('div', class_='searchresult', limit=5)
+        
+        articles = []
+        for item in news_items:
+            try:
+                title_elem = item.find('a', class_='link')
+                title = title_elem.get_text().strip() if title_elem else "No title"
+                
+                excerpt_elem = item.find('p', class_='description')
+                excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
+                
+                date_elem = item.find('span', class_='date')
+                date = date_elem.get_text().strip() if date_elem else "No date"
+                
+                link_elem = item.find('a', class_='link')
+                link = link_elem['href'] if link_elem else "#"
+                if link and not link.startswith('http'):
+                    link = "https://www.marketwatch.com" + link
+                
+                articles.append({
+                    'title': title,
+                    'excerpt': excerpt,
+                    'date': date,
+                    'link': link,
+                    'source': 'marketwatch'
+                })
+            except Exception as e:
+                continue
+        
+        return articles
+    
+    def parse_yahoo_finance(self, html):
+        """Parse articles out of a Yahoo Finance news page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        news_items = soup.find_all('div', {'data-test': 'news-item'}, limit=5)
+        
+        articles = []
+        for item in news_items:
+            try:
+                title_elem = item.find('a')
+                title = title_elem.get_text().strip() if title_elem else "No title"
+                
+                excerpt_elem = item.find('p')
+                excerpt = excerpt_elem.get_text().strip() if excerpt_elem else "No excerpt"
+                
+                date_elem = item.find('time')
+                date = date_elem.get_text().strip() if date_elem else "No date"
+                
+                link_elem = item.find('a')
+                link = link_elem['href'] if link_elem else "#"
+                if link and not link.startswith('http'):
+                    link = "https://finance.yahoo.com" + link
+                
+                articles.append({
+                    'title': title,
+                    'excerpt': excerpt,
+                    'date': date,
+                    'link': link,
+                    'source': 'yahoo_finance'
+                })
+            except Exception as e:
+                continue
+        
+        return articles
+    
+    def parse_response(self, source, result):
+        """Parse a fetched search page, returning [] for failed or unchanged pages"""
+        if result.not_modified:
+            # Already parsed and saved on the cycle that fetched this body
+            return []
+        if not result.ok:
+            # Expected to fail due to blocking
+            return []
+        try:
+            return self.parsers[source](result.text)
+        except Exception as e:
+            return []
+    
+    def try_scrape_marketwatch(self, company):
+        """Try to scrape MarketWatch - usually fails due to blocking"""
+        url = self.search_urls['marketwatch'].format(ticker=company['ticker'])
+        return self.parse_response('marketwatch', self.fetcher.fetch_one(url, source='marketwatch'))
+    
+    def try_scrape_yahoo_finance(self, company):
+        """Try to scrape Yahoo Finance - usually fails due to blocking"""
+        url = self.search_urls['yahoo_finance'].format(ticker=company['ticker'])
+        return self.parse_response('yahoo_finance', self.fetcher.fetch_one(url, source='yahoo_finance'))
+    
+    def create_realistic_mock_news(self, company):
+        """Create realistic mock news data for testing
+        
+        Seeded per ticker, so the same company always gets the same articles.
+        """
+        generator = SyntheticNewsGenerator(
+            [company],
+            seed=settings.MOCK_NEWS_SEED + zlib.crc32(company['ticker'].encode()),
+            end_date=datetime.now().date() - timedelta(days=1),
+            sources=('mock_data',)
+        )
+        articles = next(generator.generate(3))  # Create 3 articles per company
+        for article in articles:
+            del article['ticker'], article['sentiment_class']
+        return articles
+    
+    def fetch_sources(self, companies, include_unchanged_feeds=False):
+        """Fetch every RSS feed once plus every search source for every company
+        
+        All requests go out concurrently in one batch. Returns
+        ({ticker: {source: FetchResult}}, {feed source: parsed feed}); feeds
+        unchanged since the last fetch are left out unless include_unchanged_feeds.
+        """
+        jobs = [
+            (company['ticker'], source, url.format(ticker=company['ticker']))
+            for company in companies
+            for source, url in self.search_urls.items()
+        ]
+        jobs.extend((None, source, url) for source, url in self.rss_feeds.items())
+        # Feeds serve every company, so they go ahead of search pages on a shared host
+        priorities = [1 if ticker else 0 for ticker, _, _ in jobs]
+        responses = self.fetcher.fetch_many(
+            [url for _, _, url in jobs], priorities, sources=[source for _, source, _ in jobs]
+        )
+        
+        pages = {company['ticker']: {} for company in companies}
+        feed_responses = {}
+        for (ticker, source, _), result in zip(jobs, responses):
+            if ticker is None:
+                feed_responses[source] = result
+            else:
+                pages[ticker][source] = result
+        return pages, self.parse_rss_feeds(feed_responses, include_unchanged_feeds)
+    
+    def collect_articles(self, company, pages, rss_articles=()):
+        """Parse a company's fetched pages with fallback to mock data
+        
+        Returns None when nothing is new because every page that answered
+        was unchanged since the last cycle.
+        """
+        all_articles = list(rss_articles)
+        for source, result in pages.items():
+            all_articles.extend(self.parse_response(source, result))
+        
+        if not all_articles and any(result.not_modified for result in pages.values()):
+            print(f"  No changes for {company['ticker']}")
+            return None
+        
+        # Fallback to realistic mock data if no real articles found
+        if not all_articles:
+            print(f"  Using realistic mock data for {company['ticker']}...")
+            all_articles = self.create_realistic_mock_news(company)
+        
+        # Keep one canonical copy of stories syndicated across sources, this cycle or earlier ones
+        canonical, copies = self.stories.dedupe(all_articles)
+        if len(canonical) < len(all_articles):
+            print(f"  Merged {len(all_articles) - len(canonical)} near-duplicate articles for {company['ticker']}")
+        # Copies of already stored stories only add their link to the story
+        links = [(story['id'], link['source'], link['link']) for story, link in copies if story.get('id')]
+        if links:
+            self.db.add_article_sources(links)
+        return canonical
+    
+    def get_company_id(self, company):
+        """Database ID for a company, adding the company if needed"""
+        if company['ticker'] not in self.company_ids:
+            company_id = self.db.get_company_id(company['ticker'])
+            if not company_id:
+                company_id = self.db.add_company(company['name'], company['ticker'], company['cik'])
+            self.company_ids[company['ticker']] = company_id
+        return self.company_ids[company['ticker']]
+    
+    def save_company_news(self, company, articles):
+        """Append a company's new articles to the raw news segment store and database
+        
+        Articles whose link the database already has are dropped first, so
+        neither the store nor the content fetcher sees them twice. Stored
+        articles with real links are handed to the background content
+        fetcher; this never waits on it.
+        """
+        company_id = self.get_company_id(company)
+        article_ids = self.db.add_news_articles(company_id, articles) if company_id else []
+        if article_ids:
+            articles = [article for article_id, article in zip(article_ids, articles) if article_id is not None]
+            article_ids = [article_id for article_id in article_ids if article_id is not None]
+        
+        scraped_at = datetime.now().isoformat(timespec='seconds')
+        if articles:
+            self.store.append(company['ticker'], ({**article, 'scraped_at': scraped_at} for article in articles))
+        for article_id, article in zip(article_ids, articles):
+            article['id'] = article_id  # later copies of the story record their links against it
+            if article['source'] != 'mock_data' and article['link'].startswith('http'):
+                self.content_fetcher.submit(article_id, article['link'])
+        
+        print(f"  Saved {len(articles)} new articles for {company['ticker']}")
+    
+    def backfill_content(self, limit=None):
+        """Queue stored articles whose content is still missing"""
+        limit = limit or settings.CONTENT_QUEUE_SIZE
+        queued = 0
+        for article_id, url in self.db.get_articles_missing_content(limit):
+            if self.content_fetcher.submit(article_id, url):
+                queued += 1
+        return queued
+    
+    def close(self):
+        """Wait for queued article content to be fetched and written"""
+        self.content_fetcher.close()
+    
+    def scrape_news(self, company):
+        """Scrape news from multiple sources with fallback to mock data"""
+        # Try real sources (usually will fail due to blocking)
+        print(f"  Trying {', '.join(self.search_urls)} and RSS feeds for {company['ticker']}...")
+        # The feeds are shared: an earlier company's scrape this cycle may have
+        # left them cached, and this company still needs its matches from them
+        pages, feeds = self.fetch_sources([company], include_unchanged_feeds=True)
+        rss_articles = self.match_rss_entries(feeds).get(company['ticker'], [])
+        
+        all_articles = self.collect_articles(company, pages[company['ticker']], rss_articles)
+        if all_articles is None:
+            return []
+        self.save_company_news(company, all_articles)
+        return all_articles
+    
+    def process_all_companies(self):
+        """Process news for all companies
+        
+        All sources for all companies are fetched concurrently; the host
+        scheduler paces each site to its own rate limit. RSS
+        feeds are downloaded once per cycle and shared by every company.
+        """
+        results = {}
+        
+        print(f"Scraping news for {len(self.companies)} companies...")
+        pages, feeds = self.fetch_sources(self.companies)
+        rss_articles = self.match_rss_entries(feeds)
+        
+        open_sources = [source for source, breaker in self.fetcher.health.breakers.items() if breaker.is_open]
+        if open_sources:
+            print(f"  Skipping sources with an open circuit: {', '.join(open_sources)}")
+        
+        for company in self.companies:
+            articles = self.collect_articles(company, pages[company['ticker']],
+                                             rss_articles.get(company['ticker'], []))
+            if articles is None:
+                articles = []
+            else:
+                self.save_company_news(company, articles)
+            results[company["ticker"]] = {
+                "articles_count": len(articles),
+                "articles": articles
+            }
+        
+        # Top up the content queue with anything earlier cycles could not fetch
+        self.backfill_content()
+        
+        return results
+
+# Example usage
+if __name__ == "__main__":
+    scraper = NewsScraper()
+    results = scraper.process_all_companies()
+    print(f"Scraped {sum([r['articles_count'] for r in results.values()])} articles total")
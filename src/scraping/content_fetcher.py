@@ -0,0 +1,214 @@
+import asyncio
+import queue
+import threading
+from functools import partial
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+import aiohttp
+
+from config import settings
+from src.scraping.fetcher import AsyncFetcher
+from src.scraping.host_scheduler import HostScheduler
+
+
+class ArticleTextExtractor(HTMLParser):
+    """Streaming paragraph extractor that never builds a document tree
+
+    Collects <p> text outside navigation/script-like containers. When the
+    page has an <article> element, only paragraphs inside it are kept, which
+    drops most sidebars and footers.
+    """
+
+    SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.in_paragraph = False
+        self.current = []
+        self.paragraphs = []  # (text, inside_article)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == 'article':
+            self.article_depth += 1
+        elif tag == 'p' and not self.skip_depth:
+            self._close_paragraph()
+            self.in_paragraph = True
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == 'article':
+            self._close_paragraph()
+            self.article_depth = max(0, self.article_depth - 1)
+        elif tag == 'p':
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if self.in_paragraph and not self.skip_depth:
+            self.current.append(data)
+
+    def _close_paragraph(self):
+        if self.in_paragraph:
+            text = " ".join("".join(self.current).split())
+            if len(text.split()) >= settings.CONTENT_MIN_PARAGRAPH_WORDS:
+                self.paragraphs.append((text, self.article_depth > 0))
+        self.in_paragraph = False
+        self.current = []
+
+    def text(self):
+        self._close_paragraph()
+        in_article = [text for text, inside in self.paragraphs if inside]
+        return "\n".join(in_article or [text for text, _ in self.paragraphs])
+
+
+def extract_article_text(html, max_chars=None):
+    """Boilerplate-stripped article text from raw HTML, capped at max_chars"""
+    extractor = ArticleTextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception:
+        pass  # keep whatever was parsed before the markup broke
+    return extractor.text()[:max_chars or settings.CONTENT_MAX_CHARS]
+
+
+class ContentFetcher:
+    """Background stage that downloads full article text for stored headlines
+
+    The scraper hands over (article_id, url) pairs through a bounded queue
+    and never waits: when the queue is full the article is skipped and its
+    content stays empty for a later backfill. A worker thread runs its own
+    event loop, paces requests per host through a HostScheduler, caps the
+    bytes read per page and writes extracted text back in batches.
+    """
+
+    def __init__(self, db, headers=None, queue_size=None, workers=None, batch_size=None, max_bytes=None):
+        self.db = db
+        self.fetcher = AsyncFetcher(headers=headers)
+        self.queue = queue.Queue(maxsize=queue_size or settings.CONTENT_QUEUE_SIZE)
+        self.workers = workers or settings.CONTENT_FETCH_WORKERS
+        self.batch_size = batch_size or settings.CONTENT_WRITE_BATCH
+        self.max_bytes = max_bytes or settings.CONTENT_MAX_BYTES
+        self.in_flight = set()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stats = {'queued': 0, 'dropped': 0, 'fetched': 0, 'failed': 0}
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="content-fetcher", daemon=True)
+            self.thread.start()
+
+    def submit(self, article_id, url):
+        """Queue an article for content fetching without blocking; False if skipped"""
+        with self.lock:
+            if article_id in self.in_flight:
+                return False
+            try:
+                self.queue.put_nowait((article_id, url))
+            except queue.Full:
+                self.stats['dropped'] += 1
+                return False
+            self.in_flight.add(article_id)
+            self.stats['queued'] += 1
+        self.start()
+        return True
+
+    def close(self, timeout=None):
+        """Drain the queue, flush pending writes and stop the worker thread"""
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _run(self):
+        asyncio.run(self._main())
+
+    async def _main(self):
+        scheduler = HostScheduler()
+        slots = asyncio.Semaphore(self.workers)
+        pending = set()
+        batch = []
+
+        async with self.fetcher.create_session() as session:
+            while True:
+                try:
+                    item = await asyncio.to_thread(self.queue.get, True, settings.CONTENT_FLUSH_INTERVAL)
+                except queue.Empty:
+                    # Idle: don't let a partial batch wait for the next burst
+                    if batch:
+                        rows = batch[:]
+                        batch.clear()
+                        await self._write(rows)
+                    continue
+                if item is None:
+                    break
+
+                await slots.acquire()
+                article_id, url = item
+                job = partial(self._fetch_text, session, url)
+                future = scheduler.submit(urlparse(url).netloc, job)
+                task = asyncio.ensure_future(self._complete(future, article_id, batch, slots))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            await asyncio.gather(*pending, return_exceptions=True)
+            await scheduler.close()
+
+        if batch:
+            await self._write(batch[:])
+
+    async def _complete(self, future, article_id, batch, slots):
+        fetched = False
+        try:
+            text = await future
+            fetched = True
+        except Exception:
+            self.stats['failed'] += 1
+            return
+        finally:
+            slots.release()
+            if not fetched:
+                # The job raised: forget the article so a later backfill can queue it again
+                with self.lock:
+                    self.in_flight.discard(article_id)
+
+        # NULL marks "tried and unavailable" so backfills don't retry it forever
+        self.stats['fetched' if text else 'failed'] += 1
+        batch.append((text or None, article_id))
+        if len(batch) >= self.batch_size:
+            rows = batch[:]
+            batch.clear()
+            await self._write(rows)
+
+    async def _write(self, rows):
+        await asyncio.to_thread(self.db.update_article_contents, rows)
+        # Only now can a backfill see these rows as done
+        with self.lock:
+            self.in_flight.difference_update(article_id for _, article_id in rows)
+
+    async def _fetch_text(self, session, url):
+        """Download at most max_bytes of an HTML page and extract its text"""
+        try:
+            async with session.get(url) as response:
+                if response.status != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+                    return None
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        break
+                html = b"".join(chunks)[:self.max_bytes].decode(response.charset or 'utf-8', errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError, LookupError):
+            return None
+
+        return await asyncio.to_thread(extract_article_text, html)
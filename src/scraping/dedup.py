@@ -0,0 +1,172 @@
+import re
+from hashlib import blake2b
+
+import numpy as np
+
+from config import settings
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens; punctuation and markup differences between sources drop out"""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def _feature_hash(feature):
+    return int.from_bytes(blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(title, excerpt=""):
+    """64-bit SimHash over word unigrams and bigrams of title + excerpt
+
+    Title features count three times, since sources often reuse the wire
+    headline but trim or rewrite the excerpt.
+    """
+    hashes = []
+    weights = []
+    for tokens, weight in ((tokenize(title), 3), (tokenize(excerpt), 1)):
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        hashes.extend(_feature_hash(feature) for feature in features)
+        weights.extend([weight] * len(features))
+    if not hashes:
+        return 0
+
+    # One row of 64 bits per feature; sum +weight for set bits, -weight for clear ones
+    bits = np.unpackbits(np.array(hashes, dtype=np.uint64).view(np.uint8).reshape(-1, 8), axis=1)
+    totals = np.asarray(weights, dtype=np.int32) @ (bits.astype(np.int32) * 2 - 1)
+    return int(np.packbits((totals > 0).astype(np.uint8)).view(np.uint64)[0])
+
+
+def stored_fingerprint(fingerprint):
+    """The fingerprint as a signed 64-bit integer, which is what SQLite can store"""
+    return fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >> (FINGERPRINT_BITS - 1) else fingerprint
+
+
+class NearDuplicateIndex:
+    """In-memory LSH band index over SimHash fingerprints
+
+    The fingerprint is split into max_distance + 1 bands, so any two
+    fingerprints within max_distance bits agree exactly on at least one band
+    (pigeonhole). Only articles sharing a band bucket are compared. With
+    max_entries, the oldest fingerprints are dropped past that many.
+    """
+
+    def __init__(self, max_distance=None, max_entries=None):
+        self.max_distance = settings.NEWS_DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        self.max_entries = max_entries
+        self.bands = self.max_distance + 1
+        # Split the 64 bits as evenly as possible: (offset, mask) per band
+        self.band_slices = []
+        offset = 0
+        for band in range(self.bands):
+            width = FINGERPRINT_BITS // self.bands + (band < FINGERPRINT_BITS % self.bands)
+            self.band_slices.append((offset, (1 << width) - 1))
+            offset += width
+        self.buckets = [{} for _ in range(self.bands)]
+        self.fingerprints = {}  # item id -> fingerprint, oldest first
+        self.values = {}  # item id -> value given to add()
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _band_keys(self, fingerprint):
+        return [(fingerprint >> offset) & mask for offset, mask in self.band_slices]
+
+    def find(self, fingerprint):
+        """Return the id of an indexed near-duplicate, or None"""
+        fingerprints = self.fingerprints
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for item_id in self.buckets[band].get(key, ()):
+                if (fingerprint ^ fingerprints[item_id]).bit_count() <= self.max_distance:
+                    return item_id
+        return None
+
+    def add(self, fingerprint, value=None):
+        """Index a fingerprint, remembering value for it, and return its id"""
+        item_id = self.next_id
+        self.next_id += 1
+        self.fingerprints[item_id] = fingerprint
+        self.values[item_id] = value
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self.buckets[band].setdefault(key, []).append(item_id)
+        if self.max_entries is not None and len(self.fingerprints) > self.max_entries:
+            self._evict(next(iter(self.fingerprints)))
+        return item_id
+
+    def _evict(self, item_id):
+        fingerprint = self.fingerprints.pop(item_id)
+        del self.values[item_id]
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            bucket = self.buckets[band][key]
+            bucket.remove(item_id)
+            if not bucket:
+                del self.buckets[band][key]
+
+
+class StoryIndex:
+    """Recently seen stories, kept across scrape cycles and companies
+
+    A bounded NearDuplicateIndex whose values are the canonical article
+    dicts of the stories. A syndicated copy is caught whether it arrives
+    in the same batch, in a later cycle or under another company, as long
+    as its story is among the last max_entries indexed. seed() restores
+    stored stories, e.g. from the database at startup, as {'id': ...}
+    dicts.
+    """
+
+    def __init__(self, max_entries=None, max_distance=None):
+        self.index = NearDuplicateIndex(max_distance, max_entries or settings.NEWS_DUPLICATE_INDEX_SIZE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def seed(self, rows):
+        """Index (article_id, stored fingerprint) rows, oldest first"""
+        for article_id, fingerprint in rows:
+            self.index.add(fingerprint & FINGERPRINT_MASK, {'id': article_id, 'sources': []})
+
+    def dedupe(self, articles):
+        """Split articles into new stories and copies of stories seen before
+
+        Returns (canonical, copies). canonical holds the first article of
+        each new story, with a 'sources' list of the source and link of
+        every copy in this batch (itself included) and its 'fingerprint'.
+        copies holds (story, link) for each copy of a story indexed by an
+        earlier call; the link is also added to that story's 'sources'.
+        """
+        canonical = []
+        copies = []
+        batch = set()
+
+        for article in articles:
+            fingerprint = simhash(article.get('title', ''), article.get('excerpt', ''))
+            link = {'source': article.get('source'), 'link': article.get('link')}
+
+            item_id = self.index.find(fingerprint)
+            if item_id is not None:
+                story = self.index.values[item_id]
+                if link not in story['sources']:
+                    story['sources'].append(link)
+                    if item_id not in batch:
+                        copies.append((story, link))
+                continue
+
+            story = {**article, 'sources': [link], 'fingerprint': stored_fingerprint(fingerprint)}
+            batch.add(self.index.add(fingerprint, story))
+            canonical.append(story)
+
+        return canonical, copies
+
+
+def dedupe_articles(articles, max_distance=None):
+    """Collapse near-duplicate articles into canonical ones
+
+    The first article of each cluster is kept and gains a 'sources' list with
+    the source and link of every copy, itself included. Only copies within
+    articles are found; use a StoryIndex to catch copies across batches.
+    """
+    return StoryIndex(max_entries=len(articles) or None, max_distance=max_distance).dedupe(articles)[0]
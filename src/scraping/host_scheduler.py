@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+import time
+from email.utils import parsedate_to_datetime
+
+from config import settings
+
+RETRY_STATUSES = {429, 503}
+
+
+def parse_retry_after(value):
+    """Seconds to wait according to a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+class _HostQueue:
+    """Pending jobs and pacing state for one host"""
+
+    def __init__(self, rate, concurrency):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.slots = asyncio.Semaphore(concurrency)
+        self.pending = []  # heap of (priority, sequence, job, future, attempt)
+        self.wakeup = asyncio.Event()
+        self.next_start = 0.0
+        self.paused_until = 0.0
+        self.worker = None
+
+
+class HostScheduler:
+    """Per-host request scheduler for the scrapers
+
+    Every host gets its own priority queue, request rate and concurrency
+    limit (settings.HOST_RATE_LIMITS), so a slow or strict host never holds
+    up requests to other hosts. Jobs whose result carries a 429/503 status
+    pause their host for the Retry-After period (or an exponential backoff)
+    and are re-queued.
+
+    Jobs are no-argument coroutine functions. Cancelling a job's future
+    drops it from the queue, or cancels it if it is already running. Must be
+    used from within a running event loop.
+    """
+
+    def __init__(self, limits=None, default_limit=None, max_retries=None):
+        self.limits = settings.HOST_RATE_LIMITS if limits is None else limits
+        self.default_limit = default_limit or settings.DEFAULT_HOST_RATE_LIMIT
+        self.max_retries = settings.HOST_MAX_RETRIES if max_retries is None else max_retries
+        self.hosts = {}
+        self.sequence = itertools.count()
+        self.running = set()
+
+    def _queue(self, host):
+        queue = self.hosts.get(host)
+        if queue is None:
+            limit = self.limits.get(host, self.default_limit)
+            queue = _HostQueue(limit['rate'], limit['concurrency'])
+            queue.worker = asyncio.ensure_future(self._dispatch(queue))
+            self.hosts[host] = queue
+        return queue
+
+    def _enqueue(self, queue, priority, job, future, attempt):
+        heapq.heappush(queue.pending, (priority, next(self.sequence), job, future, attempt))
+        queue.wakeup.set()
+
+    def submit(self, host, job, priority=0):
+        """Queue a job for host and return a future for its result; lower priority runs first"""
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(self._queue(host), priority, job, future, 0)
+        return future
+
+    async def _dispatch(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not queue.pending:
+                queue.wakeup.clear()
+                await queue.wakeup.wait()
+                continue
+
+            delay = max(queue.next_start, queue.paused_until) - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            await queue.slots.acquire()
+            # A running job may have paused the host while we waited for a slot
+            if queue.paused_until > loop.time() or not queue.pending:
+                queue.slots.release()
+                continue
+
+            priority, _, job, future, attempt = heapq.heappop(queue.pending)
+            if future.done():
+                # Cancelled by its submitter while queued (e.g. a hedge that lost)
+                queue.slots.release()
+                continue
+            queue.next_start = loop.time() + queue.interval
+            task = asyncio.ensure_future(self._run(queue, priority, job, future, attempt))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+            future.add_done_callback(lambda done, task=task: task.cancel() if done.cancelled() else None)
+
+    async def _run(self, queue, priority, job, future, attempt):
+        try:
+            result = await job()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        finally:
+            queue.slots.release()
+
+        delay = self.retry_delay(result, attempt)
+        if delay is not None and attempt < self.max_retries:
+            loop = asyncio.get_running_loop()
+            queue.paused_until = max(queue.paused_until, loop.time() + delay)
+            self._enqueue(queue, priority, job, future, attempt + 1)
+        elif not future.done():
+            future.set_result(result)
+
+    def retry_delay(self, result, attempt):
+        """Seconds to back off before retrying result, or None if it should not be retried"""
+        if getattr(result, 'status', None) not in RETRY_STATUSES:
+            return None
+        delay = parse_retry_after(_header(getattr(result, 'headers', None), 'Retry-After'))
+        if delay is None:
+            delay = settings.HOST_BACKOFF_BASE * 2 ** attempt
+        return min(delay, settings.HOST_MAX_BACKOFF)
+
+    async def close(self):
+        """Stop the per-host dispatchers"""
+        workers = [queue.worker for queue in self.hosts.values()]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.hosts.clear()
+
+    async def run(self, jobs):
+        """Run (host, job, priority) tuples and return their results in input order"""
+        try:
+            futures = [self.submit(host, job, priority) for host, job, priority in jobs]
+            return await asyncio.gather(*futures)
+        finally:
+            await self.close()
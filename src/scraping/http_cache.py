@@ -0,0 +1,145 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from config import settings
+
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: value or True}"""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else True
+    return directives
+
+
+@dataclass
+class CacheEntry:
+    """Stored response body plus the validators needed to revalidate it"""
+    url: str
+    body: str
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = 0.0
+    max_age: int = None
+    no_cache: bool = False
+
+    def is_fresh(self, now=None):
+        """True while Cache-Control max-age says the body can be reused without asking"""
+        if self.no_cache or self.max_age is None:
+            return False
+        return (now or time.time()) < self.fetched_at + self.max_age
+
+    def conditional_headers(self):
+        """Headers that turn the next request into a conditional GET"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Persistent HTTP cache keyed by URL, backed by SQLite
+
+    Independent of the HTTP client: callers look up an entry, send its
+    conditional headers, then call store() on 200 or refresh() on 304.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or settings.HTTP_CACHE_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_db()
+
+    def init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    max_age INTEGER,
+                    no_cache INTEGER DEFAULT 0
+                )
+            ''')
+
+    def get(self, url):
+        """Return the cached entry for url, or None"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                '''SELECT url, body, etag, last_modified, fetched_at, max_age, no_cache
+                FROM http_cache WHERE url = ?''',
+                (url,)
+            ).fetchone()
+        if not row:
+            return None
+        return CacheEntry(*row[:6], no_cache=bool(row[6]))
+
+    def _policy(self, headers):
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        max_age = directives.get('max-age')
+        try:
+            max_age = int(max_age) if max_age not in (None, True) else None
+        except ValueError:
+            max_age = None
+        no_cache = 'no-cache' in directives
+        return directives, max_age, no_cache
+
+    def store(self, url, headers, body):
+        """Cache a 200 response unless it is marked no-store or has nothing to revalidate with"""
+        directives, max_age, no_cache = self._policy(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if 'no-store' in directives or not (etag or last_modified or max_age):
+            return False
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                '''INSERT OR REPLACE INTO http_cache
+                (url, etag, last_modified, body, fetched_at, max_age, no_cache)
+                VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (url, etag, last_modified, body, time.time(), max_age, int(no_cache))
+            )
+        return True
+
+    def refresh(self, url, headers):
+        """Record a 304: the cached body is still valid, restart its freshness lifetime"""
+        _, max_age, no_cache = self._policy(headers)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                '''UPDATE http_cache SET
+                etag = COALESCE(?, etag),
+                last_modified = COALESCE(?, last_modified),
+                fetched_at = ?, max_age = ?, no_cache = ?
+                WHERE url = ?''',
+                (headers.get('ETag'), headers.get('Last-Modified'), time.time(), max_age, int(no_cache), url)
+            )
+
+    def cached_get(self, session, url, **kwargs):
+        """Conditional GET through a requests.Session
+
+        Returns (response, not_modified). On a 304 or a fresh hit the
+        response is None and the caller should reuse get(url).body.
+        """
+        entry = self.get(url)
+        if entry and entry.is_fresh():
+            return None, True
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry:
+            headers.update(entry.conditional_headers())
+
+        response = session.get(url, headers=headers, **kwargs)
+        if response.status_code == 304 and entry:
+            self.refresh(url, response.headers)
+            return None, True
+        if response.status_code == 200:
+            self.store(url, response.headers, response.text)
+        return response, False
@@ -0,0 +1,85 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton matching every company's terms in one pass
+
+    Each company contributes its name, ticker and keywords. Matching is
+    case-insensitive and respects word boundaries, so "Mac" does not match
+    inside "Macro" and "AAPL" does not match inside "AAPLX".
+    """
+
+    def __init__(self, companies):
+        # Trie stored as parallel lists indexed by state number
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        self.patterns = []  # (pattern, tickers)
+
+        terms = {}
+        for company in companies:
+            for term in [company['name'], company['ticker']] + list(company.get('keywords', [])):
+                term = term.strip().lower()
+                if term:
+                    terms.setdefault(term, set()).add(company['ticker'])
+
+        for term, tickers in terms.items():
+            self._add_pattern(term, frozenset(tickers))
+        self._build_failure_links()
+
+    def _add_pattern(self, pattern, tickers):
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.transitions[state][char] = next_state
+            state = next_state
+        self.outputs[state].append(len(self.patterns))
+        self.patterns.append((pattern, tickers))
+
+    def _build_failure_links(self):
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                # Inherit matches that end at the failure state
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+
+    def _is_bounded(self, text, start, end):
+        """Check that a match is not part of a longer word"""
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if text[end].isalnum() and end + 1 < len(text) and text[end + 1].isalnum():
+            return False
+        return True
+
+    def match(self, text):
+        """Return the set of tickers whose terms occur in text"""
+        text = text.lower()
+        tickers = set()
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+
+            for pattern_id in self.outputs[state]:
+                pattern, pattern_tickers = self.patterns[pattern_id]
+                if pattern_tickers <= tickers:
+                    continue
+                start = position - len(pattern) + 1
+                if self._is_bounded(text, start, position):
+                    tickers |= pattern_tickers
+
+        return tickers
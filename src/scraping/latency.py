@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+
+from config import settings
+
+
+class LatencyTracker:
+    """Ring buffer of a source's most recent response times"""
+
+    def __init__(self, window=None):
+        self.samples = np.zeros(window or settings.SOURCE_LATENCY_WINDOW)
+        self.count = 0
+
+    def record(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, len(self.samples))
+
+    def percentile(self, q):
+        """q-th percentile of the window, or None when empty"""
+        if not self.count:
+            return None
+        return float(np.percentile(self.samples[:len(self)], q))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a cool-down
+
+    After failure_threshold failures in a row the circuit opens and requests
+    are refused for cooldown seconds. Then a single probe request is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=None, cooldown=None):
+        self.failure_threshold = failure_threshold or settings.SOURCE_BREAKER_FAILURES
+        self.cooldown = settings.SOURCE_BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self, now=None):
+        """Whether a request may be sent now; claims the probe slot when half-open"""
+        if self.opened_at is None:
+            return True
+        now = time.monotonic() if now is None else now
+        if self.probing or now - self.opened_at < self.cooldown:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, now=None):
+        self.failures += 1
+        self.probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic() if now is None else now
+
+
+class SourceHealth:
+    """Per-source latency percentiles, adaptive timeouts and circuit breakers
+
+    Until a source has min_samples successful responses it gets the default
+    timeout and no hedging. After that its timeout is its p99 latency times
+    timeout_multiplier (clamped to [min_timeout, default timeout]) and a
+    hedged second request is sent once a request outlives the hedge
+    percentile.
+    """
+
+    def __init__(self, default_timeout=None, min_samples=None):
+        self.default_timeout = default_timeout or settings.NEWS_FETCH_TIMEOUT
+        self.min_samples = settings.SOURCE_MIN_SAMPLES if min_samples is None else min_samples
+        self.latencies = {}
+        self.breakers = {}
+        self.stats = {'hedged': 0, 'skipped': 0}
+
+    def _tracker(self, source):
+        if source not in self.latencies:
+            self.latencies[source] = LatencyTracker()
+        return self.latencies[source]
+
+    def _breaker(self, source):
+        if source not in self.breakers:
+            self.breakers[source] = CircuitBreaker()
+        return self.breakers[source]
+
+    def allow(self, source):
+        if self._breaker(source).allow():
+            return True
+        self.stats['skipped'] += 1
+        return False
+
+    def timeout_for(self, source):
+        """Seconds to wait for a response from source"""
+        tracker = self._tracker(source)
+        if len(tracker) < self.min_samples:
+            return self.default_timeout
+        adaptive = tracker.percentile(99) * settings.SOURCE_TIMEOUT_MULTIPLIER
+        return min(self.default_timeout, max(settings.SOURCE_MIN_TIMEOUT, adaptive))
+
+    def hedge_delay(self, source):
+        """Seconds after which a request to source is hedged, or None if not yet known"""
+        tracker = self._tracker(source)
+        if len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(settings.SOURCE_HEDGE_PERCENTILE)
+
+    def record(self, source, result, elapsed):
+        """Feed one request outcome back into the source's statistics"""
+        if result.ok or result.not_modified:
+            self._tracker(source).record(elapsed)
+            self._breaker(source).record_success()
+        else:
+            self._breaker(source).record_failure()
@@ -1,116 +1,277 @@
-
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-import json
-from pathlib import Path
-from config import settings
-
-# Download required NLTK data
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
-
-class SentimentAnalyzer:
-    def __init__(self):
-        self.sia = SentimentIntensityAnalyzer()
-        self.processed_data_path = settings.PROCESSED_DATA_PATH
-        self.processed_data_path.mkdir(parents=True, exist_ok=True)
-    
-    def analyze_text(self, text):
-        """Analyze sentiment of text"""
-        scores = self.sia.polarity_scores(text)
-        
-        # Determine sentiment label
-        if scores['compound'] >= settings.SENTIMENT_THRESHOLD:
-            sentiment = "positive"
-        elif scores['compound'] <= -settings.SENTIMENT_THRESHOLD:
-            sentiment = "negative"
-        else:
-            sentiment = "neutral"
-        
-        return {
-            'scores': scores,
-            'sentiment': sentiment
-        }
-    
-    def analyze_news_articles(self, articles):
-        """Analyze sentiment of news articles"""
-        analyzed_articles = []
-        
-        for article in articles:
-            # Combine title and excerpt for analysis
-            text = f"{article['title']}. {article['excerpt']}"
-            sentiment = self.analyze_text(text)
-            
-            analyzed_articles.append({
-                **article,
-                'sentiment': sentiment
-            })
-        
-        return analyzed_articles
-    
-    def process_company_news(self, ticker):
-        """Process news sentiment for a company"""
-        input_file = settings.RAW_DATA_PATH / "news" / f"{ticker}_news.json"
-        
-        if not input_file.exists():
-            print(f"No news data found for {ticker}")
-            return None
-        
-        # Load news data
-        with open(input_file, 'r') as f:
-            news_data = json.load(f)
-        
-        # Analyze sentiment
-        analyzed_articles = self.analyze_news_articles(news_data['articles'])
-        
-        # Calculate overall sentiment
-        sentiment_counts = {
-            'positive': 0,
-            'negative': 0,
-            'neutral': 0
-        }
-        
-        for article in analyzed_articles:
-            sentiment_counts[article['sentiment']['sentiment']] += 1
-        
-        # Prepare results
-        results = {
-            'company': news_data['company'],
-            'ticker': news_data['ticker'],
-            'articles_count': len(analyzed_articles),
-            'sentiment_distribution': sentiment_counts,
-            'articles': analyzed_articles
-        }
-        
-        # Save results
-        output_file = self.processed_data_path / f"{ticker}_sentiment.json"
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        return results
-    
-    def process_all_companies(self):
-        """Process sentiment for all companies"""
-        results = {}
-        
-        # Load companies data
-        with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
-            companies = json.load(f)["companies"]
-        
-        for company in companies:
-            print(f"Analyzing sentiment for {company['name']}...")
-            result = self.process_company_news(company['ticker'])
-            if result:
-                results[company['ticker']] = result
-        
-        return results
-
-# Example usage
-if __name__ == "__main__":
-    analyzer = SentimentAnalyzer()
-    results = analyzer.process_all_companies()
-    
-    for ticker, data in results.items():
+
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from config import settings
+from data.news_store import NewsSegmentStore
+from src.fast_vader import create_scorer
+from src.sentiment_batch import BatchSentimentScorer, sentiment_label
+from src.sentiment_cache import SentimentCache
+
+PUBLISHED_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%b. %d, %Y", "%m/%d/%Y")
+
+
+def normalize_published_date(value):
+    """YYYY-MM-DD for the date formats scraped sources use, or None if unparseable"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).strftime("%Y-%m-%d")  # RSS (RFC 2822)
+    except (TypeError, ValueError, IndexError):
+        pass
+    for date_format in PUBLISHED_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+class SentimentAnalyzer:
+    def __init__(self, workers=None, cache=None, engine=None):
+        self.engine = engine
+        self._sia = None
+        self.scorer = BatchSentimentScorer(workers=workers, engine=engine)
+        self.cache = cache or SentimentCache(engine=engine)
+        self.processed_data_path = settings.PROCESSED_DATA_PATH
+        self.processed_data_path.mkdir(parents=True, exist_ok=True)
+        self.news_store = NewsSegmentStore()
+        
+        # Load companies data
+        with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
+            self.company_names = {c['ticker']: c['name'] for c in json.load(f)["companies"]}
+    
+    @property
+    def sia(self):
+        """Scorer for single texts, loaded on first use"""
+        if self._sia is None:
+            self._sia = create_scorer(self.engine)
+        return self._sia
+    
+    def analyze_text(self, text):
+        """Analyze sentiment of text, reusing the cached result for text seen before"""
+        result = self.cache.get(text)
+        if result is None:
+            scores = self.sia.polarity_scores(text)
+            result = {
+                'scores': scores,
+                'sentiment': sentiment_label(scores['compound'])
+            }
+            self.cache.put(text, result)
+        return result
+    
+    def score_texts(self, texts):
+        """Sentiment results for a list of texts, in order
+        
+        Cached texts are answered from the memo cache; each distinct new
+        text is scored once on the worker pool and added to the cache,
+        which is written out in one transaction per call.
+        """
+        results = self.cache.get_many(texts)
+        new_texts = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+        if new_texts:
+            scored = dict(zip(new_texts, self.scorer.score_texts(new_texts)))
+            self.cache.put_many(scored.items())
+            self.cache.flush()
+            results = [scored[text] if result is None else result for text, result in zip(texts, results)]
+        return results
+    
+    @staticmethod
+    def article_text(article):
+        """Text scored for an article: title and excerpt combined"""
+        return f"{article['title']}. {article['excerpt']}"
+    
+    def analyze_news_articles(self, articles):
+        """Analyze sentiment of news articles
+        
+        Large batches are scored across the scorer's worker processes.
+        """
+        scores = self.score_texts([self.article_text(article) for article in articles])
+        return [
+            {**article, 'sentiment': sentiment}
+            for article, sentiment in zip(articles, scores)
+        ]
+    
+    def load_company_news(self, ticker):
+        """Load recent raw news for a company
+        
+        Streams the day segments from the news store that cover the last
+        NEWS_SENTIMENT_LOOKBACK_DAYS days counted back from now, so a run just
+        after midnight UTC still reads yesterday's segment. A legacy
+        <TICKER>_news.json file is read only for tickers the store has never
+        seen.
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=settings.NEWS_SENTIMENT_LOOKBACK_DAYS)).date().isoformat()
+        articles = list(self.news_store.iter_articles(ticker, since=since))
+        if articles:
+            return {
+                'company': self.company_names.get(ticker, ticker),
+                'ticker': ticker,
+                'articles': articles
+            }
+        if self.news_store.days(ticker):
+            return None  # nothing recent; older segments were scored by earlier runs
+        
+        input_file = settings.RAW_DATA_PATH / "news" / f"{ticker}_news.json"
+        if input_file.exists():
+            with open(input_file, 'r') as f:
+                return json.load(f)
+        
+        return None
+    
+    def process_company_news(self, ticker):
+        """Process news sentiment for a company"""
+        news_data = self.load_company_news(ticker)
+        
+        if not news_data:
+            print(f"No news data found for {ticker}")
+            return None
+        
+        # Analyze sentiment
+        analyzed_articles = self.analyze_news_articles(news_data['articles'])
+        return self.save_company_sentiment(ticker, news_data, analyzed_articles)
+    
+    def save_company_sentiment(self, ticker, news_data, analyzed_articles):
+        """Summarize a company's analyzed articles and save them as JSON"""
+        # Calculate overall sentiment
+        sentiment_counts = {
+            'positive': 0,
+            'negative': 0,
+            'neutral': 0
+        }
+        
+        for article in analyzed_articles:
+            sentiment_counts[article['sentiment']['sentiment']] += 1
+        
+        # Prepare results
+        results = {
+            'company': news_data['company'],
+            'ticker': news_data['ticker'],
+            'articles_count': len(analyzed_articles),
+            'sentiment_distribution': sentiment_counts,
+            'articles': analyzed_articles
+        }
+        
+        # Save results
+        output_file = self.processed_data_path / f"{ticker}_sentiment.json"
+        with open(output_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        
+        return results
+    
+    def process_all_companies(self):
+        """Process sentiment for all companies
+        
+        Every company's articles are scored as one batch instead of company
+        by company; only text missing from the memo cache reaches the pool.
+        """
+        results = {}
+        
+        # Load companies data
+        with open(Path(__file__).parent.parent / "config" / "companies.json", "r") as f:
+            companies = json.load(f)["companies"]
+        
+        news = {}
+        for company in companies:
+            news_data = self.load_company_news(company['ticker'])
+            if news_data:
+                news[company['ticker']] = news_data
+            else:
+                print(f"No news data found for {company['ticker']}")
+        
+        scores = iter(self.score_texts([
+            self.article_text(article) for news_data in news.values() for article in news_data['articles']
+        ]))
+        for ticker, news_data in news.items():
+            print(f"Analyzing sentiment for {news_data['company']}...")
+            # zip stops at the company's last article, leaving the rest of the stream for the next one
+            analyzed_articles = [
+                {**article, 'sentiment': sentiment}
+                for article, sentiment in zip(news_data['articles'], scores)
+            ]
+            results[ticker] = self.save_company_sentiment(ticker, news_data, analyzed_articles)
+        
+        stats = self.cache.stats
+        print(f"Sentiment cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({self.cache.hit_rate:.0%} hit rate)")
+        return results
+    
+    def process_unscored_articles(self, db=None, batch_size=None):
+        """Score only database articles that have no sentiment yet
+        
+        Walks unscored rows in id order one page at a time (keyset
+        pagination over a partial index), writes each article's compound
+        score and label back, and adds the page's counts to the per-company
+        daily sentiment_results rows in the same transaction. The scores
+        also feed the per-company rolling aggregates, whose updates the
+        streaming anomaly detector checks as they happen. Each run costs
+        O(new articles). Aggregates are keyed by the article's published
+        day, normalized to YYYY-MM-DD (falling back to when it was stored)
+        and saved as published_day; published_date keeps the scraped value.
+        """
+        from src.analysis.anomaly_detector import StreamingAnomalyDetector
+        from src.analysis.rolling_stats import RollingSentimentStats
+        if db is None:
+            from data.database import FinancialDataDB
+            db = FinancialDataDB()
+        rolling_stats = RollingSentimentStats(db)
+        anomaly_detector = StreamingAnomalyDetector(db)
+        rolling_stats.listeners.append(anomaly_detector.observe)
+        batch_size = batch_size or settings.SENTIMENT_DB_BATCH_SIZE
+        
+        summary = {'articles': 0, 'positive': 0, 'negative': 0, 'neutral': 0}
+        last_id = 0
+        while True:
+            rows = db.get_unscored_articles(last_id, batch_size)
+            if not rows:
+                break
+            
+            results = self.score_texts([f"{title}. {excerpt or ''}" for _, _, title, excerpt, _, _ in rows])
+            scores = []
+            observations = []
+            labels = {'positive': 0, 'negative': 0, 'neutral': 0}
+            aggregates = defaultdict(lambda: [0, 0, 0, 0])  # total, positive, negative, neutral
+            for (article_id, company_id, _, _, published_date, created_at), result in zip(rows, results):
+                day = normalize_published_date(published_date) or normalize_published_date(created_at)
+                label = result['sentiment']
+                scores.append((result['scores']['compound'], label, day, article_id))
+                if day:
+                    observations.append((company_id, day, result['scores']['compound']))
+                
+                counts = aggregates[(company_id, day or datetime.now().strftime("%Y-%m-%d"))]
+                counts[0] += 1
+                counts[("positive", "negative", "neutral").index(label) + 1] += 1
+                labels[label] += 1
+            
+            last_id = rows[-1][0]
+            # A failed write leaves the page unscored for the next run; counting it
+            # into the rolling stats now would count it twice
+            if not db.save_article_sentiments(scores, [(*key, *counts) for key, counts in aggregates.items()]):
+                continue
+            rolling_stats.update(observations)
+            summary['articles'] += len(rows)
+            for label, count in labels.items():
+                summary[label] += count
+        
+        # Webhook POSTs run in the background; let the queued ones go out before returning
+        anomaly_detector.close()
+        return summary
+    
+    def close(self):
+        """Stop the scoring worker processes and write out the memo cache"""
+        self.scorer.close()
+        self.cache.flush()
+
+# Example usage
+if __name__ == "__main__":
+    analyzer = SentimentAnalyzer()
+    results = analyzer.process_all_companies()
+    
+    for ticker, data in results.items():
         print(f"{ticker}: {data['sentiment_distribution']}")
\ No newline at end of file
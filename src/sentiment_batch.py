@@ -0,0 +1,98 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from config import settings
+from src.fast_vader import create_scorer
+
+# Per-process analyzer, created once by the pool initializer
+_worker_sia = None
+
+
+def sentiment_label(compound, threshold=None):
+    """positive/negative/neutral label for a VADER compound score"""
+    threshold = settings.SENTIMENT_THRESHOLD if threshold is None else threshold
+    if compound >= threshold:
+        return "positive"
+    if compound <= -threshold:
+        return "negative"
+    return "neutral"
+
+
+def _init_worker(engine=None):
+    global _worker_sia
+    _worker_sia = create_scorer(engine)
+
+
+def _score_chunk(texts, scorer=None):
+    scorer = scorer or _worker_sia
+    results = []
+    for text in texts:
+        scores = scorer.polarity_scores(text)
+        results.append({'scores': scores, 'sentiment': sentiment_label(scores['compound'])})
+    return results
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BatchSentimentScorer:
+    """Scores texts across a pool of worker processes
+
+    Each worker builds its scorer (settings.SENTIMENT_ENGINE) once. Texts are sent in chunks, with
+    at most a few chunks per worker in flight, and results are yielded in
+    input order as soon as they are ready, so arbitrarily long inputs stream
+    through in bounded memory. Batches smaller than min_parallel are scored
+    in-process, where starting the pool would cost more than it saves.
+    """
+
+    def __init__(self, workers=None, chunk_size=None, min_parallel=None, engine=None):
+        self.engine = engine or settings.SENTIMENT_ENGINE
+        self.workers = workers or settings.SENTIMENT_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.SENTIMENT_CHUNK_SIZE
+        self.min_parallel = settings.SENTIMENT_PARALLEL_MIN_ARTICLES if min_parallel is None else min_parallel
+        self.executor = None
+        self.local_scorer = None
+
+    def _pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                initargs=(self.engine,))
+        return self.executor
+
+    def score_texts(self, texts):
+        """Yield {'scores', 'sentiment'} for each text, in order"""
+        if self.workers <= 1 or (hasattr(texts, '__len__') and len(texts) < self.min_parallel):
+            if self.local_scorer is None:
+                self.local_scorer = create_scorer(self.engine)
+            for chunk in _chunks(texts, self.chunk_size):
+                yield from _score_chunk(chunk, self.local_scorer)
+            return
+
+        pool = self._pool()
+        in_flight = deque()
+        for chunk in _chunks(texts, self.chunk_size):
+            in_flight.append(pool.submit(_score_chunk, chunk))
+            if len(in_flight) >= self.workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
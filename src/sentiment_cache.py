@@ -0,0 +1,207 @@
+import json
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+from config import settings
+
+# Bump when the scoring logic or lexicon changes so old cached scores stop matching
+SCORER_VERSION = "vader-3.3.2"
+
+
+def normalize_text(text):
+    """Collapse whitespace; case is kept because VADER scores capitalisation"""
+    return " ".join((text or "").split())
+
+
+class SentimentCache:
+    """Persistent, size-bounded memo of sentiment results, backed by SQLite
+
+    Keys hash the whitespace-normalized text together with the scoring
+    engine, its version and the label threshold, so a change to any makes old
+    entries unreachable; they then age out. When the table grows past
+    max_entries the least recently used entries are evicted.
+
+    A lookup has to cost less than scoring the text again (tens of
+    microseconds), so recent entries are answered from memory and SQLite
+    sees batches: new results and the last_used of a sample (touch_rate)
+    of hits are buffered and written in one transaction every write_batch
+    entries, and on flush()/close(). The entry count and LRU clock are
+    kept in memory, and eviction removes an extra 1% so it runs rarely.
+    A crash loses at most the unflushed batch, which is only re-scored.
+    """
+
+    def __init__(self, db_path=None, max_entries=None, threshold=None, engine=None,
+                 memory_entries=None, touch_rate=1 / 16, write_batch=1000):
+        self.db_path = db_path or settings.SENTIMENT_CACHE_PATH
+        self.max_entries = max_entries or settings.SENTIMENT_CACHE_MAX_ENTRIES
+        threshold = settings.SENTIMENT_THRESHOLD if threshold is None else threshold
+        self.version = f"{engine or settings.SENTIMENT_ENGINE}:{SCORER_VERSION}:{threshold}"
+        self.memory_entries = settings.SENTIMENT_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.touch_rate = touch_rate
+        self.write_batch = write_batch
+        self.stats = {'hits': 0, 'misses': 0}
+        self.memory = OrderedDict()  # key -> result JSON, most recently used last
+        self._pending = {}  # key -> result JSON not yet written
+        self._touched = set()  # keys whose last_used is to be advanced
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.init_db()
+
+    def init_db(self):
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    key BLOB PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    last_used INTEGER NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache(last_used)")
+        self._count_entries()
+
+    def _count_entries(self):
+        # The only full count, at startup; from then on writes and evictions keep it current
+        self.entries, self.clock = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM sentiment_cache"
+        ).fetchone()
+
+    def key(self, text):
+        data = f"{self.version}\0{normalize_text(text)}".encode("utf-8")
+        return blake2b(data, digest_size=16).digest()
+
+    @property
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def _lookup_memory(self, key):
+        result = self.memory.get(key) or self._pending.get(key)
+        if result is not None:
+            self.memory[key] = result
+            self.memory.move_to_end(key)
+        return result
+
+    def get_many(self, texts):
+        """Cached result (or None) for each text, in order; each result is a fresh copy"""
+        keys = [self.key(text) for text in texts]
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                result = self._lookup_memory(key)
+                if result is None:
+                    missing.append(key)
+                else:
+                    found[key] = result
+            missing = list(dict.fromkeys(missing))
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, result FROM sentiment_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+                self._remember(rows)
+            self._touch(found)
+
+        results = [json.loads(found[key]) if key in found else None for key in keys]
+        hits = sum(result is not None for result in results)
+        self.stats['hits'] += hits
+        self.stats['misses'] += len(results) - hits
+        return results
+
+    def get(self, text):
+        """Cached result (or None) for one text; answered without SQLite when it is in memory"""
+        key = self.key(text)
+        with self._lock:
+            result = self._lookup_memory(key)
+            if result is not None:
+                self._touch((key,))
+        if result is None:
+            return self.get_many([text])[0]
+        self.stats['hits'] += 1
+        return json.loads(result)
+
+    def _touch(self, keys):
+        self._touched.update(key for key in keys if random.random() < self.touch_rate)
+        if len(self._touched) >= self.write_batch:
+            self._write()
+
+    def _remember(self, rows):
+        """Keep (key, result JSON) rows in the in-memory layer, dropping its least recent"""
+        for key, result in rows:
+            self.memory[key] = result
+            self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def put_many(self, items):
+        """Store (text, result) pairs; they reach SQLite with the next batch"""
+        with self._lock:
+            rows = [(self.key(text), json.dumps(result)) for text, result in items]
+            self._pending.update(rows)
+            self._remember(rows)
+            if len(self._pending) >= self.write_batch:
+                self._write()
+
+    def put(self, text, result):
+        self.put_many([(text, result)])
+
+    def _write(self):
+        """Write pending results and touches in one transaction, then evict past max_entries"""
+        if not self._pending and not self._touched:
+            return
+        with self.conn:
+            self.clock += 1
+            if self._touched:
+                self.conn.executemany("UPDATE sentiment_cache SET last_used = ? WHERE key = ?",
+                                      [(self.clock, key) for key in self._touched])
+            if self._pending:
+                keys = list(self._pending)
+                existing = 0
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    existing += self.conn.execute(
+                        f"SELECT COUNT(*) FROM sentiment_cache WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchone()[0]
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, result, last_used) VALUES (?, ?, ?)",
+                    [(key, result, self.clock) for key, result in self._pending.items()]
+                )
+                self.entries += len(keys) - existing
+            self._touched.clear()
+            self._pending.clear()
+            if self.entries > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Drop the least recently used entries down to max_entries minus a 1% slack
+
+        The in-memory layer is emptied rather than searched for the evicted keys.
+        """
+        excess = self.entries - self.max_entries
+        if excess > 0:
+            # One range delete on the last_used index; entries sharing the cutoff tick go too
+            cutoff = self.conn.execute(
+                "SELECT last_used FROM sentiment_cache ORDER BY last_used LIMIT 1 OFFSET ?",
+                (excess + self.max_entries // 100 - 1,)
+            ).fetchone()[0]
+            self.entries -= self.conn.execute("DELETE FROM sentiment_cache WHERE last_used <= ?", (cutoff,)).rowcount
+            self.memory.clear()
+
+    def flush(self):
+        """Write buffered results and touches now"""
+        with self._lock:
+            self._write()
+
+    def close(self):
+        """Flush and close the connection"""
+        with self._lock:
+            self._write()
+            self.conn.close()
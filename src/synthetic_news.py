@@ -0,0 +1,247 @@
+import argparse
+import json
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config import settings
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+# (title, excerpt, link tag) templates per sentiment class
+NEWS_TEMPLATES = {
+    "positive": [
+        ("{name} Reports Strong Q{q} Earnings, Beats Estimates",
+         "{name} announced quarterly revenue of ${rev}B, exceeding analyst expectations by {pct}%.",
+         "earnings"),
+        ("Analysts Upgrade {name} to 'Buy' Rating",
+         "Several major investment firms have upgraded {name} stock, citing strong growth potential in {kw} segment.",
+         "upgrade"),
+        ("{name} Announces New {kw} Product",
+         "The company unveiled its latest innovation in the {kw} market, expected to drive future growth.",
+         "product"),
+        ("{name} Expands {kw} Operations",
+         "The company announced expansion plans in key markets, strengthening its position in the {kw} industry.",
+         "expansion"),
+    ],
+    "negative": [
+        ("{name} Shares Plunge After Weak Q{q} Guidance",
+         "{name} warned that revenue could fall {pct}% short of forecasts as demand for {kw} weakens.",
+         "guidance"),
+        ("Analysts Downgrade {name} to 'Sell' Amid Mounting Losses",
+         "Analysts cut their outlook for {name}, citing losses of ${rev}B and rising costs in its {kw} business.",
+         "downgrade"),
+        ("{name} Faces Lawsuit Over {kw} Failures",
+         "Investors sued {name}, alleging the company concealed serious problems with its {kw} products.",
+         "lawsuit"),
+    ],
+    "neutral": [
+        ("{name} CEO Discusses Future Strategy",
+         "In a recent interview, the CEO outlined the company's plans for the coming years, focusing on {kw}.",
+         "strategy"),
+        ("{name} Files Quarterly Report for Q{q}",
+         "{name} filed its quarterly report with the SEC, covering its {kw} segment.",
+         "filing"),
+        ("{name} to Present at Annual Industry Conference",
+         "{name} will present an update on its {kw} business at the conference next month.",
+         "conference"),
+    ],
+}
+
+SYNTHETIC_SOURCES = ("reuters_company_news", "bloomberg_markets", "financial_times", "marketwatch", "yahoo_finance")
+SYNTHETIC_KEYWORDS = ("Cloud", "Retail", "Devices", "Services", "Advertising", "Logistics", "Software", "Energy")
+
+
+def synthetic_companies(count, seed=0):
+    """Deterministic fake watchlist of count companies"""
+    rng = np.random.default_rng(seed)
+    keyword_picks = rng.integers(0, len(SYNTHETIC_KEYWORDS), size=(count, 3))
+    return [
+        {
+            "name": f"Synthetic Holdings {i:05d} Inc.",
+            "ticker": f"SYN{i:05d}",
+            "cik": f"{9000000000 + i:010d}",
+            "keywords": sorted({SYNTHETIC_KEYWORDS[k] for k in keyword_picks[i]})
+        }
+        for i in range(count)
+    ]
+
+
+class SyntheticNewsGenerator:
+    """Seeded, vectorized generator of realistic-looking news articles
+
+    All random choices for a chunk (company, sentiment class, template,
+    figures, date, source, duplicate links) are drawn as NumPy arrays from a
+    single seeded generator, so the same seed and parameters always give the
+    same corpus. A duplicate_rate fraction of articles re-publish an earlier
+    article of the same chunk under another source, like syndicated stories.
+    """
+
+    def __init__(self, companies, seed=None, sentiment_mix=None, duplicate_rate=0.0,
+                 days=30, end_date=None, sources=SYNTHETIC_SOURCES):
+        self.companies = companies
+        self.seed = settings.MOCK_NEWS_SEED if seed is None else seed
+        mix = np.asarray(sentiment_mix or settings.MOCK_NEWS_SENTIMENT_MIX, dtype=float)
+        self.sentiment_mix = mix / mix.sum()
+        self.duplicate_rate = duplicate_rate
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.sources = sources
+
+        # Flatten templates so one integer draw picks one within a sentiment class
+        self.templates = [template for sentiment in SENTIMENTS for template in NEWS_TEMPLATES[sentiment]]
+        counts = [len(NEWS_TEMPLATES[sentiment]) for sentiment in SENTIMENTS]
+        self.template_offsets = np.cumsum([0] + counts[:-1])
+        self.template_counts = np.asarray(counts)
+
+    def generate(self, count, chunk_size=100_000):
+        """Yield lists of article dicts (with 'ticker' and 'sentiment_class') totalling count"""
+        rng = np.random.default_rng(self.seed)
+        produced = 0
+        while produced < count:
+            size = min(chunk_size, count - produced)
+            yield self._chunk(rng, size, produced)
+            produced += size
+
+    def _chunk(self, rng, size, offset):
+        company_idx = rng.integers(0, len(self.companies), size)
+        sentiment_idx = rng.choice(len(SENTIMENTS), size=size, p=self.sentiment_mix)
+        template_idx = self.template_offsets[sentiment_idx] + (
+            rng.random(size) * self.template_counts[sentiment_idx]).astype(np.int64)
+        quarters = rng.integers(1, 5, size)
+        revenue = rng.integers(10, 101, size)
+        percent = rng.integers(2, 16, size)
+        keyword_draw = rng.random(size)
+        days_ago = rng.integers(0, self.days, size)
+        source_idx = rng.integers(0, len(self.sources), size)
+
+        # Duplicates copy an earlier article of the chunk; follow chains back to the original
+        positions = np.arange(size)
+        is_duplicate = (rng.random(size) < self.duplicate_rate) & (positions > 0)
+        origin = np.where(is_duplicate, (rng.random(size) * positions).astype(np.int64), positions)
+        while True:
+            resolved = origin[origin]
+            if np.array_equal(resolved, origin):
+                break
+            origin = resolved
+        for column in (company_idx, sentiment_idx, template_idx, quarters, revenue, percent, keyword_draw, days_ago):
+            column[:] = column[origin]
+        # A syndicated copy always comes from a different source than its original
+        shift = 1 + source_idx % max(1, len(self.sources) - 1)
+        source_idx = np.where(is_duplicate, (source_idx[origin] + shift) % len(self.sources), source_idx)
+
+        dates = [(self.end_date - timedelta(days=int(d))).isoformat() for d in range(self.days)]
+        articles = []
+        for i in range(size):
+            company = self.companies[company_idx[i]]
+            keywords = company.get('keywords') or ["business"]
+            title, excerpt, tag = self.templates[template_idx[i]]
+            fields = {
+                'name': company['name'],
+                'q': quarters[i],
+                'rev': revenue[i],
+                'pct': percent[i],
+                'kw': keywords[int(keyword_draw[i] * len(keywords))]
+            }
+            articles.append({
+                'ticker': company['ticker'],
+                'title': title.format(**fields),
+                'excerpt': excerpt.format(**fields),
+                'date': dates[days_ago[i]],
+                'link': f"https://example.com/news/{company['ticker'].lower()}-{tag}-{offset + i}",
+                'source': self.sources[source_idx[i]],
+                'sentiment_class': SENTIMENTS[sentiment_idx[i]]
+            })
+        return articles
+
+    def write_ndjson(self, path, count, chunk_size=100_000):
+        """Write count articles as one NDJSON file ('-' for stdout)"""
+        out = sys.stdout if str(path) == "-" else open(path, "w", encoding="utf-8")
+        written = 0
+        try:
+            for chunk in self.generate(count, chunk_size):
+                out.writelines(json.dumps(article, ensure_ascii=False) + "\n" for article in chunk)
+                written += len(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return written
+
+    def write_store(self, store, count, chunk_size=100_000):
+        """Append count articles to a NewsSegmentStore, filed under each article's date
+
+        Each chunk is appended as one batch per ticker/day; open the store with
+        durable=False to skip the per-append fsyncs, which are then replaced by
+        a single sync() at the end.
+        """
+        written = 0
+        for chunk in self.generate(count, chunk_size):
+            groups = {}
+            for article in chunk:
+                groups.setdefault((article['ticker'], article['date']), []).append(article)
+            for (ticker, day), articles in groups.items():
+                written += store.append(ticker, articles, day=day)
+        if not store.durable:
+            store.sync()
+        return written
+
+    def write_db(self, db, count, chunk_size=100_000):
+        """Bulk insert count articles (and any missing companies) into the database"""
+        db.add_companies([(c['name'], c['ticker'], c['cik']) for c in self.companies])
+        company_ids = db.get_company_ids()
+        written = 0
+        for chunk in self.generate(count, chunk_size):
+            written += db.add_news_articles_bulk([
+                (company_ids[a['ticker']], a['title'], a['excerpt'], "", a['date'], a['source'], a['link'])
+                for a in chunk
+            ])
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic news corpus for load testing")
+    parser.add_argument("--articles", type=int, default=100_000, help="Number of articles")
+    parser.add_argument("--tickers", type=int, default=1000, help="Number of synthetic companies")
+    parser.add_argument("--seed", type=int, default=settings.MOCK_NEWS_SEED, help="Random seed")
+    parser.add_argument("--mix", type=float, nargs=3, metavar=("POS", "NEG", "NEU"),
+                        default=settings.MOCK_NEWS_SENTIMENT_MIX, help="Sentiment class weights")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Fraction of syndicated copies")
+    parser.add_argument("--days", type=int, default=365, help="Spread of article dates in days")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Latest article date (YYYY-MM-DD); fix it for byte-identical output")
+    parser.add_argument("--format", choices=["ndjson", "store", "db"], default="ndjson")
+    parser.add_argument("--output", help="NDJSON file (default: stdout), store directory or database file")
+    args = parser.parse_args()
+    if args.format != "ndjson" and args.output in (None, "-"):
+        parser.error(f"--format {args.format} needs --output "
+                     f"({'a store directory' if args.format == 'store' else 'a database file'})")
+
+    generator = SyntheticNewsGenerator(
+        synthetic_companies(args.tickers, args.seed), seed=args.seed, sentiment_mix=args.mix,
+        duplicate_rate=args.duplicate_rate, days=args.days, end_date=args.end_date
+    )
+
+    started = time.perf_counter()
+    if args.format == "ndjson":
+        written = generator.write_ndjson(args.output or "-", args.articles)
+    elif args.format == "store":
+        from data.news_store import NewsSegmentStore
+        written = generator.write_store(NewsSegmentStore(Path(args.output), durable=False), args.articles)
+    else:
+        from data.database import FinancialDataDB
+        written = generator.write_db(FinancialDataDB(Path(args.output)), args.articles)
+    elapsed = time.perf_counter() - started
+
+    print(f"Generated {written} articles for {args.tickers} tickers in {elapsed:.1f}s "
+          f"({written / elapsed:,.0f} articles/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
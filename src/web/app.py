@@ -1,123 +1,176 @@
-
-from flask import Flask, render_template, request, jsonify
-from datetime import datetime, timedelta
-import json
-from pathlib import Path
-
-from data.database import FinancialDataDB
-from config import settings
-
-app = Flask(__name__, 
-            template_folder=Path(__file__).parent / "templates",
-            static_folder=Path(__file__).parent / "static")
-
-db = FinancialDataDB()
-
-@app.route('/')
-def index():
-    """Main dashboard page"""
-    return render_template('index.html')
-
-@app.route('/api/companies')
-def get_companies():
-    """Get list of companies"""
-    try:
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute("SELECT id, name, ticker FROM companies ORDER BY name")
-            companies = [{"id": row[0], "name": row[1], "ticker": row[2]} for row in cursor.fetchall()]
-        return jsonify(companies)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/sentiment/<int:company_id>')
-def get_sentiment(company_id):
-    """Get sentiment data for a company"""
-    try:
-        days = request.args.get('days', 30, type=int)
-        
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                '''SELECT analysis_date, total_articles, positive_count, negative_count, neutral_count 
-                FROM sentiment_results 
-                WHERE company_id = ? AND date(analysis_date) >= date('now', ?) 
-                ORDER BY analysis_date DESC''',
-                (company_id, f'-{days} days')
-            )
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    "date": row[0],
-                    "total_articles": row[1],
-                    "positive": row[2],
-                    "negative": row[3],
-                    "neutral": row[4]
-                })
-            
-            return jsonify(results)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/news/<int:company_id>')
-def get_news(company_id):
-    """Get recent news for a company"""
-    try:
-        limit = request.args.get('limit', 10, type=int)
-        
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                '''SELECT title, excerpt, published_date, source, url, sentiment_label 
-                FROM news_articles 
-                WHERE company_id = ? 
-                ORDER BY published_date DESC 
-                LIMIT ?''',
-                (company_id, limit)
-            )
-            
-            articles = []
-            for row in cursor.fetchall():
-                articles.append({
-                    "title": row[0],
-                    "excerpt": row[1],
-                    "date": row[2],
-                    "source": row[3],
-                    "url": row[4],
-                    "sentiment": row[5]
-                })
-            
-            return jsonify(articles)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-@app.route('/api/filings/<int:company_id>')
-def get_filings(company_id):
-    """Get SEC filings for a company"""
-    try:
-        with db.conn:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                '''SELECT filing_type, filing_date, file_path, content_length 
-                FROM sec_filings 
-                WHERE company_id = ? 
-                ORDER BY filing_date DESC''',
-                (company_id,)
-            )
-            
-            filings = []
-            for row in cursor.fetchall():
-                filings.append({
-                    "type": row[0],
-                    "date": row[1],
-                    "file_path": row[2],
-                    "content_length": row[3]
-                })
-            
-            return jsonify(filings)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-
-if __name__ == '__main__':
+
+from flask import Flask, render_template, request, jsonify, make_response, Response
+from datetime import datetime, timedelta
+import functools
+import json
+from pathlib import Path
+
+from data.database import FinancialDataDB, choose_sentiment_resolution
+from config import settings
+from src.api.batch import group_by_company, resolve_companies
+from src.api.conditional import cache_control, etag_matches, resource_etag
+from src.api.pagination import decode_cursor, ndjson, page_size, split_page
+
+app = Flask(__name__, 
+            template_folder=Path(__file__).parent / "templates",
+            static_folder=Path(__file__).parent / "static")
+
+db = FinancialDataDB()
+
+def conditional(*resources):
+    """Answer If-None-Match with 304 from the data version of resources before running the view
+    
+    Views taking company_id are versioned per company; the others by every
+    write to the resources. Successful responses get ETag and Cache-Control.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            company_id = kwargs.get('company_id')
+            version = db.get_data_version(None if company_id is None else [company_id], resources)
+            if version is None:
+                return view(**kwargs)
+            etag = resource_etag(version, request.full_path)
+            if etag_matches(request.headers.get('If-None-Match'), etag):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = cache_control()
+            return response
+        return wrapper
+    return decorator
+
+@app.route('/')
+def index():
+    """Main dashboard page"""
+    return render_template('index.html')
+
+@app.route('/api/companies')
+@conditional('companies')
+def get_companies():
+    """Get list of companies"""
+    try:
+        companies = [{"id": row[0], "name": row[1], "ticker": row[2]} for row in db.get_companies()]
+        return jsonify(companies)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def sentiment_record(row):
+    return {"date": row[0], "total_articles": row[1], "positive": row[2], "negative": row[3], "neutral": row[4]}
+
+@app.route('/api/sentiment/<int:company_id>')
+@conditional('sentiment')
+def get_sentiment(company_id):
+    """Get sentiment data for a company"""
+    try:
+        days = request.args.get('days', 30, type=int)
+        resolution = request.args.get('resolution')
+        if resolution not in (None, 'day', 'week', 'month'):
+            return jsonify({"error": "resolution must be day, week or month"}), 400
+        
+        rows = db.get_latest_sentiment(company_id, days, resolution, request.args.get('max_points', type=int))
+        return jsonify([sentiment_record(row) for row in rows])
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def news_record(row):
+    return {"id": row[6], "title": row[0], "excerpt": row[1], "date": row[2],
+            "source": row[3], "url": row[4], "sentiment": row[5]}
+
+def filing_record(row):
+    return {"id": row[4], "type": row[0], "date": row[1], "file_path": row[2], "content_length": row[3]}
+
+def listing(fetch, iterate, to_record, sort_column, default_limit=None):
+    """Keyset-paginated JSON page, or an NDJSON stream with ?format=ndjson
+    
+    The next page's cursor is sent in the X-Next-Cursor header.
+    """
+    try:
+        after = decode_cursor(request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    output = request.args.get('format', 'json')
+    if output == 'ndjson':
+        rows = iterate(request.args.get('limit', type=int), after)
+        return Response(ndjson(map(to_record, rows)), mimetype='application/x-ndjson')
+    if output != 'json':
+        return jsonify({"error": "format must be json or ndjson"}), 400
+    
+    limit = page_size(request.args.get('limit', default_limit, type=int))
+    rows, next_cursor = split_page(fetch(limit + 1, after), limit, sort_column)
+    response = jsonify([to_record(row) for row in rows])
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/news/<int:company_id>')
+@conditional('news')
+def get_news(company_id):
+    """Get a company's news, newest first, paginated on (published_date, id)"""
+    try:
+        return listing(
+            lambda limit, after: db.get_company_news(company_id, limit, after),
+            lambda limit, after: db.iter_company_news(company_id, limit, after),
+            news_record, 2, default_limit=10
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/filings/<int:company_id>')
+@conditional('filings')
+def get_filings(company_id):
+    """Get a company's SEC filings, newest first, paginated on (filing_date, id)"""
+    try:
+        return listing(
+            lambda limit, after: db.get_company_filings(company_id, limit, after),
+            lambda limit, after: db.iter_company_filings(company_id, limit, after),
+            filing_record, 1
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def batch_companies():
+    """Companies named by the tickers and company_ids arguments (repeated or comma-separated)"""
+    return resolve_companies(db, request.args.getlist('company_ids'), request.args.getlist('tickers'))
+
+@app.route('/api/sentiment/batch')
+@conditional('companies', 'sentiment')
+def get_batch_sentiment():
+    """Get sentiment data for many companies with one query, grouped by company"""
+    try:
+        companies, not_found = batch_companies()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        days = request.args.get('days', 30, type=int)
+        resolution = request.args.get('resolution')
+        if resolution not in (None, 'day', 'week', 'month'):
+            return jsonify({"error": "resolution must be day, week or month"}), 400
+        resolution = resolution or choose_sentiment_resolution(days, request.args.get('max_points', type=int))
+        sentiment = db.get_latest_sentiment_batch([row[0] for row in companies], days, resolution)
+        return jsonify({"resolution": resolution, "not_found": not_found,
+                        "companies": group_by_company(companies, sentiment, "sentiment", sentiment_record)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/news/batch')
+@conditional('companies', 'news')
+def get_batch_news():
+    """Get the newest articles of many companies with one query, grouped by company"""
+    try:
+        companies, not_found = batch_companies()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        limit = page_size(request.args.get('limit', 10, type=int))
+        news = db.get_company_news_batch([row[0] for row in companies], limit)
+        return jsonify({"not_found": not_found,
+                        "companies": group_by_company(companies, news, "articles", news_record)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
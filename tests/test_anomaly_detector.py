@@ -0,0 +1,119 @@
+import tempfile
+import threading
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from src.analysis.anomaly_detector import StreamingAnomalyDetector, WebhookSender
+from src.analysis.rolling_stats import CompanySentimentState
+
+START = date.today() - timedelta(days=20)
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+class BlockingSession:
+    """Records POSTs; each waits until release is set"""
+    def __init__(self):
+        self.posts = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def post(self, url, json=None, timeout=None):
+        self.started.set()
+        self.release.wait(5)
+        self.posts.append((url, json))
+        return FakeResponse()
+
+def observed_state(baseline_days, spike_articles, spike_score=0.9):
+    """State with baseline_days quiet days of 3 articles, then one day of spike_articles at spike_score"""
+    state = CompanySentimentState(30, 0.05)
+    observations = []
+    for offset in range(baseline_days):
+        for score in (0.05, 0.1 + 0.01 * (offset % 3), 0.15):
+            observations.append((1, (START + timedelta(days=offset)).isoformat(), score))
+    spike = START + timedelta(days=baseline_days)
+    observations += [(1, spike.isoformat(), spike_score)] * spike_articles
+    for _, day, score in observations:
+        state.add(date.fromisoformat(day), score)
+    return {1: state}, observations, spike.isoformat()
+
+class TestStreamingAnomalyDetector(unittest.TestCase):
+    def detector(self, **kwargs):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        detector = StreamingAnomalyDetector(SimpleNamespace(db_path=Path(tmp.name) / "test.db"), webhooks=[], **kwargs)
+        self.flagged = []
+        detector.subscribe(self.flagged.append)
+        return detector
+
+    def test_spike_beyond_threshold_is_flagged(self):
+        states, observations, spike = observed_state(10, 3)
+        anomalies = self.detector(threshold=2.0, min_days=7, min_articles=3).observe(states, observations)
+        self.assertEqual([anomaly['day'] for anomaly in anomalies], [spike])
+        self.assertEqual(anomalies[0]['direction'], 'up')
+        self.assertGreater(anomalies[0]['z_score'], 2.0)
+        self.assertEqual(anomalies[0]['articles'], 3)
+
+    def test_spike_within_threshold_is_not_flagged(self):
+        states, observations, _ = observed_state(10, 3)
+        self.assertEqual(self.detector(threshold=1000, min_days=7, min_articles=3).observe(states, observations), [])
+
+    def test_day_needs_min_articles(self):
+        states, observations, _ = observed_state(10, 2)
+        self.assertEqual(self.detector(threshold=2.0, min_days=7, min_articles=3).observe(states, observations), [])
+
+    def test_window_needs_min_days(self):
+        states, observations, _ = observed_state(5, 3)
+        self.assertEqual(self.detector(threshold=2.0, min_days=7, min_articles=3).observe(states, observations), [])
+        states, observations, _ = observed_state(7, 3)
+        self.assertEqual(len(self.detector(threshold=2.0, min_days=7, min_articles=3).observe(states, observations)), 1)
+
+    def test_repeat_flag_is_stored_once_and_notified_once(self):
+        detector = self.detector(threshold=2.0, min_days=7, min_articles=3)
+        states, observations, spike = observed_state(10, 3)
+        detector.observe(states, observations)
+        states[1].add(date.fromisoformat(spike), 0.95)
+        detector.observe(states, [(1, spike, 0.95)])
+        self.assertEqual(len(self.flagged), 1)
+        stored = detector.recent(1)
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0]['articles'], 4)
+
+class TestWebhookSender(unittest.TestCase):
+    def test_send_does_not_wait_for_the_post(self):
+        session = BlockingSession()
+        sender = WebhookSender(["http://hook/a", "http://hook/b"], session=session)
+        self.assertTrue(sender.send({'company_id': 1, 'day': '2024-03-01'}))
+        self.assertEqual(session.posts, [])
+        session.release.set()
+        sender.close(5)
+        self.assertEqual([url for url, _ in session.posts], ["http://hook/a", "http://hook/b"])
+        self.assertEqual(sender.stats['sent'], 2)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        session = BlockingSession()
+        sender = WebhookSender(["http://hook"], queue_size=1, session=session)
+        sender.send({'company_id': 1, 'day': '2024-03-01'})
+        self.assertTrue(session.started.wait(5))
+        self.assertTrue(sender.send({'company_id': 1, 'day': '2024-03-02'}))
+        self.assertFalse(sender.send({'company_id': 1, 'day': '2024-03-03'}))
+        session.release.set()
+        sender.close(5)
+        self.assertEqual([anomaly['day'] for _, anomaly in session.posts], ['2024-03-01', '2024-03-02'])
+        self.assertEqual(sender.stats['dropped'], 1)
+
+    def test_detector_queues_new_anomalies_for_webhooks(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        detector = StreamingAnomalyDetector(SimpleNamespace(db_path=Path(tmp.name) / "test.db"),
+                                            threshold=2.0, min_days=7, min_articles=3, webhooks=["http://hook"])
+        session = BlockingSession()
+        session.release.set()
+        detector.sender.session = session
+        states, observations, spike = observed_state(10, 3)
+        detector.observe(states, observations)
+        detector.observe(states, observations)
+        detector.close(5)
+        self.assertEqual([anomaly['day'] for _, anomaly in session.posts], [spike])
@@ -0,0 +1,39 @@
+import unittest
+from config import settings
+from src.api.batch import group_by_company, resolve_companies, split_values
+
+COMPANIES = [(1, 'Apple Inc.', 'AAPL'), (2, 'Microsoft Corp.', 'MSFT'), (3, 'Amazon.com Inc.', 'AMZN')]
+
+class FakeDB:
+    def __init__(self):
+        self.queries = 0
+
+    def find_companies(self, company_ids=(), tickers=()):
+        self.queries += 1
+        return [row for row in COMPANIES if row[0] in company_ids or row[2] in tickers]
+
+class TestBatch(unittest.TestCase):
+    def test_split_values(self):
+        self.assertEqual(split_values(['AAPL, MSFT', 'AMZN', ',']), ['AAPL', 'MSFT', 'AMZN'])
+        self.assertEqual(split_values(None), [])
+
+    def test_resolve_keeps_request_order_in_one_query(self):
+        db = FakeDB()
+        companies, not_found = resolve_companies(db, ['3', '42'], ['msft,AAPL', 'amzn', 'XYZ'])
+        self.assertEqual([row[0] for row in companies], [3, 2, 1])
+        self.assertEqual(not_found, [42, 'XYZ'])
+        self.assertEqual(db.queries, 1)
+
+    def test_invalid_requests_are_value_errors(self):
+        for company_ids, tickers in (([], []), (['x'], []), ([], [f'T{i}' for i in range(settings.API_MAX_BATCH_COMPANIES + 1)])):
+            with self.assertRaises(ValueError):
+                resolve_companies(FakeDB(), company_ids, tickers)
+
+    def test_group_by_company(self):
+        groups = group_by_company(COMPANIES[:2], {1: [('2024-03-01', 3)]}, 'sentiment',
+                                  lambda row: {'date': row[0], 'total_articles': row[1]})
+        self.assertEqual(groups[0]['sentiment'], [{'date': '2024-03-01', 'total_articles': 3}])
+        self.assertEqual(groups[1], {'id': 2, 'name': 'Microsoft Corp.', 'ticker': 'MSFT', 'sentiment': []})
+
+if __name__ == '__main__':
+    unittest.main()
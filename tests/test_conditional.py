@@ -0,0 +1,21 @@
+import unittest
+from src.api.conditional import etag_matches, resource_etag
+
+class TestConditional(unittest.TestCase):
+    def test_etag_is_strong_and_follows_version_and_request(self):
+        etag = resource_etag(3, "/companies/1/news", "limit=10")
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, resource_etag(3, "/companies/1/news", "limit=10"))
+        self.assertNotEqual(etag, resource_etag(4, "/companies/1/news", "limit=10"))
+        self.assertNotEqual(etag, resource_etag(3, "/companies/1/news", "limit=20"))
+
+    def test_if_none_match(self):
+        etag = resource_etag(1, "/companies")
+        self.assertTrue(etag_matches(etag, etag))
+        self.assertTrue(etag_matches(f'"other", W/{etag}', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"other"', etag))
+        self.assertFalse(etag_matches(None, etag))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from src.scraping.content_fetcher import ContentFetcher, extract_article_text
+
+class FakeDB:
+    def __init__(self):
+        self.rows = []
+
+    def update_article_contents(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+class TestContentFetcher(unittest.TestCase):
+    def fetcher(self, fetch_text):
+        db = FakeDB()
+        fetcher = ContentFetcher(db, workers=2, batch_size=10)
+        fetcher._fetch_text = fetch_text
+        return fetcher, db
+
+    def test_fetched_text_is_written_and_released(self):
+        async def fetch_text(session, url):
+            return f"text of {url}"
+        fetcher, db = self.fetcher(fetch_text)
+        self.assertTrue(fetcher.submit(1, "http://example.com/a"))
+        self.assertFalse(fetcher.submit(1, "http://example.com/a"))
+        fetcher.close()
+        self.assertEqual(db.rows, [("text of http://example.com/a", 1)])
+        self.assertEqual(fetcher.in_flight, set())
+
+    def test_failing_job_can_be_queued_again(self):
+        async def fetch_text(session, url):
+            raise RuntimeError("parser bug")
+        fetcher, db = self.fetcher(fetch_text)
+        fetcher.submit(1, "http://example.com/a")
+        fetcher.close()
+        self.assertEqual(db.rows, [])
+        self.assertEqual(fetcher.stats['failed'], 1)
+        self.assertTrue(fetcher.submit(1, "http://example.com/a"))
+        fetcher.close()
+
+    def test_extract_prefers_article_paragraphs(self):
+        html = ("<nav><p>Home markets world business tech</p></nav>"
+                "<p>Sidebar text with enough words to count here</p>"
+                "<article><p>Apple reported record revenue for the quarter today</p></article>")
+        self.assertEqual(extract_article_text(html), "Apple reported record revenue for the quarter today")
+
+if __name__ == '__main__':
+    unittest.main()
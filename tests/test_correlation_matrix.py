@@ -0,0 +1,107 @@
+import unittest
+import numpy as np
+from src.analysis.correlation_matrix import PairwiseCorrelation, sentiment_matrix, top_k_peers
+
+def pairwise_corrcoef(values, min_overlap):
+    """Reference: np.corrcoef over the days both columns have a score"""
+    n = values.shape[1]
+    expected = np.full((n, n), np.nan)
+    for i in range(n):
+        for j in range(n):
+            both = ~np.isnan(values[:, i]) & ~np.isnan(values[:, j])
+            x, y = values[both, i].astype(np.float64), values[both, j].astype(np.float64)
+            if both.sum() >= min_overlap and x.std() > 0 and y.std() > 0:
+                expected[i, j] = np.corrcoef(x, y)[0, 1]
+    return expected
+
+class TestPairwiseCorrelation(unittest.TestCase):
+    def correlation(self, values, min_overlap=3):
+        pairs = PairwiseCorrelation(values.shape[1], min_overlap)
+        pairs.add(values)
+        return pairs.correlation()
+
+    def test_matches_corrcoef_on_pairwise_complete_days(self):
+        rng = np.random.default_rng(7)
+        values = rng.uniform(-1, 1, (60, 6)).astype(np.float32)
+        values[:, 1] = 0.8 * values[:, 0] + 0.2 * values[:, 1]
+        values[rng.random(values.shape) < 0.3] = np.nan
+        np.testing.assert_allclose(self.correlation(values), pairwise_corrcoef(values, 3), atol=1e-9)
+
+    def test_low_variance_series_is_not_flattened(self):
+        rng = np.random.default_rng(11)
+        base = rng.normal(size=90)
+        values = np.column_stack([0.5 + 1e-3 * base, 0.5 + 1e-3 * (base + 0.5 * rng.normal(size=90))])
+        values = values.astype(np.float32)
+        correlation = self.correlation(values)
+        self.assertFalse(np.isnan(correlation[0, 1]))
+        self.assertAlmostEqual(correlation[0, 1], pairwise_corrcoef(values, 3)[0, 1], places=6)
+
+    def test_constant_series_and_short_overlap_are_nan(self):
+        values = np.array([
+            [0.2, 0.1, 0.3],
+            [0.2, 0.4, np.nan],
+            [0.2, 0.3, np.nan],
+            [0.2, 0.9, 0.5],
+        ], dtype=np.float32)
+        correlation = self.correlation(values)
+        self.assertTrue(np.isnan(correlation[0, 1]))
+        self.assertTrue(np.isnan(correlation[1, 2]))
+        self.assertAlmostEqual(correlation[1, 1], 1.0)
+
+    def test_blocks_add_up_to_whole_matrix(self):
+        rng = np.random.default_rng(3)
+        values = rng.uniform(-1, 1, (30, 4))
+        values[rng.random(values.shape) < 0.2] = np.nan
+        pairs = PairwiseCorrelation(4, 3)
+        for row in values:
+            pairs.add(row)
+        np.testing.assert_allclose(pairs.correlation(), self.correlation(values), atol=1e-12)
+
+    def test_column_blocks_match_whole_matrix(self):
+        rng = np.random.default_rng(5)
+        values = rng.uniform(-1, 1, (40, 7))
+        values[rng.random(values.shape) < 0.25] = np.nan
+        pairs = PairwiseCorrelation(7, 3, block_size=3)
+        pairs.add(values)
+        blocks = list(pairs.blocks())
+        self.assertEqual([start for start, _, _ in blocks], [0, 3, 6])
+        self.assertEqual([len(correlation) for _, correlation, _ in blocks], [3, 3, 1])
+        np.testing.assert_allclose(pairs.correlation(), pairwise_corrcoef(values, 3), atol=1e-9)
+        overlap = np.concatenate([overlap for _, _, overlap in blocks])
+        present = (~np.isnan(values)).astype(np.float64)
+        np.testing.assert_array_equal(overlap, present.T @ present)
+
+class TestSentimentMatrix(unittest.TestCase):
+    def test_rows_align_on_calendar_days(self):
+        rows = [
+            (2, '2024-03-01', 4, 3, 1, 0),
+            (1, '2024-03-03 10:00:00', 2, 0, 2, 0),
+        ]
+        dates, ids, values = sentiment_matrix(rows)
+        self.assertEqual([str(day) for day in dates], ['2024-03-01', '2024-03-02', '2024-03-03'])
+        self.assertEqual(ids.tolist(), [1, 2])
+        self.assertAlmostEqual(values[0, 1], 0.5)
+        self.assertAlmostEqual(values[2, 0], -1.0)
+        self.assertTrue(np.isnan(values[1]).all())
+
+class TestTopKPeers(unittest.TestCase):
+    def test_best_first_skipping_self_and_nan(self):
+        correlation = np.array([
+            [1.0, 0.2, 0.9],
+            [0.2, 1.0, np.nan],
+            [0.9, np.nan, 1.0],
+        ])
+        peers, values = top_k_peers(correlation, 2)
+        self.assertEqual(peers[0].tolist(), [2, 1])
+        self.assertEqual(peers[1].tolist(), [0, -1])
+        self.assertTrue(np.isnan(values[1, 1]))
+
+    def test_block_rows_skip_their_own_column(self):
+        correlation = np.array([
+            [0.2, 1.0, np.nan],
+            [0.9, np.nan, 1.0],
+        ])
+        peers, values = top_k_peers(correlation, 2, start=1)
+        self.assertEqual(peers[0].tolist(), [0, -1])
+        self.assertEqual(peers[1].tolist(), [0, -1])
+        self.assertAlmostEqual(values[1, 0], 0.9)
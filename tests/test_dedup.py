@@ -0,0 +1,74 @@
+import unittest
+from src.scraping.dedup import StoryIndex, dedupe_articles, simhash, stored_fingerprint
+
+STORY = {'title': "Apple Reports Strong Q4 Earnings, Beats Estimates",
+         'excerpt': "Apple announced quarterly revenue of $77B, exceeding analyst expectations.",
+         'source': 'reuters_company_news', 'link': 'https://reuters.example/1'}
+COPY = {**STORY, 'title': "Apple reports strong Q4 earnings, beats estimates",
+        'source': 'yahoo_finance', 'link': 'https://yahoo.example/1'}
+OTHER = {'title': "Microsoft Expands Azure Operations", 'excerpt': "The company announced expansion plans.",
+         'source': 'marketwatch', 'link': 'https://mw.example/2'}
+
+class TestNearDuplicateDetection(unittest.TestCase):
+    def test_identical_text_has_identical_fingerprint(self):
+        self.assertEqual(simhash("Apple beats estimates", "Revenue rose"),
+                         simhash("Apple Beats Estimates!", "revenue rose"))
+
+    def test_syndicated_copies_are_merged(self):
+        articles = [
+            {'title': "Apple Reports Strong Q4 Earnings, Beats Estimates",
+             'excerpt': "Apple announced quarterly revenue of $77B, exceeding analyst expectations.",
+             'source': 'reuters_company_news', 'link': 'https://reuters.example/1'},
+            {'title': "Apple reports strong Q4 earnings, beats estimates",
+             'excerpt': "Apple announced quarterly revenue of $77B, exceeding analyst expectations",
+             'source': 'yahoo_finance', 'link': 'https://yahoo.example/1'},
+            {'title': "Microsoft Expands Azure Operations",
+             'excerpt': "The company announced expansion plans in key markets.",
+             'source': 'marketwatch', 'link': 'https://mw.example/2'},
+        ]
+        result = dedupe_articles(articles)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['source'], 'reuters_company_news')
+        self.assertEqual([s['source'] for s in result[0]['sources']],
+                         ['reuters_company_news', 'yahoo_finance'])
+        self.assertEqual(len(result[1]['sources']), 1)
+
+    def test_different_stories_are_kept(self):
+        articles = [
+            {'title': "Analysts Upgrade Amazon to Buy", 'excerpt': "", 'source': 'a', 'link': '1'},
+            {'title': "Amazon CEO Discusses Future Strategy", 'excerpt': "", 'source': 'b', 'link': '2'},
+        ]
+        self.assertEqual(len(dedupe_articles(articles)), 2)
+
+class TestStoryIndex(unittest.TestCase):
+    def test_copy_in_a_later_batch_is_reported_not_returned(self):
+        stories = StoryIndex()
+        [story], copies = stories.dedupe([STORY])
+        canonical, copies = stories.dedupe([COPY, OTHER])
+        self.assertEqual([article['link'] for article in canonical], [OTHER['link']])
+        self.assertEqual(copies, [(story, {'source': 'yahoo_finance', 'link': COPY['link']})])
+        self.assertEqual([link['source'] for link in story['sources']], ['reuters_company_news', 'yahoo_finance'])
+
+    def test_same_link_again_is_not_a_new_copy(self):
+        stories = StoryIndex()
+        stories.dedupe([STORY])
+        self.assertEqual(stories.dedupe([STORY]), ([], []))
+
+    def test_seeded_story_catches_copies(self):
+        stories = StoryIndex()
+        stories.seed([(42, stored_fingerprint(simhash(STORY['title'], STORY['excerpt'])))])
+        canonical, copies = stories.dedupe([COPY])
+        self.assertEqual(canonical, [])
+        self.assertEqual(copies[0][0]['id'], 42)
+
+    def test_oldest_stories_age_out(self):
+        stories = StoryIndex(max_entries=1)
+        stories.dedupe([STORY])
+        stories.dedupe([OTHER])
+        self.assertEqual(len(stories), 1)
+        canonical, copies = stories.dedupe([COPY])
+        self.assertEqual((len(canonical), copies), (1, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+from nltk.sentiment import SentimentIntensityAnalyzer
+from nltk.sentiment.vader import VaderConstants
+from src.fast_vader import FastVaderScorer
+
+class TestFastVaderScorer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nltk = SentimentIntensityAnalyzer()
+        cls.fast = FastVaderScorer()
+
+    def assertMatchesNltk(self, text):
+        expected = self.nltk.polarity_scores(text)
+        actual = self.fast.polarity_scores(text)
+        for key in ('neg', 'neu', 'pos', 'compound'):
+            self.assertAlmostEqual(actual[key], expected[key], places=4, msg=f"{key} for {text!r}")
+
+    def test_rule_examples(self):
+        for text in [
+            "This is a great company with excellent products and amazing growth potential.",
+            "VADER is not smart, handsome, nor funny.",
+            "The stock was kind of good, but the outlook is HORRIBLE!!!",
+            "At least it isn't a horrible quarter.",
+            "Never so happy with earnings?? Really??",
+            "Shares barely moved. Analysts were extremely disappointed.",
+            "That deal was the bomb",
+            "",
+        ]:
+            self.assertMatchesNltk(text)
+
+    def test_random_texts(self):
+        constants = VaderConstants()
+        vocab = (list(self.nltk.lexicon)[::40] + list(constants.BOOSTER_DICT) + list(constants.NEGATE)
+                 + ["but", "least", "at", "very", "never", "so", "this", "kind", "of", "company"])
+        marks = ["", "", ",", ".", "!", "!!", "?", "...", ":)", "'s", "("]
+        rng = random.Random(7)
+        for _ in range(2000):
+            words = []
+            for _ in range(rng.randint(1, 20)):
+                word = rng.choice(vocab)
+                if rng.random() < 0.1:
+                    word = word.upper()
+                if rng.random() < 0.3:
+                    word += rng.choice(marks)
+                if rng.random() < 0.05:
+                    word = rng.choice(marks) + word
+                words.append(word)
+            self.assertMatchesNltk(" ".join(words))
+
+if __name__ == '__main__':
+    unittest.main()
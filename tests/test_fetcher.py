@@ -0,0 +1,101 @@
+import asyncio
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.scraping.fetcher import AsyncFetcher
+from src.scraping.http_cache import HttpCache
+from src.scraping.latency import CircuitBreaker
+
+UNPACED = {'rate': 0, 'concurrency': 4}
+
+def local_app(hits, seen_headers):
+    """Local server: /etag revalidates, /fresh is cacheable, /throttle 429s once, /slow/N sleeps N ms"""
+    async def etag(request):
+        hits['etag'] += 1
+        seen_headers.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.Response(text='hello', headers={'ETag': '"v1"'})
+
+    async def fresh(request):
+        hits['fresh'] += 1
+        return web.Response(text='fresh', headers={'ETag': '"f1"', 'Cache-Control': 'max-age=60'})
+
+    async def throttle(request):
+        hits['throttle'] += 1
+        if hits['throttle'] == 1:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        return web.Response(text='done')
+
+    async def slow(request):
+        milliseconds = int(request.match_info['ms'])
+        await asyncio.sleep(milliseconds / 1000)
+        return web.Response(text=str(milliseconds))
+
+    app = web.Application()
+    app.router.add_get('/etag', etag)
+    app.router.add_get('/fresh', fresh)
+    app.router.add_get('/throttle', throttle)
+    app.router.add_get('/slow/{ms}', slow)
+    return app
+
+class TestAsyncFetcher(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.fetcher = AsyncFetcher(cache=HttpCache(Path(tmp.name) / "http_cache.db"))
+        self.hits = Counter()
+        self.seen_headers = []
+        pacing = mock.patch('config.settings.DEFAULT_HOST_RATE_LIMIT', UNPACED)
+        pacing.start()
+        self.addCleanup(pacing.stop)
+
+    def fetch_rounds(self, *rounds, sources=None):
+        """Run each round of paths through fetch_all against one local server; returns each round's results"""
+        async def main():
+            async with TestServer(local_app(self.hits, self.seen_headers)) as server:
+                return [await self.fetcher.fetch_all([str(server.make_url(path)) for path in paths], sources=sources)
+                        for paths in rounds]
+        return asyncio.run(main())
+
+    def test_results_keep_input_order(self):
+        [results] = self.fetch_rounds(['/slow/150', '/slow/0', '/slow/60'])
+        self.assertEqual([result.text for result in results], ['150', '0', '60'])
+        self.assertTrue(all(result.ok for result in results))
+
+    def test_stale_entry_is_revalidated_with_its_etag(self):
+        first, second = self.fetch_rounds(['/etag'], ['/etag'])
+        self.assertEqual((first[0].status, first[0].text), (200, 'hello'))
+        self.assertEqual(self.seen_headers, [None, '"v1"'])
+        self.assertTrue(second[0].not_modified)
+        self.assertEqual((second[0].status, second[0].text), (304, 'hello'))
+
+    def test_fresh_entry_is_answered_without_a_request(self):
+        first, second = self.fetch_rounds(['/fresh'], ['/fresh'])
+        self.assertEqual(self.hits['fresh'], 1)
+        self.assertTrue(second[0].not_modified)
+        self.assertEqual(second[0].text, first[0].text)
+
+    def test_throttled_request_is_retried(self):
+        [results] = self.fetch_rounds(['/throttle'])
+        self.assertEqual((results[0].status, results[0].text), (200, 'done'))
+        self.assertEqual(self.hits['throttle'], 2)
+
+    def test_network_error_becomes_a_failed_result(self):
+        results = self.fetcher.fetch_many(['http://127.0.0.1:9/unreachable'])
+        self.assertFalse(results[0].ok)
+        self.assertIsNotNone(results[0].error)
+
+    def test_open_circuit_skips_the_source(self):
+        breaker = self.fetcher.health.breakers['src'] = CircuitBreaker(failure_threshold=1, cooldown=60)
+        breaker.record_failure()
+        [results] = self.fetch_rounds(['/etag'], sources=['src'])
+        self.assertIn('circuit open', results[0].error)
+        self.assertEqual(self.hits['etag'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
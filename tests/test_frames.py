@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from src.analysis.frames import SENTIMENT_HISTORY, read_frame, sentiment_scores, to_columnar, to_records
+
+ROWS = [
+    (1, '2024-03-01', 4, 3, 1, 0),
+    (1, '2024-03-02', 0, 0, 0, 0),
+    (2, '2024-03-01 09:30:00', 5, 1, 4, 0),
+]
+
+class TestFrames(unittest.TestCase):
+    def test_read_frame_is_typed_across_chunks(self):
+        df = read_frame([ROWS[:2], [], ROWS[2:]], SENTIMENT_HISTORY)
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df['company_id'].dtype, np.int32)
+        self.assertEqual(df['total_articles'].dtype, np.int32)
+        self.assertTrue(np.issubdtype(df['date'].dtype, np.datetime64))
+
+    def test_empty_frame_keeps_columns(self):
+        df = read_frame([], SENTIMENT_HISTORY)
+        self.assertTrue(df.empty)
+        self.assertEqual(list(df.columns), [name for name, _ in SENTIMENT_HISTORY])
+
+    def test_scores_are_float32_with_nan_for_empty_days(self):
+        scores = sentiment_scores(read_frame([ROWS], SENTIMENT_HISTORY))
+        self.assertEqual(scores.dtype, np.float32)
+        self.assertAlmostEqual(float(scores[0]), 0.5)
+        self.assertTrue(np.isnan(scores[1]))
+
+    def test_records_and_columnar_are_json_ready(self):
+        df = read_frame([ROWS], SENTIMENT_HISTORY)
+        df['sentiment_score'] = sentiment_scores(df)
+        records = to_records(df)
+        self.assertEqual(records[0]['date'], '2024-03-01')
+        self.assertEqual(records[2]['sentiment_score'], -0.6)
+        self.assertIsNone(records[1]['sentiment_score'])
+        columnar = to_columnar(df)
+        self.assertEqual(columnar['columns'][0], 'company_id')
+        self.assertEqual(columnar['data']['date'], ['2024-03-01', '2024-03-02', '2024-03-01'])
+
+if __name__ == '__main__':
+    unittest.main()
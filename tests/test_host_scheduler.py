@@ -0,0 +1,120 @@
+import asyncio
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from unittest import mock
+from src.scraping.fetcher import FetchResult
+from src.scraping.host_scheduler import HostScheduler, parse_retry_after
+
+def scripted_job(log, name, results, hold=0.0):
+    """Job that logs (name, loop time) per attempt and returns results[attempt] (the last one from then on)"""
+    attempts = []
+
+    async def job():
+        log.append((name, asyncio.get_running_loop().time()))
+        attempts.append(name)
+        if hold:
+            await asyncio.sleep(hold)
+        return results[min(len(attempts), len(results)) - 1]
+    return job
+
+def run(scheduler_kwargs, jobs):
+    async def main():
+        return await HostScheduler(**scheduler_kwargs).run(jobs)
+    return asyncio.run(main())
+
+class TestHostScheduler(unittest.TestCase):
+    def test_lower_priority_runs_first_within_a_host(self):
+        log = []
+        ok = [FetchResult('u', 200)]
+        jobs = [('h', scripted_job(log, name, ok), priority)
+                for name, priority in [('late', 5), ('first', 1), ('middle', 3), ('first-again', 1)]]
+        results = run({'limits': {'h': {'rate': 0, 'concurrency': 1}}}, jobs)
+        self.assertEqual([name for name, _ in log], ['first', 'first-again', 'middle', 'late'])
+        self.assertEqual(len(results), 4)
+
+    def test_requests_are_spaced_by_the_host_rate(self):
+        log = []
+        ok = [FetchResult('u', 200)]
+        run({'limits': {'h': {'rate': 20, 'concurrency': 4}}},
+            [('h', scripted_job(log, i, ok), 0) for i in range(4)])
+        starts = [started for _, started in log]
+        for previous, current in zip(starts, starts[1:]):
+            self.assertGreaterEqual(current - previous, 0.045)
+
+    def test_concurrency_is_capped_per_host(self):
+        running = {'now': 0, 'peak': 0}
+
+        async def job():
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+            await asyncio.sleep(0.02)
+            running['now'] -= 1
+            return FetchResult('u', 200)
+        run({'limits': {'h': {'rate': 0, 'concurrency': 2}}}, [('h', job, 0) for _ in range(6)])
+        self.assertEqual(running['peak'], 2)
+
+    def test_slow_host_does_not_hold_up_others(self):
+        log = []
+        ok = [FetchResult('u', 200)]
+        limits = {'slow': {'rate': 0, 'concurrency': 1}, 'fast': {'rate': 0, 'concurrency': 1}}
+        run({'limits': limits}, [('slow', scripted_job(log, 'slow', ok, hold=0.2), 0),
+                                 ('slow', scripted_job(log, 'slow-2', ok), 0),
+                                 ('fast', scripted_job(log, 'fast', ok), 0)])
+        started = dict(log)
+        self.assertLess(started['fast'] - started['slow'], 0.1)
+        self.assertGreaterEqual(started['slow-2'] - started['slow'], 0.19)
+
+    def test_429_pauses_the_host_for_retry_after(self):
+        log = []
+        throttled = FetchResult('u', 429, headers={'retry-after': '0.2'})
+        ok = FetchResult('u', 200)
+        results = run({'limits': {'h': {'rate': 0, 'concurrency': 1}}},
+                      [('h', scripted_job(log, 'a', [throttled, ok]), 0),
+                       ('h', scripted_job(log, 'b', [ok]), 1)])
+        self.assertEqual([result.status for result in results], [200, 200])
+        self.assertEqual([name for name, _ in log], ['a', 'a', 'b'])
+        self.assertGreaterEqual(log[1][1] - log[0][1], 0.19)
+
+    def test_503_without_retry_after_backs_off_exponentially(self):
+        log = []
+        unavailable = FetchResult('u', 503)
+        with mock.patch('config.settings.HOST_BACKOFF_BASE', 0.05):
+            results = run({'limits': {'h': {'rate': 0, 'concurrency': 1}}, 'max_retries': 2},
+                          [('h', scripted_job(log, 'a', [unavailable]), 0)])
+        starts = [started for _, started in log]
+        self.assertEqual(results[0].status, 503)  # gave up after max_retries
+        self.assertEqual(len(starts), 3)
+        self.assertGreaterEqual(starts[1] - starts[0], 0.045)
+        self.assertGreaterEqual(starts[2] - starts[1], 0.095)
+
+    def test_job_exception_reaches_its_future(self):
+        async def failing():
+            raise ValueError("boom")
+        with self.assertRaises(ValueError):
+            run({'limits': {'h': {'rate': 0, 'concurrency': 1}}}, [('h', failing, 0)])
+
+class TestRetryAfter(unittest.TestCase):
+    def test_delta_seconds(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after('-5'), 0.0)
+
+    def test_http_date_against_the_clock(self):
+        now = datetime(2024, 3, 1, 12, 0, 0, tzinfo=timezone.utc)
+        with mock.patch('src.scraping.host_scheduler.time.time', return_value=now.timestamp()):
+            self.assertEqual(parse_retry_after(format_datetime(now.replace(minute=2), usegmt=True)), 120.0)
+            self.assertEqual(parse_retry_after(format_datetime(now.replace(hour=11), usegmt=True)), 0.0)
+
+    def test_missing_or_garbage(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_delay_is_capped_and_only_for_retry_statuses(self):
+        scheduler = HostScheduler(limits={})
+        with mock.patch('config.settings.HOST_MAX_BACKOFF', 30.0):
+            self.assertEqual(scheduler.retry_delay(FetchResult('u', 429, headers={'Retry-After': '600'}), 0), 30.0)
+        self.assertIsNone(scheduler.retry_delay(FetchResult('u', 500), 0))
+        self.assertIsNone(scheduler.retry_delay(FetchResult('u', error='timeout'), 0))
+
+if __name__ == '__main__':
+    unittest.main()
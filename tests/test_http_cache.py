@@ -0,0 +1,95 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from src.scraping.http_cache import CacheEntry, HttpCache, parse_cache_control
+
+class StubResponse:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+class StubSession:
+    """requests.Session stand-in that replays responses and records request headers"""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+class TestCacheEntry(unittest.TestCase):
+    def test_parse_cache_control(self):
+        self.assertEqual(parse_cache_control('public, Max-Age="60", no-cache'),
+                         {'public': True, 'max-age': '60', 'no-cache': True})
+        self.assertEqual(parse_cache_control(None), {})
+
+    def test_freshness_follows_max_age(self):
+        entry = CacheEntry('u', 'body', fetched_at=1000.0, max_age=60)
+        self.assertTrue(entry.is_fresh(now=1059.0))
+        self.assertFalse(entry.is_fresh(now=1060.0))
+        self.assertFalse(CacheEntry('u', 'body', fetched_at=1000.0).is_fresh(now=1000.0))
+        self.assertFalse(CacheEntry('u', 'body', fetched_at=1000.0, max_age=60, no_cache=True).is_fresh(now=1001.0))
+
+    def test_conditional_headers_carry_both_validators(self):
+        entry = CacheEntry('u', 'body', etag='"v1"', last_modified='Fri, 01 Mar 2024 12:00:00 GMT')
+        self.assertEqual(entry.conditional_headers(), {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Fri, 01 Mar 2024 12:00:00 GMT'})
+        self.assertEqual(CacheEntry('u', 'body').conditional_headers(), {})
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = HttpCache(Path(tmp.name) / "http_cache.db")
+        clock = mock.patch('src.scraping.http_cache.time.time', return_value=1000.0)
+        self.clock = clock.start()
+        self.addCleanup(clock.stop)
+
+    def test_store_keeps_validators_and_policy(self):
+        self.assertTrue(self.cache.store('u', {'ETag': '"v1"', 'Cache-Control': 'max-age=60'}, 'body'))
+        entry = self.cache.get('u')
+        self.assertEqual((entry.body, entry.etag, entry.max_age, entry.fetched_at), ('body', '"v1"', 60, 1000.0))
+        self.assertTrue(entry.is_fresh(now=1030.0))
+
+    def test_store_skips_no_store_and_unvalidatable_responses(self):
+        self.assertFalse(self.cache.store('a', {'ETag': '"v1"', 'Cache-Control': 'no-store'}, 'body'))
+        self.assertFalse(self.cache.store('b', {'Cache-Control': 'public'}, 'body'))
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+
+    def test_refresh_keeps_body_and_restarts_lifetime(self):
+        self.cache.store('u', {'ETag': '"v1"', 'Last-Modified': 'Fri, 01 Mar 2024 12:00:00 GMT'}, 'body')
+        self.clock.return_value = 2000.0
+        self.cache.refresh('u', {'ETag': '"v2"', 'Cache-Control': 'max-age=30'})
+        entry = self.cache.get('u')
+        self.assertEqual((entry.body, entry.etag, entry.fetched_at, entry.max_age), ('body', '"v2"', 2000.0, 30))
+        self.assertEqual(entry.last_modified, 'Fri, 01 Mar 2024 12:00:00 GMT')
+
+    def test_cached_get_revalidates_with_the_stored_etag(self):
+        self.cache.store('u', {'ETag': '"v1"'}, 'body')
+        session = StubSession(StubResponse(304, {'ETag': '"v1"'}))
+        response, not_modified = self.cache.cached_get(session, 'u', headers={'User-Agent': 'test'})
+        self.assertIsNone(response)
+        self.assertTrue(not_modified)
+        self.assertEqual(session.requests, [('u', {'User-Agent': 'test', 'If-None-Match': '"v1"'})])
+
+    def test_cached_get_skips_the_request_while_fresh(self):
+        self.cache.store('u', {'ETag': '"v1"', 'Cache-Control': 'max-age=60'}, 'body')
+        session = StubSession()
+        with mock.patch('src.scraping.http_cache.time.time', return_value=1030.0):
+            self.assertEqual(self.cache.cached_get(session, 'u'), (None, True))
+        self.assertEqual(session.requests, [])
+
+    def test_cached_get_stores_a_changed_body(self):
+        self.cache.store('u', {'ETag': '"v1"'}, 'old')
+        session = StubSession(StubResponse(200, {'ETag': '"v2"'}, 'new'))
+        response, not_modified = self.cache.cached_get(session, 'u')
+        self.assertFalse(not_modified)
+        self.assertEqual(response.text, 'new')
+        self.assertEqual((self.cache.get('u').body, self.cache.get('u').etag), ('new', '"v2"'))
+
+if __name__ == '__main__':
+    unittest.main()
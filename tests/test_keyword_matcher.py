@@ -0,0 +1,34 @@
+import unittest
+from src.scraping.keyword_matcher import KeywordMatcher
+
+COMPANIES = [
+    {"name": "Apple Inc.", "ticker": "AAPL", "keywords": ["iPhone", "Mac"]},
+    {"name": "Microsoft Corporation", "ticker": "MSFT", "keywords": ["Azure", "Cloud"]},
+    {"name": "Amazon.com Inc.", "ticker": "AMZN", "keywords": ["AWS", "Cloud"]},
+]
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher(COMPANIES)
+
+    def test_matches_name_ticker_and_keyword(self):
+        self.assertEqual(self.matcher.match("Apple Inc. beats estimates"), {"AAPL"})
+        self.assertEqual(self.matcher.match("Shares of msft climb"), {"MSFT"})
+        self.assertEqual(self.matcher.match("New iPhone sales surge"), {"AAPL"})
+
+    def test_shared_keyword_matches_all_companies(self):
+        self.assertEqual(self.matcher.match("Cloud spending slows"), {"MSFT", "AMZN"})
+
+    def test_multiple_companies_in_one_title(self):
+        self.assertEqual(self.matcher.match("AWS and Azure battle for AI workloads"), {"AMZN", "MSFT"})
+
+    def test_respects_word_boundaries(self):
+        self.assertEqual(self.matcher.match("Macro outlook weighs on markets"), set())
+        self.assertEqual(self.matcher.match("Mac shipments rise"), {"AAPL"})
+        self.assertEqual(self.matcher.match("AAPLX fund rebalances"), set())
+
+    def test_no_match(self):
+        self.assertEqual(self.matcher.match("Oil prices steady"), set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from src.scraping.fetcher import AsyncFetcher, FetchResult
+from src.scraping.host_scheduler import HostScheduler
+from src.scraping.latency import CircuitBreaker, LatencyTracker, SourceHealth
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_window_keeps_most_recent_samples(self):
+        tracker = LatencyTracker(window=10)
+        for seconds in range(100):
+            tracker.record(seconds)
+        self.assertEqual(len(tracker), 10)
+        self.assertEqual(tracker.percentile(0), 90)
+        self.assertEqual(tracker.percentile(100), 99)
+
+    def test_empty_tracker_has_no_percentile(self):
+        self.assertIsNone(LatencyTracker(window=10).percentile(95))
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+        for _ in range(2):
+            breaker.record_failure(now=0)
+        self.assertTrue(breaker.allow(now=0))
+        breaker.record_failure(now=0)
+        self.assertFalse(breaker.allow(now=30))
+
+    def test_single_probe_after_cooldown(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+        breaker.record_failure(now=0)
+        self.assertTrue(breaker.allow(now=61))
+        self.assertFalse(breaker.allow(now=61))
+        breaker.record_success()
+        self.assertTrue(breaker.allow(now=62))
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60)
+        breaker.record_failure(now=0)
+        breaker.allow(now=61)
+        breaker.record_failure(now=61)
+        self.assertFalse(breaker.allow(now=100))
+
+class TestSourceHealth(unittest.TestCase):
+    def test_default_timeout_until_enough_samples(self):
+        health = SourceHealth(default_timeout=10, min_samples=5)
+        self.assertEqual(health.timeout_for('yahoo_finance'), 10)
+        self.assertIsNone(health.hedge_delay('yahoo_finance'))
+
+    def test_timeout_adapts_to_latency(self):
+        health = SourceHealth(default_timeout=10, min_samples=5)
+        for _ in range(20):
+            health.record('yahoo_finance', FetchResult('u', 200), 0.5)
+        self.assertAlmostEqual(health.hedge_delay('yahoo_finance'), 0.5)
+        self.assertLess(health.timeout_for('yahoo_finance'), 10)
+
+class TestHedging(unittest.TestCase):
+    def run_hedged(self, concurrency, delays, failing=()):
+        """Fetch one URL through a host scheduler; attempt i takes delays[i] seconds
+
+        Attempts whose index is in failing end in a timeout error instead of a 200.
+        """
+        fetcher = AsyncFetcher()
+        for _ in range(20):
+            fetcher.health.record('src', FetchResult('u', 200), 0.05)
+        calls = {'started': 0, 'running': 0, 'peak': 0}
+
+        async def fetch(session, url, entry=None, timeout=None):
+            attempt = calls['started']
+            delay = delays[attempt]
+            calls['started'] += 1
+            calls['running'] += 1
+            calls['peak'] = max(calls['peak'], calls['running'])
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                calls['running'] -= 1
+            if attempt in failing:
+                return FetchResult(url, error='TimeoutError')
+            return FetchResult(url, 200, str(delay))
+        fetcher.fetch = fetch
+
+        async def main():
+            scheduler = HostScheduler(limits={'h': {'rate': 0, 'concurrency': concurrency}})
+            submit = lambda job: scheduler.submit('h', job)
+            job = lambda: fetcher.fetch_source(None, 'u', 'src', None, submit)
+            result = await asyncio.wait_for(scheduler.run([('h', job, 0)]), 2)
+            return result[0]
+        return asyncio.run(main()), calls, fetcher.health.latencies['src']
+
+    def test_hedge_waits_for_a_host_slot(self):
+        result, calls, _ = self.run_hedged(concurrency=1, delays=[0.2, 0.01])
+        self.assertEqual(result.text, '0.2')
+        self.assertEqual((calls['started'], calls['peak']), (1, 1))
+
+    def test_failed_first_send_cancels_a_hedge_queued_behind_it(self):
+        result, calls, _ = self.run_hedged(concurrency=1, delays=[0.2, 0.01], failing={0})
+        self.assertEqual(result.error, 'TimeoutError')
+        self.assertEqual((calls['started'], calls['peak']), (1, 1))
+
+    def test_failed_first_send_waits_for_a_running_hedge(self):
+        result, calls, _ = self.run_hedged(concurrency=2, delays=[0.2, 0.3], failing={0})
+        self.assertEqual(result.text, '0.3')
+        self.assertEqual(calls['started'], 2)
+
+    def test_winning_hedge_records_latency_from_first_send(self):
+        result, calls, latencies = self.run_hedged(concurrency=2, delays=[0.5, 0.01])
+        self.assertEqual(result.text, '0.01')
+        self.assertEqual(calls['started'], 2)
+        self.assertGreaterEqual(latencies.percentile(100), 0.06)
+
+if __name__ == '__main__':
+    unittest.main()
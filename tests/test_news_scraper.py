@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+from data.database import FinancialDataDB
+from data.news_store import NewsSegmentStore
+from src.news_scraper import NewsScraper
+from src.scraping.dedup import StoryIndex
+
+COMPANY = {'name': "Apple Inc.", 'ticker': "AAPL", 'cik': "0000320193"}
+OTHER_COMPANY = {'name': "Microsoft Corporation", 'ticker': "MSFT", 'cik': "0000789019"}
+STORY = {'title': "Apple Reports Strong Q4 Earnings, Beats Estimates",
+         'excerpt': "Apple announced quarterly revenue of $77B, exceeding analyst expectations.",
+         'source': 'reuters_company_news', 'link': 'https://reuters.example/1', 'date': '2025-01-02'}
+COPY = {**STORY, 'title': "Apple reports strong Q4 earnings, beats estimates",
+        'source': 'yahoo_finance', 'link': 'https://yahoo.example/1'}
+
+class StubContentFetcher:
+    def submit(self, article_id, url):
+        return True
+
+class TestCrossCycleDedup(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.db = FinancialDataDB(self.root / "test.db")
+
+    def scraper(self):
+        """NewsScraper wired to the temporary database and store, without network clients"""
+        scraper = NewsScraper.__new__(NewsScraper)
+        scraper.db = self.db
+        scraper.store = NewsSegmentStore(self.root / "segments")
+        scraper.content_fetcher = StubContentFetcher()
+        scraper.company_ids = {}
+        scraper.stories = StoryIndex()
+        scraper.stories.seed(self.db.get_recent_fingerprints(100))
+        return scraper
+
+    def test_copy_in_a_later_collect_is_suppressed(self):
+        scraper = self.scraper()
+        first = scraper.collect_articles(COMPANY, {}, [STORY])
+        scraper.save_company_news(COMPANY, first)
+        second = scraper.collect_articles(OTHER_COMPANY, {}, [COPY])
+        self.assertEqual(second, [])
+        self.assertEqual(self.db.get_article_sources(first[0]['id']),
+                         [('reuters_company_news', STORY['link']), ('yahoo_finance', COPY['link'])])
+
+    def test_restarted_scraper_remembers_stored_stories(self):
+        scraper = self.scraper()
+        scraper.save_company_news(COMPANY, scraper.collect_articles(COMPANY, {}, [STORY]))
+        self.assertEqual(self.scraper().collect_articles(COMPANY, {}, [COPY]), [])
+        [row] = self.db.get_company_news(self.db.get_company_id("AAPL"))
+        self.assertEqual(len(self.db.get_article_sources(row[-1])), 2)
+
+if __name__ == '__main__':
+    unittest.main()
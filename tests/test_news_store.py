@@ -0,0 +1,87 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from data.news_store import NewsSegmentStore
+
+def make_articles(start, count):
+    return [{'title': f"Article {i}", 'excerpt': "x" * 40, 'source': 'test', 'link': f"https://example.com/{i}"}
+            for i in range(start, start + count)]
+
+class TestNewsSegmentStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = NewsSegmentStore(Path(self.tmp.name), max_segment_bytes=1000, compress=True, index_stride=4)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_appends_keep_history_and_rotate_segments(self):
+        self.store.append('AAPL', make_articles(0, 20), day='2025-09-01')
+        self.store.append('AAPL', make_articles(20, 20), day='2025-09-01')
+
+        titles = [a['title'] for a in self.store.iter_day('AAPL', '2025-09-01')]
+        self.assertEqual(titles, [f"Article {i}" for i in range(40)])
+
+        segments = self.store.load_index('AAPL', '2025-09-01')['segments']
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(s['name'].endswith('.gz') for s in segments if s['sealed']))
+
+    def test_reads_from_record_offset(self):
+        self.store.append('AAPL', make_articles(0, 40), day='2025-09-01')
+        titles = [a['title'] for a in self.store.iter_day('AAPL', '2025-09-01', start_record=27)]
+        self.assertEqual(titles, [f"Article {i}" for i in range(27, 40)])
+
+    def test_reads_only_requested_days(self):
+        self.store.append('MSFT', make_articles(0, 2), day='2025-09-01')
+        self.store.append('MSFT', make_articles(2, 3), day='2025-09-02')
+        self.assertEqual(len(list(self.store.iter_articles('MSFT', since='2025-09-02'))), 3)
+        self.assertEqual(list(self.store.iter_articles('AMZN')), [])
+
+    def write_unindexed(self, name, articles, torn=b''):
+        """Records an interrupted append wrote to a segment file without updating the index"""
+        with open(Path(self.tmp.name) / 'AAPL' / '2025-09-01' / name, 'ab') as f:
+            for article in articles:
+                f.write((json.dumps(article) + "\n").encode("utf-8"))
+            f.write(torn)
+
+    def assert_titles(self, count, start_record=0):
+        titles = [a['title'] for a in self.store.iter_day('AAPL', '2025-09-01', start_record=start_record)]
+        self.assertEqual(titles, [f"Article {i}" for i in range(start_record, count)])
+
+    def test_next_append_indexes_records_of_an_interrupted_one(self):
+        self.store.append('AAPL', make_articles(0, 3), day='2025-09-01')
+        self.write_unindexed('000000.ndjson', make_articles(3, 4), torn=b'{"title": "Arti')
+        self.assert_titles(3)  # readers only see what the index covers
+
+        self.store.append('AAPL', make_articles(7, 30), day='2025-09-01')
+        self.assert_titles(37)
+        for start_record in (5, 9, 21):
+            self.assert_titles(37, start_record)
+
+    def test_first_append_interrupted_before_any_index(self):
+        (Path(self.tmp.name) / 'AAPL' / '2025-09-01').mkdir(parents=True)
+        self.write_unindexed('000000.ndjson', make_articles(0, 5), torn=b'{"ti')
+        self.store.append('AAPL', make_articles(5, 2), day='2025-09-01')
+        self.assert_titles(7)
+        self.assert_titles(7, start_record=4)
+
+    def test_segment_sealed_but_not_indexed(self):
+        self.store.append('AAPL', make_articles(0, 3), day='2025-09-01')
+        day_path = Path(self.tmp.name) / 'AAPL' / '2025-09-01'
+        self.write_unindexed('000000.ndjson', make_articles(3, 2))
+        plain = day_path / '000000.ndjson'
+        with gzip.open(day_path / '000000.ndjson.gz', 'wb') as f:
+            f.write(plain.read_bytes())
+        plain.unlink()
+        self.assert_titles(3)
+
+        self.store.append('AAPL', make_articles(5, 2), day='2025-09-01')
+        self.assert_titles(7)
+        segments = self.store.load_index('AAPL', '2025-09-01')['segments']
+        self.assertEqual([(s['name'], s['sealed'], s['records']) for s in segments],
+                         [('000000.ndjson.gz', True, 5), ('000001.ndjson', False, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import json
+import unittest
+from src.api.pagination import decode_cursor, encode_cursor, ndjson, page_size, split_page
+
+ROWS = [('a', '2024-03-03', 7), ('b', '2024-03-02', 5), ('c', '2024-03-02', 4), ('d', None, 9)]
+
+class TestPagination(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        for key in (('2024-03-02 10:00:00', 4), (None, 9)):
+            token = encode_cursor(*key)
+            self.assertNotIn('=', token)
+            self.assertEqual(decode_cursor(token), key)
+        self.assertIsNone(decode_cursor(None))
+
+    def test_malformed_cursor_is_value_error(self):
+        for token in ('@@', encode_cursor('2024-03-02', 'x'), 'e30'):
+            with self.assertRaises(ValueError):
+                decode_cursor(token)
+
+    def test_split_page(self):
+        page, cursor = split_page(ROWS[:3], 2, 1)
+        self.assertEqual(page, ROWS[:2])
+        self.assertEqual(decode_cursor(cursor), ('2024-03-02', 5))
+        self.assertEqual(split_page(ROWS[2:], 2, 1), (ROWS[2:], None))
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(page_size(0), 1)
+        self.assertEqual(page_size(10 ** 9), page_size(None, default=10 ** 9))
+        self.assertEqual(page_size(None, default=10), 10)
+
+    def test_ndjson_lines(self):
+        lines = list(ndjson(iter([{'id': 1}, {'id': 2, 'date': None}])))
+        self.assertEqual([json.loads(line) for line in lines], [{'id': 1}, {'id': 2, 'date': None}])
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import threading
+import unittest
+from src.analysis.result_cache import AnalysisResultCache, cached_analysis
+
+class FakeDB:
+    def __init__(self):
+        self.versions = {}
+
+    def get_data_version(self, company_ids=None):
+        if company_ids is None:
+            return self.versions.get(0, 0)
+        return sum(self.versions.get(company_id, 0) for company_id in company_ids)
+
+    def write(self, company_id):
+        for key in (0, company_id):
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+class Analyzer:
+    def __init__(self, db, max_entries=10):
+        self.result_cache = AnalysisResultCache(db, max_entries)
+        self.calls = 0
+
+    @cached_analysis('company_id')
+    def trend(self, company_id, days=30):
+        self.calls += 1
+        return {'company_id': company_id, 'days': days}
+
+    @cached_analysis('company_ids')
+    def trends(self, company_ids=None):
+        self.calls += 1
+        return {}
+
+class TestAnalysisResultCache(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDB()
+        self.analyzer = Analyzer(self.db)
+
+    def test_same_arguments_hit(self):
+        self.analyzer.trend(1)
+        self.assertEqual(self.analyzer.trend(company_id=1, days=30), {'company_id': 1, 'days': 30})
+        self.analyzer.trend(1, days=7)
+        self.assertEqual(self.analyzer.calls, 2)
+        self.assertEqual(self.analyzer.result_cache.stats, {'hits': 1, 'misses': 2})
+
+    def test_write_invalidates_only_that_company(self):
+        self.analyzer.trend(1)
+        self.analyzer.trend(2)
+        self.db.write(1)
+        self.analyzer.trend(1)
+        self.analyzer.trend(2)
+        self.assertEqual(self.analyzer.calls, 3)
+
+    def test_multi_company_and_global_scopes(self):
+        self.analyzer.trends([1, 2])
+        self.analyzer.trends()
+        self.db.write(3)
+        self.analyzer.trends([1, 2])
+        self.analyzer.trends()
+        self.assertEqual(self.analyzer.calls, 3)
+
+    def test_least_recently_used_is_evicted(self):
+        analyzer = Analyzer(self.db, max_entries=2)
+        analyzer.trend(1)
+        analyzer.trend(2)
+        analyzer.trend(1)
+        analyzer.trend(3)
+        analyzer.trend(1)
+        analyzer.trend(2)
+        self.assertEqual(analyzer.calls, 4)
+
+    def test_callers_get_independent_copies(self):
+        first = self.analyzer.trend(1)
+        first['days'] = 0
+        second = self.analyzer.trend(1)
+        second['company_id'] = None
+        self.assertEqual(self.analyzer.trend(1), {'company_id': 1, 'days': 30})
+        self.assertEqual(self.analyzer.calls, 1)
+
+    def test_concurrent_callers_share_one_cache(self):
+        analyzer = Analyzer(self.db, max_entries=8)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(500):
+                    company_id = (i + offset) % 16
+                    self.assertEqual(analyzer.trend(company_id)['company_id'], company_id)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(analyzer.result_cache.entries), 8)
+        self.assertEqual(sum(analyzer.result_cache.stats.values()), 4000)
+
+if __name__ == '__main__':
+    unittest.main()
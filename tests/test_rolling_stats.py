@@ -0,0 +1,110 @@
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from data.database import FinancialDataDB
+from src.analysis.rolling_stats import CompanySentimentState, RollingSentimentStats
+
+DAY = date(2024, 3, 1)
+
+class TestCompanySentimentState(unittest.TestCase):
+    def test_welford_matches_numpy(self):
+        scores = np.random.default_rng(5).uniform(-1, 1, 200)
+        state = CompanySentimentState(30, 0.05)
+        for i, score in enumerate(scores):
+            state.add(DAY + timedelta(days=i // 10), score)
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot['articles'], 200)
+        self.assertAlmostEqual(snapshot['mean'], scores.mean(), places=12)
+        self.assertAlmostEqual(snapshot['std'], scores.std(ddof=1), places=12)
+
+    def test_ewm_matches_pandas(self):
+        scores = np.random.default_rng(9).uniform(-1, 1, 100)
+        state = CompanySentimentState(30, 0.1)
+        for score in scores:
+            state.add(DAY, score)
+        ewm = pd.Series(scores).ewm(alpha=0.1, adjust=False)
+        snapshot = state.snapshot()
+        self.assertAlmostEqual(snapshot['ewm_mean'], ewm.mean().iloc[-1], places=12)
+        self.assertAlmostEqual(snapshot['ewm_std'], ewm.std(bias=True).iloc[-1], places=12)
+
+    def test_window_merges_day_buckets(self):
+        state = CompanySentimentState(5, 0.05)
+        days = {0: [0.1, 0.5], 1: [-0.3], 3: [0.9, 0.2, -0.4]}
+        for offset, scores in days.items():
+            for score in scores:
+                state.add(DAY + timedelta(days=offset), score)
+        flat = [score for scores in days.values() for score in scores]
+        snapshot = state.snapshot(DAY + timedelta(days=3))
+        self.assertEqual(snapshot['window_articles'], 6)
+        self.assertAlmostEqual(snapshot['window_mean'], np.mean(flat), places=12)
+        self.assertAlmostEqual(snapshot['volatility'], np.std(flat, ddof=1), places=12)
+        self.assertAlmostEqual(snapshot['latest_day_mean'], np.mean(days[3]), places=12)
+        self.assertEqual(snapshot['trend_direction'], 'up')
+
+    def test_days_expire_from_the_window(self):
+        state = CompanySentimentState(3, 0.05)
+        state.add(DAY, 1.0)
+        state.add(DAY + timedelta(days=1), 0.5)
+        state.add(DAY + timedelta(days=3), -0.5)
+        snapshot = state.snapshot(DAY + timedelta(days=3))
+        self.assertEqual(snapshot['window_articles'], 2)
+        self.assertAlmostEqual(snapshot['window_mean'], 0.0)
+
+        later = state.snapshot(DAY + timedelta(days=10))
+        self.assertEqual(later['window_articles'], 0)
+        self.assertIsNone(later['window_mean'])
+        self.assertEqual(later['articles'], 3)
+
+    def test_late_score_outside_window_counts_only_all_time(self):
+        state = CompanySentimentState(3, 0.05)
+        state.add(DAY + timedelta(days=5), 0.2)
+        state.add(DAY, 0.8)
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot['articles'], 2)
+        self.assertEqual(snapshot['window_articles'], 1)
+        self.assertEqual(snapshot['last_day'], (DAY + timedelta(days=5)).isoformat())
+
+    def test_round_trips_through_row(self):
+        state = CompanySentimentState(7, 0.05)
+        for offset, score in enumerate([0.3, -0.1, 0.6]):
+            state.add(DAY + timedelta(days=offset), score)
+        restored = CompanySentimentState(7, 0.05, state.to_row())
+        self.assertEqual(restored.snapshot(), state.snapshot())
+
+class TestRollingSentimentStats(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = FinancialDataDB(Path(tmp.name) / "test.db")
+        self.db.add_company("Apple Inc.", "AAPL", "0000320193")
+        self.company_id = self.db.get_company_id("AAPL")
+
+    def add_scored(self, day, score):
+        self.db.add_news_article(self.company_id, "Title", "", "", day, "test", f"https://example.com/{day}/{score}",
+                                 sentiment_score=score, sentiment_label="neutral")
+
+    def test_empty_table_is_rebuilt_from_scored_articles(self):
+        self.add_scored("2024-03-01", 0.5)
+        self.add_scored("2024-03-02T10:00:00", -0.1)
+        stats = RollingSentimentStats(self.db, window_days=30)
+        snapshot = stats.snapshot(self.company_id, as_of=date(2024, 3, 2))
+        self.assertEqual(snapshot['articles'], 2)
+        self.assertAlmostEqual(snapshot['mean'], 0.2)
+
+        # Once filled, the table is kept up by update(), not rebuilt again
+        self.add_scored("2024-03-03", 0.9)
+        stats = RollingSentimentStats(self.db, window_days=30)
+        self.assertEqual(stats.snapshot(self.company_id)['articles'], 2)
+
+    def test_update_folds_observations_in_day_order(self):
+        stats = RollingSentimentStats(self.db, window_days=30, alpha=0.5)
+        seen = []
+        stats.listeners.append(lambda states, observations: seen.append(len(observations)))
+        stats.update([(self.company_id, "2024-03-02", 1.0), (self.company_id, "2024-03-01", 0.0)])
+        snapshot = stats.snapshot(self.company_id, as_of=date(2024, 3, 2))
+        self.assertEqual(snapshot['ewm_mean'], 0.5)
+        self.assertEqual(snapshot['trend_direction'], 'up')
+        self.assertEqual(seen, [2])
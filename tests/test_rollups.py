@@ -0,0 +1,88 @@
+import sqlite3
+import tempfile
+import unittest
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from data.database import FinancialDataDB, choose_sentiment_resolution, sentiment_period_start
+
+def read_rollups(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return sorted(conn.execute(
+            '''SELECT company_id, resolution, period_start, total_articles, positive_count, negative_count, neutral_count
+            FROM sentiment_rollups WHERE total_articles != 0'''
+        ).fetchall())
+
+class TestChooseResolution(unittest.TestCase):
+    def test_finest_resolution_within_budget(self):
+        self.assertEqual(choose_sentiment_resolution(30, max_points=366), 'day')
+        self.assertEqual(choose_sentiment_resolution(366, max_points=366), 'day')
+        self.assertEqual(choose_sentiment_resolution(367, max_points=366), 'week')
+        self.assertEqual(choose_sentiment_resolution(366 * 7, max_points=366), 'week')
+        self.assertEqual(choose_sentiment_resolution(366 * 7 + 1, max_points=366), 'month')
+
+    def test_month_when_nothing_fits(self):
+        self.assertEqual(choose_sentiment_resolution(100, max_points=20), 'week')
+        self.assertEqual(choose_sentiment_resolution(100, max_points=10), 'month')
+        self.assertEqual(choose_sentiment_resolution(100000, max_points=10), 'month')
+
+class TestSentimentRollups(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = FinancialDataDB(Path(tmp.name) / "test.db")
+        self.today = date.today()
+        # Spans at least one week and one month boundary for two companies
+        self.daily = [
+            (company_id, (self.today - timedelta(days=days_ago)).isoformat(),
+             4 + days_ago % 4 + company_id, 1 + days_ago % 4, 1 + company_id, 2)
+            for company_id in (1, 2) for days_ago in range(0, 45, 2)
+        ]
+
+    def expected(self, daily):
+        totals = defaultdict(lambda: [0, 0, 0, 0])
+        for company_id, day, *counts in daily:
+            for resolution in ('week', 'month'):
+                start = sentiment_period_start(date.fromisoformat(day), resolution).isoformat()
+                for i, count in enumerate(counts):
+                    totals[(company_id, resolution, start)][i] += count
+        return sorted((*key, *counts) for key, counts in totals.items())
+
+    def test_incremental_rollups_are_sums_of_daily_rows(self):
+        # Two writes to the same days must add up, like successive scoring runs
+        half = [(c, d, t // 2, p // 2, n // 2, u // 2) for c, d, t, p, n, u in self.daily]
+        rest = [(c, d, t - t // 2, p - p // 2, n - n // 2, u - u // 2) for c, d, t, p, n, u in self.daily]
+        self.db.save_article_sentiments([], half)
+        self.db.save_article_sentiments([], rest)
+        self.assertEqual(read_rollups(self.db.db_path), self.expected(self.daily))
+
+    def test_incremental_rollups_match_a_rebuild(self):
+        self.db.save_article_sentiments([], self.daily)
+        incremental = read_rollups(self.db.db_path)
+        with sqlite3.connect(self.db.db_path) as conn:
+            FinancialDataDB._rebuild_sentiment_rollups(conn.cursor())
+            conn.commit()
+        self.assertEqual(read_rollups(self.db.db_path), incremental)
+
+    def test_replaced_day_moves_rollups_by_the_difference(self):
+        day = self.today.isoformat()
+        self.db.add_sentiment_result(1, day, 10, 5, 3, 2)
+        self.db.add_sentiment_result(1, day, 4, 1, 1, 2)
+        self.assertEqual(read_rollups(self.db.db_path), self.expected([(1, day, 4, 1, 1, 2)]))
+
+    def test_max_points_reads_the_matching_rollup(self):
+        self.db.save_article_sentiments([], self.daily)
+        daily = self.db.get_latest_sentiment(1, days=44, max_points=100)
+        weekly = self.db.get_latest_sentiment(1, days=44, max_points=10)
+        monthly = self.db.get_latest_sentiment(1, days=44, max_points=2)
+        self.assertEqual(len(daily), 23)
+        self.assertTrue(all(date.fromisoformat(row[0]).weekday() == 0 for row in weekly))
+        self.assertTrue(all(date.fromisoformat(row[0]).day == 1 for row in monthly))
+        self.assertLessEqual(len(weekly), 8)
+        expected_total = sum(row[2] for row in self.daily if row[0] == 1)
+        for rows in (daily, weekly, monthly):
+            self.assertEqual(sum(row[1] for row in rows), expected_total)
+            self.assertEqual([row[0] for row in rows], sorted((row[0] for row in rows), reverse=True))
+
+if __name__ == '__main__':
+    unittest.main()
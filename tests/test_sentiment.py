@@ -1,25 +1,98 @@
-
-import unittest
-from src.sentiment_analyzer import SentimentAnalyzer
-
-class TestSentimentAnalyzer(unittest.TestCase):
-    def setUp(self):
-        self.analyzer = SentimentAnalyzer()
-    
-    def test_positive_sentiment(self):
-        text = "This is a great company with excellent products and amazing growth potential."
-        result = self.analyzer.analyze_text(text)
-        self.assertEqual(result['sentiment'], 'positive')
-    
-    def test_negative_sentiment(self):
-        text = "This company is facing serious challenges and declining sales."
-        result = self.analyzer.analyze_text(text)
-        self.assertEqual(result['sentiment'], 'negative')
-    
-    def test_neutral_sentiment(self):
-        text = "The company reported its quarterly results."
-        result = self.analyzer.analyze_text(text)
-        self.assertEqual(result['sentiment'], 'neutral')
-
-if __name__ == '__main__':
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from data.database import FinancialDataDB
+from data.news_store import NewsSegmentStore
+from src.sentiment_analyzer import SentimentAnalyzer, normalize_published_date
+from src.sentiment_batch import BatchSentimentScorer
+from src.sentiment_cache import SentimentCache
+
+def temporary_cache(test):
+    """SentimentCache in a directory removed after the test, so tests never touch the real cache"""
+    tmp = tempfile.TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    cache = SentimentCache(Path(tmp.name) / "cache.db")
+    test.addCleanup(cache.close)
+    return cache
+
+class TestSentimentAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = SentimentAnalyzer(cache=temporary_cache(self))
+    
+    def test_positive_sentiment(self):
+        text = "This is a great company with excellent products and amazing growth potential."
+        result = self.analyzer.analyze_text(text)
+        self.assertEqual(result['sentiment'], 'positive')
+    
+    def test_negative_sentiment(self):
+        text = "This company is facing serious challenges and declining sales."
+        result = self.analyzer.analyze_text(text)
+        self.assertEqual(result['sentiment'], 'negative')
+    
+    def test_neutral_sentiment(self):
+        text = "The company reported its quarterly results."
+        result = self.analyzer.analyze_text(text)
+        self.assertEqual(result['sentiment'], 'neutral')
+
+class TestBatchSentimentScorer(unittest.TestCase):
+    def test_pool_matches_single_analyzer_in_order(self):
+        analyzer = SentimentAnalyzer(workers=1, cache=temporary_cache(self))
+        texts = [
+            "Shares soared after record profits.",
+            "The company reported its quarterly results.",
+            "Investors fear a painful collapse in sales.",
+        ] * 5
+        with BatchSentimentScorer(workers=2, chunk_size=4, min_parallel=0) as scorer:
+            results = list(scorer.score_texts(iter(texts)))
+        self.assertEqual(results, [analyzer.analyze_text(text) for text in texts])
+
+class TestLoadCompanyNews(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.analyzer = SentimentAnalyzer(workers=1, cache=temporary_cache(self))
+        self.analyzer.news_store = NewsSegmentStore(Path(tmp.name))
+
+    def append(self, days_ago, title):
+        day = (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+        self.analyzer.news_store.append('AAPL', [{'title': title, 'link': f"https://example.com/{title}"}], day=day)
+
+    def test_yesterdays_segment_is_read_after_midnight(self):
+        self.append(1, "yesterday")
+        news = self.analyzer.load_company_news('AAPL')
+        self.assertEqual([article['title'] for article in news['articles']], ["yesterday"])
+
+    def test_old_segments_do_not_fall_back_to_legacy_json(self):
+        self.append(3, "old")
+        self.assertIsNone(self.analyzer.load_company_news('AAPL'))
+
+class TestPublishedDate(unittest.TestCase):
+    def test_formats_normalize_to_iso_day(self):
+        for value in ("2025-01-02", "2025-01-02T10:00:00Z", "Thu, 02 Jan 2025 10:00:00 GMT", "Jan 2, 2025"):
+            self.assertEqual(normalize_published_date(value), "2025-01-02")
+
+    def test_unparseable_date(self):
+        self.assertIsNone(normalize_published_date("2 hours ago"))
+
+class TestProcessUnscoredArticles(unittest.TestCase):
+    def test_scored_day_is_stored_beside_the_scraped_date(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db = FinancialDataDB(Path(tmp.name) / "test.db")
+        db.add_companies([("Apple Inc.", "AAPL", "0000320193")])
+        db.add_news_articles_bulk([
+            (1, "Shares soared after record profits", "", "", "Jan 2, 2025", "test", "https://example.com/1"),
+            (1, "Sales collapse", "", "", "Thu, 02 Jan 2025 23:30:00 -0500", "test", "https://example.com/2"),
+        ])
+        analyzer = SentimentAnalyzer(workers=1, cache=temporary_cache(self))
+        self.assertEqual(analyzer.process_unscored_articles(db)['articles'], 2)
+
+        with sqlite3.connect(db.db_path) as conn:
+            rows = conn.execute("SELECT published_date, published_day FROM news_articles ORDER BY id").fetchall()
+        self.assertEqual(rows, [("Jan 2, 2025", "2025-01-02"), ("Thu, 02 Jan 2025 23:30:00 -0500", "2025-01-02")])
+
+if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+from pathlib import Path
+from src.sentiment_cache import SentimentCache
+
+class TestSentimentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.db"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_after_put_ignores_whitespace(self):
+        cache = SentimentCache(self.path)
+        cache.put("Apple beats  estimates", {'sentiment': 'positive'})
+        self.assertEqual(cache.get(" Apple beats estimates\n"), {'sentiment': 'positive'})
+        self.assertIsNone(cache.get("apple beats estimates"))
+        self.assertEqual(cache.stats, {'hits': 1, 'misses': 1})
+        cache.close()
+
+    def test_threshold_change_invalidates(self):
+        cache = SentimentCache(self.path, threshold=0.2)
+        cache.put("text", {'sentiment': 'neutral'})
+        cache.close()
+        cache = SentimentCache(self.path, threshold=0.5)
+        self.assertIsNone(cache.get("text"))
+        cache.close()
+
+    def test_least_recently_used_is_evicted(self):
+        cache = SentimentCache(self.path, max_entries=2, touch_rate=1, write_batch=1)
+        cache.put("a", {'n': 1})
+        cache.put("b", {'n': 2})
+        cache.get("a")
+        cache.put("c", {'n': 3})
+        self.assertEqual(cache.get_many(["a", "b", "c"]), [{'n': 1}, None, {'n': 3}])
+        cache.close()
+
+    def test_writes_are_batched_and_counted_in_memory(self):
+        cache = SentimentCache(self.path, write_batch=3)
+        cache.put_many([("a", {'n': 1}), ("b", {'n': 2})])
+        cache.put("a", {'n': 3})
+        self.assertEqual(cache.entries, 0)
+        self.assertEqual(cache.get("a"), {'n': 3})
+        cache.put("c", {'n': 4})
+        self.assertEqual(cache.entries, 3)
+        cache.put("d", {'n': 5})
+        cache.close()
+        reopened = SentimentCache(self.path, memory_entries=0)
+        self.assertEqual(reopened.entries, 4)
+        self.assertEqual(reopened.get_many(["a", "d"]), [{'n': 3}, {'n': 5}])
+        reopened.close()
+
+    def test_eviction_removes_a_slack_at_once(self):
+        cache = SentimentCache(self.path, max_entries=200, write_batch=1)
+        for n in range(201):
+            cache.put(str(n), {'n': n})
+        self.assertEqual(cache.entries, 198)
+        self.assertEqual(cache.get_many(["0", "2", "3", "200"]), [None, None, {'n': 3}, {'n': 200}])
+        cache.close()
+
+    def test_results_are_copies(self):
+        cache = SentimentCache(self.path)
+        cache.put("text", {'scores': {'compound': 0.5}})
+        cache.get("text")['scores']['compound'] = 0
+        self.assertEqual(cache.get("text"), {'scores': {'compound': 0.5}})
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
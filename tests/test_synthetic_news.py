@@ -0,0 +1,87 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from unittest import mock
+from data.news_store import NewsSegmentStore
+from src.synthetic_news import SyntheticNewsGenerator, main, synthetic_companies
+
+class TestSyntheticNews(unittest.TestCase):
+    def setUp(self):
+        self.companies = synthetic_companies(50, seed=1)
+
+    def generate(self, count, **kwargs):
+        generator = SyntheticNewsGenerator(self.companies, end_date=date(2025, 1, 1), **kwargs)
+        return [article for chunk in generator.generate(count, chunk_size=400) for article in chunk]
+
+    def test_same_seed_gives_same_corpus(self):
+        self.assertEqual(self.generate(1000, seed=7), self.generate(1000, seed=7))
+        self.assertNotEqual(self.generate(1000, seed=7), self.generate(1000, seed=8))
+
+    def test_sentiment_mix_is_respected(self):
+        articles = self.generate(5000, seed=3, sentiment_mix=(0.6, 0.3, 0.1))
+        counts = Counter(article['sentiment_class'] for article in articles)
+        self.assertAlmostEqual(counts['positive'] / 5000, 0.6, delta=0.03)
+        self.assertAlmostEqual(counts['negative'] / 5000, 0.3, delta=0.03)
+
+    def test_duplicates_come_from_other_sources(self):
+        articles = self.generate(2000, seed=5, duplicate_rate=0.2)
+        seen = {}
+        duplicates = 0
+        for article in articles:
+            key = (article['ticker'], article['title'], article['excerpt'], article['date'])
+            if key in seen and article['source'] != seen[key]:
+                duplicates += 1
+            seen.setdefault(key, article['source'])
+        self.assertGreater(duplicates, 300)
+        self.assertEqual(len({article['link'] for article in articles}), 2000)
+
+    def test_dates_stay_in_range(self):
+        articles = self.generate(500, seed=2, days=10)
+        dates = {article['date'] for article in articles}
+        self.assertTrue(all("2024-12-23" <= d <= "2025-01-01" for d in dates))
+
+    def test_bulk_store_load_syncs_once(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = NewsSegmentStore(Path(tmp.name), durable=False)
+        generator = SyntheticNewsGenerator(self.companies, seed=4, days=5, end_date=date(2025, 1, 1))
+        with mock.patch('os.fsync') as fsync, mock.patch('os.sync') as sync:
+            self.assertEqual(generator.write_store(store, 600, chunk_size=200), 600)
+        fsync.assert_not_called()
+        sync.assert_called_once()
+
+        stored = [article for company in self.companies
+                  for article in store.iter_articles(company['ticker'])]
+        self.assertEqual(len({article['link'] for article in stored}), 600)
+
+class TestSyntheticNewsCli(unittest.TestCase):
+    def run_main(self, *args):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch('sys.argv', ['synthetic_news', '--articles', '5', '--tickers', '2', *args]), \
+                contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            main()
+        return stdout.getvalue(), os.listdir(tmp.name)
+
+    def test_store_and_db_formats_need_an_output(self):
+        for args in (['--format', 'db'], ['--format', 'store'], ['--format', 'db', '--output', '-']):
+            with self.assertRaises(SystemExit) as raised:
+                self.run_main(*args)
+            self.assertEqual(raised.exception.code, 2)
+
+    def test_ndjson_defaults_to_stdout(self):
+        stdout, files = self.run_main('--end-date', '2025-01-01')
+        self.assertEqual(len(stdout.splitlines()), 5)
+        self.assertEqual(files, [])
+
+if __name__ == '__main__':
+    unittest.main()